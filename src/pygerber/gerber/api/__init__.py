@@ -4,6 +4,7 @@ Gerber X3/X2 files.
 
 from __future__ import annotations
 
+from pygerber.gerber.api._artifact_cache import ArtifactCache
 from pygerber.gerber.api._composite_view import (
     CompositeImage,
     CompositePillowImage,
@@ -40,6 +41,7 @@ from pygerber.vm.types import Color, Style
 __all__ = [
     "DEFAULT_ALPHA_COLOR_MAP",
     "DEFAULT_COLOR_MAP",
+    "ArtifactCache",
     "Color",
     "CompositeImage",
     "CompositePillowImage",
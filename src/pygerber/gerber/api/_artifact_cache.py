@@ -0,0 +1,84 @@
+"""The `_artifact_cache` module contains definition of `ArtifactCache` class."""
+
+from __future__ import annotations
+
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from pygerber import __version__
+from pygerber.gerber.ast.serialization import dumps, loads
+
+if TYPE_CHECKING:
+    from pygerber.gerber.ast.nodes.base import SourceBuffer
+
+
+class ArtifactCache:
+    """Persistent, content addressed cache of parsed ASTs and compiled RVMC stored on
+    disk.
+
+    Artifacts are identified by SHA-256 of source code, options used to produce them
+    and PyGerber version, hence cache can be safely shared between processes and
+    reused when the same files are rendered over and over again. Artifacts are stored
+    in compact binary form, without source code they were created from.
+
+    Cache directory must be trusted, as artifacts are loaded with `pickle`.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory)
+
+    def get_key(self, kind: str, sha256: str, **options: Any) -> str:
+        """Get key identifying artifact of given kind created from source code with
+        given SHA-256 hash with given options.
+        """
+        identity = repr((kind, sha256, sorted(options.items()), __version__))
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _get_path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def load(self, key: str, source: Union[str, SourceBuffer]) -> Optional[Any]:
+        """Load artifact from cache, return None if it is not cached.
+
+        Parameters
+        ----------
+        key : str
+            Key of artifact returned by `get_key()`.
+        source : Union[str, SourceBuffer]
+            Source code artifact was created from, referenced by source information of
+            loaded AST nodes.
+
+        """
+        try:
+            data = self._get_path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            return loads(data, source)
+        except Exception:  # noqa: BLE001
+            # Damaged artifacts are treated as missing, they will be overwritten.
+            return None
+
+    def store(self, key: str, artifact: Any) -> None:
+        """Store artifact in cache.
+
+        Artifact is written to temporary file first and then moved to its final
+        location, so other processes never observe partially written artifacts.
+        """
+        data = dumps(artifact)
+        path = self._get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        file = tempfile.NamedTemporaryFile(dir=path.parent, delete=False)  # noqa: SIM115
+        temporary_path = Path(file.name)
+        try:
+            with file:
+                file.write(data)
+            temporary_path.replace(path)
+        except BaseException:
+            # Temporary file would be left behind forever, as its name is random.
+            temporary_path.unlink(missing_ok=True)
+            raise
@@ -2,23 +2,26 @@
 
 from __future__ import annotations
 
+import io
+import mmap
 from enum import Enum
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, BinaryIO, Literal, Optional, TextIO
+from typing import TYPE_CHECKING, Any, BinaryIO, Literal, Optional, TextIO, Union
 
 import pyparsing as pp
 
 from pygerber.gerber import formatter
+from pygerber.gerber.api._artifact_cache import ArtifactCache
 from pygerber.gerber.api._enums import (
     COLOR_MAP_T,
     DEFAULT_ALPHA_COLOR_MAP,
     FileTypeEnum,
 )
-from pygerber.gerber.ast import State, get_final_state
+from pygerber.gerber.ast import State, get_final_state, get_header_state
 from pygerber.gerber.ast.nodes.attribute.TF import TF_FileFunction
 from pygerber.gerber.ast.nodes.enums import UnitMode
 from pygerber.gerber.compiler import compile
-from pygerber.gerber.parser import parse
+from pygerber.gerber.parser import iter_parse, parse
 from pygerber.vm import render
 from pygerber.vm.pillow.vm import PillowResult
 from pygerber.vm.shapely.vm import ShapelyResult
@@ -29,6 +32,7 @@ if TYPE_CHECKING:
     import PIL.Image
 
     from pygerber.gerber.ast.nodes import File
+    from pygerber.gerber.ast.nodes.base import SourceBuffer
     from pygerber.vm.rvmc import RVMC
 
 if TYPE_CHECKING:
@@ -389,6 +393,40 @@ class ShapelyImage(Image):
         self._result.save_svg(destination, self._style)
 
 
+def _memory_map(file_path: Path) -> SourceBuffer:
+    with file_path.open("rb") as file:
+        if file_path.stat().st_size == 0:
+            # Empty files can not be memory mapped.
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _BufferReader(io.RawIOBase):
+    """Raw binary stream reading from buffer, eg. memory mapped file, without copying
+    it as a whole.
+    """
+
+    def __init__(self, buffer: SourceBuffer) -> None:
+        super().__init__()
+        self._view = memoryview(buffer)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        chunk = self._view[self._position : self._position + len(buffer)]
+        size = len(chunk)
+        buffer[:size] = chunk
+        self._position += size
+        return size
+
+    def close(self) -> None:
+        # Memory mapped file can not be closed while it is exported to memoryview.
+        self._view.release()
+        super().close()
+
+
 class GerberFile:
     """Generic representation of Gerber file.
 
@@ -397,7 +435,7 @@ class GerberFile:
 
     def __init__(
         self,
-        source_code: str,
+        source_code: Union[str, SourceBuffer],
         file_type: FileTypeEnum,
         source_type_or_path: Literal["@buffer", "@string"] | Path,
     ) -> None:
@@ -408,13 +446,17 @@ class GerberFile:
         self._cached_ast: Optional[File] = None
         self._cached_rvmc: Optional[RVMC] = None
         self._cached_final_state: Optional[State] = None
+        self._cached_header_state: Optional[State] = None
+        self._artifact_cache: Optional[ArtifactCache] = None
         self._color_map = DEFAULT_ALPHA_COLOR_MAP
         self._source_type_or_path = source_type_or_path
 
     @property
     def source_code(self) -> str:
         """Gerber source code."""
-        return self._source_code
+        if isinstance(self._source_code, str):
+            return self._source_code
+        return self._source_code[:].decode("utf-8")
 
     @property
     def file_type(self) -> FileTypeEnum:
@@ -425,12 +467,15 @@ class GerberFile:
         self._cached_ast = None
         self._cached_rvmc = None
         self._cached_final_state = None
+        self._cached_header_state = None
 
     @classmethod
     def from_file(
         cls,
         file_path: str | Path,
         file_type: FileTypeEnum = FileTypeEnum.INFER,
+        *,
+        memory_map: bool = False,
     ) -> Self:
         """Initialize object with Gerber source code loaded from file on disk.
 
@@ -440,6 +485,12 @@ class GerberFile:
             Path to Gerber file on disk.
         file_type : FileTypeEnum, optional
             File type classification, by default FileTypeEnum.INFER
+        memory_map : bool, optional
+            Toggle memory mapping of the file instead of reading it into `str`, by
+            default False. Memory mapped file is parsed directly from `bytes`, without
+            decoding it, with "native" parser, unless other parser is explicitly
+            selected with `set_parser_options()`. Source information of nodes is then
+            expressed in bytes.
 
         """
         file_path = Path(file_path)
@@ -451,6 +502,9 @@ class GerberFile:
             if file_type == FileTypeEnum.UNDEFINED:
                 file_type = FileTypeEnum.INFER_FROM_ATTRIBUTES
 
+        if memory_map:
+            return cls(_memory_map(file_path), file_type, file_path)
+
         return cls(file_path.read_text(encoding="utf-8"), file_type, file_path)
 
     @classmethod
@@ -508,7 +562,10 @@ class GerberFile:
         Parameters
         ----------
         **options : Any
-            Parser options.
+            Parser options, see `pygerber.gerber.parser.parse()` for list of available
+            options. For example `optimization=Optimization.DISCARD_ATTRIBUTES` can be
+            used to skip construction of attribute nodes when file is only rendered,
+            but then file type can not be inferred from attributes.
 
         Returns
         -------
@@ -542,6 +599,27 @@ class GerberFile:
         self._compiler_options = options
         return self
 
+    def set_artifact_cache(self, cache: Optional[ArtifactCache]) -> Self:
+        """Set persistent cache of parsed AST and compiled RVMC for this Gerber file.
+
+        When cache is set, AST and RVMC are loaded from cache instead of being parsed
+        and compiled again, as long as source code, parser and compiler options and
+        PyGerber version did not change. Newly created artifacts are stored in cache.
+
+        Parameters
+        ----------
+        cache : Optional[ArtifactCache]
+            Cache to use or None to disable caching.
+
+        Returns
+        -------
+        Self
+            Returns self for method chaining.
+
+        """
+        self._artifact_cache = cache
+        return self
+
     def set_color_map(self, color_map: COLOR_MAP_T) -> Self:
         """Set color map for rendering of this Gerber file.
 
@@ -573,22 +651,82 @@ class GerberFile:
 
         return self._cached_final_state
 
+    def _get_header_state(self) -> State:
+        if self._cached_final_state is not None:
+            return self._cached_final_state
+
+        if self._cached_header_state is None:
+            stream: TextIO
+            if isinstance(self._source_code, str):
+                stream = io.StringIO(self._source_code)
+            else:
+                stream = io.TextIOWrapper(
+                    io.BufferedReader(_BufferReader(self._source_code)),
+                    encoding="utf-8",
+                )
+
+            with stream:
+                self._cached_header_state = get_header_state(
+                    iter_parse(
+                        stream,
+                        strict=False,
+                        resilient=True,
+                        ast_node_class_overrides=self._parser_options.get(
+                            "ast_node_class_overrides"
+                        ),
+                        optimization=self._parser_options.get("optimization", 0),
+                    )
+                )
+
+        return self._cached_header_state
+
     def _get_ast(self) -> File:
         if self._cached_ast is None:
-            self._cached_ast = parse(self._source_code, **self._parser_options)
+            options = self._parser_options
+            if not isinstance(self._source_code, str):
+                options = {"parser": "native", **options}
+
+            key = self._get_artifact_key("ast")
+            self._cached_ast = self._load_artifact(key)
+            if self._cached_ast is None:
+                self._cached_ast = parse(self._source_code, **options)
+                self._store_artifact(key, self._cached_ast)
 
         assert self._cached_ast is not None
         return self._cached_ast
 
     def _get_rvmc(self) -> RVMC:
-        ast = self._get_ast()
-
         if self._cached_rvmc is None:
-            self._cached_rvmc = compile(ast, **self._compiler_options)
+            key = self._get_artifact_key("rvmc", **self._compiler_options)
+            self._cached_rvmc = self._load_artifact(key)
+            if self._cached_rvmc is None:
+                self._cached_rvmc = compile(self._get_ast(), **self._compiler_options)
+                self._store_artifact(key, self._cached_rvmc)
 
         assert self._cached_rvmc is not None
         return self._cached_rvmc
 
+    def _get_artifact_key(self, kind: str, **options: Any) -> Optional[str]:
+        if self._artifact_cache is None:
+            return None
+        return self._artifact_cache.get_key(
+            kind,
+            self.sha256,
+            parser_options=sorted(self._parser_options.items()),
+            is_buffer=not isinstance(self._source_code, str),
+            **options,
+        )
+
+    def _load_artifact(self, key: Optional[str]) -> Any:
+        if self._artifact_cache is None or key is None:
+            return None
+        return self._artifact_cache.load(key, self._source_code)
+
+    def _store_artifact(self, key: Optional[str], artifact: Any) -> None:
+        if self._artifact_cache is None or key is None:
+            return
+        self._artifact_cache.store(key, artifact)
+
     def render_with_pillow(
         self,
         style: Optional[Style] = None,
@@ -661,7 +799,7 @@ class GerberFile:
         return file_type
 
     def _get_file_type_from_attributes(self) -> FileTypeEnum:
-        file_function_node = self._get_final_state().attributes.file_attributes.get(
+        file_function_node = self._get_header_state().attributes.file_attributes.get(
             ".FileFunction"
         )
         if file_function_node is None:
@@ -714,7 +852,9 @@ class GerberFile:
         """SHA256 hash of Gerber source code."""
         import hashlib  # noqa: PLC0415
 
-        return hashlib.sha256(self._source_code.encode("utf-8")).hexdigest()
+        if isinstance(self._source_code, str):
+            return hashlib.sha256(self._source_code.encode("utf-8")).hexdigest()
+        return hashlib.sha256(self._source_code).hexdigest()
 
     def __str__(self) -> str:
         path = self._source_type_or_path
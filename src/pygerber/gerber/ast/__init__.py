@@ -4,7 +4,11 @@ the Gerber X3 abstract syntax tree.
 
 from __future__ import annotations
 
-from pygerber.gerber.ast.ast_visitor import AstVisitor
+from itertools import takewhile
+from typing import TYPE_CHECKING
+
+from pygerber.gerber.ast.ast_visitor import AstVisitor, FastAstVisitor
+from pygerber.gerber.ast.columnar import from_columnar, iter_columnar, to_columnar
 from pygerber.gerber.ast.errors import (
     ApertureNotFoundError,
     ApertureNotSelectedError,
@@ -16,9 +20,22 @@ from pygerber.gerber.ast.errors import (
     SourceNotAvailableError,
     VisitorError,
 )
+from pygerber.gerber.ast.expression_compile_visitor import (
+    CompiledMacro,
+    ExpressionCompileVisitor,
+)
 from pygerber.gerber.ast.expression_eval_visitor import ExpressionEvalVisitor
 from pygerber.gerber.ast.node_finder import NodeFinder
-from pygerber.gerber.ast.nodes import File
+from pygerber.gerber.ast.nodes import (
+    AB,
+    D01,
+    D02,
+    D03,
+    SR,
+    File,
+    Node,
+    Operations,
+)
 from pygerber.gerber.ast.state_tracking_visitor import (
     ApertureStorage,
     ArcInterpolation,
@@ -30,8 +47,12 @@ from pygerber.gerber.ast.state_tracking_visitor import (
     State,
     StateTrackingVisitor,
     Transform,
+    ignores_node_coordinates,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 __all__ = [
     "ApertureNotFoundError",
     "ApertureNotSelectedError",
@@ -40,10 +61,13 @@ __all__ = [
     "AstError",
     "AstVisitor",
     "Attributes",
+    "CompiledMacro",
     "CoordinateFormat",
     "CoordinateFormatNotSetError",
     "DirectADHandlerDispatchNotSupportedError",
+    "ExpressionCompileVisitor",
     "ExpressionEvalVisitor",
+    "FastAstVisitor",
     "ImageAttributes",
     "NodeFinder",
     "PackedCoordinateTooLongError",
@@ -55,10 +79,31 @@ __all__ = [
     "StateTrackingVisitor",
     "Transform",
     "VisitorError",
+    "from_columnar",
+    "ignores_node_coordinates",
+    "iter_columnar",
+    "to_columnar",
 ]
 
 
+_DRAW_NODE_TYPES = (D01, D02, D03, Operations, AB, SR)
+
+
 def get_final_state(ast: File) -> State:
     visitor = StateTrackingVisitor()
     ast.visit(visitor)
     return visitor.state
+
+
+def get_header_state(nodes: Iterable[Node]) -> State:
+    """Get state after commands preceding the first draw command, eg. file attributes,
+    unit and coordinate format.
+
+    Nodes are consumed only up to the first draw command, hence when they are yielded
+    by `iter_parse()`, rest of the file is never parsed.
+    """
+    visitor = StateTrackingVisitor()
+    visitor.visit_nodes(
+        takewhile(lambda node: not isinstance(node, _DRAW_NODE_TYPES), nodes)
+    )
+    return visitor.state
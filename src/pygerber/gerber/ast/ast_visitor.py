@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable
+
+from pyparsing import cached_property
 
 from pygerber.gerber.ast.nodes.invalid import Invalid
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from typing_extensions import TypeAlias
+
     from pygerber.gerber.ast.nodes import (
         AB,
         AD,
@@ -89,6 +95,7 @@ if TYPE_CHECKING:
         Mul,
         Neg,
         Node,
+        Operations,
         Parenthesis,
         Point,
         Pos,
@@ -122,6 +129,8 @@ if TYPE_CHECKING:
         Variable,
     )
 
+    Callback: TypeAlias = Callable[[Any, Any], Any]
+
 
 class AstVisitor:
     """The `AstVisitor` class is a class that acts as a visitor for `Node` instances
@@ -420,6 +429,16 @@ class AstVisitor:
         """Handle `Dnn` node."""
         return node
 
+    def on_operations(self, node: Operations) -> Operations:
+        """Handle `Operations` node.
+
+        By default D01, D02 and D03 nodes represented by `Operations` node are
+        recreated and visited one by one.
+        """
+        for inner_node in node.iter_nodes():
+            inner_node.visit(self)
+        return node
+
     # G codes
 
     def on_g01(self, node: G01) -> G01:
@@ -773,16 +792,24 @@ class AstVisitor:
     def on_file(self, node: File) -> File:
         """Handle `File` node."""
         try:
-            for command in node.nodes:
-                try:
-                    command.visit(self)
-                except Exception as e:  # noqa: PERF203
-                    if self.on_exception(command, e):
-                        raise
+            self.visit_nodes(node.nodes)
         finally:
             self.on_end_of_file(node)
         return node
 
+    def visit_nodes(self, nodes: Iterable[Node]) -> None:
+        """Visit top level nodes one by one, eg. as they are yielded by `iter_parse()`.
+
+        Exceptions are handled the same way as in `on_file()`, but `on_end_of_file()`
+        is not called.
+        """
+        for command in nodes:
+            try:
+                command.visit(self)
+            except Exception as e:  # noqa: PERF203
+                if self.on_exception(command, e):
+                    raise
+
     def on_end_of_file(self, node: File) -> None:
         """Handle end of file."""
 
@@ -796,3 +823,136 @@ class AstVisitor:
     def on_invalid(self, node: Invalid) -> Invalid:
         """Handle invalid node."""
         return node
+
+
+class FastAstVisitor(AstVisitor):
+    """The `FastAstVisitor` class is a specialization of `AstVisitor` which dispatches
+    nodes with lookup table instead of calling `Node.visit()`.
+
+    Callback of each node type is resolved when visitor encounters that type for the
+    first time and then looked up by type of node, hence callbacks assigned to visitor
+    instance are used only if they are assigned before visiting. Nodes of classes
+    which override `visit()` without overriding `get_visitor_callback_function()`,
+    eg. provided with `ast_node_class_overrides`, are visited with `Node.visit()`.
+    Top level nodes and nodes nested in `AB` and `SR` blocks are visited in a flat
+    loop and coordinates of D01, D02 and D03 are passed directly to their callbacks.
+    Otherwise behavior is the same as of `AstVisitor`, hence visitors can derive from
+    this class instead of `AstVisitor` without any other changes.
+    """
+
+    @cached_property
+    def _callbacks(self) -> dict[type[Node], Callback]:
+        return {}
+
+    def dispatch(self, node: Node) -> Node:
+        """Call visitor callback for given node."""
+        callback = self._callbacks.get(type(node))
+        if callback is None:
+            callback = self._resolve_callback(node)
+        return callback(self, node)  # type: ignore[no-any-return]
+
+    def _resolve_callback(self, node: Node) -> Callback:
+        node_type = type(node)
+
+        if _is_visit_overridden(node_type):
+            callback: Callback = _visit_node
+        else:
+            method = node.get_visitor_callback_function(self)
+            callback = getattr(method, "__func__", None)  # type: ignore[assignment]
+            if callback is None or getattr(method, "__self__", None) is not self:
+                # Callback is not a method of this visitor, eg. it is a function
+                # assigned to instance, hence it must be called without `self`.
+                callback = lambda _, node: method(node)  # noqa: E731
+
+        self._callbacks[node_type] = callback
+        return callback
+
+    def visit_nodes(self, nodes: Iterable[Node]) -> None:
+        """Visit top level nodes one by one, eg. as they are yielded by `iter_parse()`.
+
+        Exceptions are handled the same way as in `on_file()`, but `on_end_of_file()`
+        is not called.
+        """
+        callbacks = self._callbacks
+
+        for command in nodes:
+            try:
+                callback = callbacks.get(type(command))
+                if callback is None:
+                    callback = self._resolve_callback(command)
+                callback(self, command)
+            except Exception as e:  # noqa: PERF203
+                if self.on_exception(command, e):
+                    raise
+
+    def on_ab(self, node: AB) -> AB:
+        """Handle `AB` root node."""
+        self.on_ab_open(node.open)
+        for inner_node in node.nodes:
+            self.dispatch(inner_node)
+        self.on_ab_close(node.close)
+        return node
+
+    def on_sr(self, node: SR) -> SR:
+        """Handle `SR` root node."""
+        self.on_sr_open(node.open)
+        for inner_node in node.nodes:
+            self.dispatch(inner_node)
+        self.on_sr_close(node.close)
+        return node
+
+    def on_d01(self, node: D01) -> D01:
+        """Handle `D01` node."""
+        if node.x is not None:
+            self.on_coordinate_x(node.x)
+
+        if node.y is not None:
+            self.on_coordinate_y(node.y)
+
+        if node.i is not None:
+            self.on_coordinate_i(node.i)
+
+        if node.j is not None:
+            self.on_coordinate_j(node.j)
+
+        return node
+
+    def on_d02(self, node: D02) -> D02:
+        """Handle `D02` node."""
+        if node.x is not None:
+            self.on_coordinate_x(node.x)
+
+        if node.y is not None:
+            self.on_coordinate_y(node.y)
+
+        return node
+
+    def on_d03(self, node: D03) -> D03:
+        """Handle `D03` node."""
+        if node.x is not None:
+            self.on_coordinate_x(node.x)
+
+        if node.y is not None:
+            self.on_coordinate_y(node.y)
+
+        return node
+
+    def on_operations(self, node: Operations) -> Operations:
+        """Handle `Operations` node."""
+        for inner_node in node.iter_nodes():
+            self.dispatch(inner_node)
+        return node
+
+
+def _visit_node(visitor: AstVisitor, node: Node) -> Node:
+    return node.visit(visitor)
+
+
+def _is_visit_overridden(node_type: type[Node]) -> bool:
+    """Check if `visit()` of node class is not the one paired with its
+    `get_visitor_callback_function()`.
+    """
+    for cls in node_type.__mro__:
+        if "get_visitor_callback_function" in vars(cls):
+            return node_type.visit is not cls.visit
+    return True
@@ -0,0 +1,231 @@
+"""The `columnar` module contains functions converting Gerber AST to and from
+columnar form.
+
+In columnar form runs of standalone D01, D02 and D03 commands, which make up the bulk of
+typical Gerber file, are replaced with `Operations` nodes holding coordinates of
+commands in NumPy arrays. Other nodes, eg. `Dnn`, `G01` or `LP`, are left in place
+between them. Columnar form takes fraction of memory of regular AST and it can be
+visited by all visitors, as `Operations` nodes recreate commands they represent
+when visited by visitors not aware of them.
+
+Runs of commands are never merged across changes of coordinate format, so
+coordinates of each run are decoded with `FS` command preceding it. Runs which can
+not be decoded, eg. because coordinate format was not set yet or coordinate has too
+many digits, are left unchanged, so visiting them reports the same errors as
+visiting regular AST.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Union
+
+import numpy as np
+
+from pygerber.gerber.ast.nodes import (
+    AB,
+    D01,
+    D02,
+    D03,
+    FS,
+    SR,
+    File,
+    Node,
+    Operations,
+    SourceInfo,
+    Zeros,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_MAX_DIGITS = 18
+"""Maximal number of digits of coordinate which always fits in int64."""
+
+
+def to_columnar(ast: File) -> File:
+    """Convert AST to columnar form."""
+    return ast.model_copy(update={"nodes": list(iter_columnar(ast.nodes))})
+
+
+def iter_columnar(nodes: Iterable[Node]) -> Iterator[Node]:
+    """Convert top level nodes to columnar form one by one, eg. as they are yielded
+    by `iter_parse()`, so that regular AST of whole file is never kept in memory.
+    """
+    return _ColumnarConverter().iter_nodes(nodes)
+
+
+def from_columnar(ast: File) -> File:
+    """Convert AST in columnar form back to regular AST.
+
+    Recreated D01, D02 and D03 nodes do not have source information and their
+    coordinates are spelled in canonical form, see `Operations.iter_nodes()`.
+    """
+    return ast.model_copy(update={"nodes": _expand(ast.nodes)})
+
+
+def _expand(nodes: Iterable[Node]) -> List[Node]:
+    expanded: List[Node] = []
+
+    for node in nodes:
+        if isinstance(node, Operations):
+            expanded.extend(node.iter_nodes())
+        elif isinstance(node, (AB, SR)):
+            expanded.append(node.model_copy(update={"nodes": _expand(node.nodes)}))
+        else:
+            expanded.append(node)
+
+    return expanded
+
+
+class _UndecodableCoordinateError(ValueError):
+    pass
+
+
+class _ColumnarConverter:
+    def __init__(self) -> None:
+        self.fs: Optional[FS] = None
+
+    def iter_nodes(self, nodes: Iterable[Node]) -> Iterator[Node]:
+        run: List[Union[D01, D02, D03]] = []
+
+        for node in nodes:
+            node_type = type(node)
+
+            if (
+                node_type is D01 or node_type is D02 or node_type is D03
+            ) and node.is_standalone:  # type: ignore[attr-defined]
+                if run and not _is_same_source(run[-1], node):
+                    yield from self._convert_run(run)
+                    run = []
+                run.append(node)  # type: ignore[arg-type]
+                continue
+
+            if run:
+                yield from self._convert_run(run)
+                run = []
+
+            if isinstance(node, FS):
+                self.fs = node
+            elif isinstance(node, (AB, SR)):
+                node = node.model_copy(  # noqa: PLW2901
+                    update={"nodes": list(self.iter_nodes(node.nodes))}
+                )
+
+            yield node
+
+        if run:
+            yield from self._convert_run(run)
+
+    def _convert_run(
+        self, run: List[Union[D01, D02, D03]]
+    ) -> Iterator[Union[D01, D02, D03, Operations]]:
+        if self.fs is None:
+            yield from run
+            return
+
+        try:
+            yield self._to_operations(self.fs, run)
+        except _UndecodableCoordinateError:
+            yield from run
+
+    def _to_operations(self, fs: FS, run: List[Union[D01, D02, D03]]) -> Operations:
+        decode_x = _get_decoder(fs.zeros, fs.x_integral, fs.x_decimal)
+        decode_y = _get_decoder(fs.zeros, fs.y_integral, fs.y_decimal)
+
+        codes: List[int] = []
+        masks: List[int] = []
+        xs: List[int] = []
+        ys: List[int] = []
+        is_: List[int] = []
+        js: List[int] = []
+
+        for node in run:
+            mask = 0
+
+            if node.x is None:
+                xs.append(0)
+            else:
+                xs.append(decode_x(node.x.value))
+                mask |= Operations.HAS_X
+
+            if node.y is None:
+                ys.append(0)
+            else:
+                ys.append(decode_y(node.y.value))
+                mask |= Operations.HAS_Y
+
+            if isinstance(node, D01):
+                codes.append(1)
+
+                if node.i is None:
+                    is_.append(0)
+                else:
+                    is_.append(decode_x(node.i.value))
+                    mask |= Operations.HAS_I
+
+                if node.j is None:
+                    js.append(0)
+                else:
+                    js.append(decode_y(node.j.value))
+                    mask |= Operations.HAS_J
+            else:
+                codes.append(2 if isinstance(node, D02) else 3)
+                is_.append(0)
+                js.append(0)
+
+            masks.append(mask)
+
+        return Operations(
+            source_info=_get_run_source_info(run),
+            fs=fs,
+            codes=np.array(codes, dtype=np.uint8),
+            mask=np.array(masks, dtype=np.uint8),
+            x=np.array(xs, dtype=np.int64),
+            y=np.array(ys, dtype=np.int64),
+            i=np.array(is_, dtype=np.int64),
+            j=np.array(js, dtype=np.int64),
+        )
+
+
+def _get_decoder(zeros: Zeros, integral: int, decimal: int) -> Callable[[str], int]:
+    digits = integral + decimal
+    if digits > _MAX_DIGITS:
+        raise _UndecodableCoordinateError
+
+    skip_trailing = zeros == Zeros.SKIP_TRAILING
+
+    def _(coordinate: str) -> int:
+        unsigned = coordinate[1:] if coordinate[:1] in ("+", "-") else coordinate
+
+        if not (
+            0 < len(unsigned) <= digits and unsigned.isascii() and unsigned.isdigit()
+        ):
+            raise _UndecodableCoordinateError
+
+        if skip_trailing:
+            unsigned = unsigned.ljust(digits, "0")
+
+        value = int(unsigned)
+        return -value if coordinate[0] == "-" else value
+
+    return _
+
+
+def _is_same_source(first: Node, second: Node) -> bool:
+    if first.source_info is None or second.source_info is None:
+        return first.source_info is second.source_info
+    return first.source_info.source is second.source_info.source
+
+
+def _get_run_source_info(run: List[Union[D01, D02, D03]]) -> Optional[SourceInfo]:
+    first = run[0].source_info
+    last = run[-1].source_info
+
+    if first is None or last is None:
+        return None
+
+    return SourceInfo(
+        source=first.source,
+        location=first.location,
+        length=last.location + last.length - first.location,
+    )
@@ -40,6 +40,18 @@ class ApertureNotSelectedError(StateTrackingVisitorError):
         )
 
 
+class StateCheckpointsNotRecordedError(StateTrackingVisitorError):
+    """Raised when state at location is requested but visitor did not record state
+    checkpoints.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(
+            "State checkpoints were not recorded, visit AST with "
+            "`checkpoint_interval` set first."
+        )
+
+
 class ApertureNotFoundError(VisitorError):
     """Raised when an aperture is not found in the aperture dictionary."""
 
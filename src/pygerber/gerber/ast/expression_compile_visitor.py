@@ -0,0 +1,168 @@
+"""The `expression_compile_visitor` module contains definition of
+`ExpressionCompileVisitor` class and `CompiledMacro` class.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping
+
+from pygerber.gerber.ast.ast_visitor import AstVisitor
+from pygerber.gerber.ast.nodes import Double, Expression, Node
+
+if TYPE_CHECKING:
+    from pygerber.gerber.ast.nodes import (
+        AM,
+        Add,
+        Constant,
+        Div,
+        Mul,
+        Neg,
+        Pos,
+        Sub,
+        Variable,
+    )
+
+CompiledExpression = Callable[[Mapping[str, Double]], Double]
+"""Expression compiled to callable which takes scope of variables and returns value
+of the expression.
+"""
+
+
+class ExpressionCompileVisitor(AstVisitor):
+    """`ExpressionCompileVisitor` class implements a visitor pattern for compiling
+    mathematical expression into tree of closures, which can be evaluated many times
+    without walking the expression tree again.
+
+    Compiled expressions give the same results as `ExpressionEvalVisitor`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.return_value: CompiledExpression = _constant(Double(0.0))
+
+    def compile(self, node: Expression) -> CompiledExpression:
+        """Compile the given expression node."""
+        self.return_value = _constant(Double(0.0))
+        node.visit(self)
+        return self.return_value
+
+    def _compile_operands(
+        self, node: Add | Div | Mul | Sub
+    ) -> tuple[CompiledExpression, List[CompiledExpression]]:
+        head = self.compile(node.head)
+        tail = [self.compile(operand) for operand in node.tail]
+        return head, tail
+
+    def on_add(self, node: Add) -> Add:
+        """Handle `Add` node."""
+        head, tail = self._compile_operands(node)
+
+        def _(scope: Mapping[str, Double]) -> Double:
+            total = head(scope)
+            for operand in tail:
+                total += operand(scope)
+            return total
+
+        self.return_value = _
+        return node
+
+    def on_div(self, node: Div) -> Div:
+        """Handle `Div` node."""
+        head, tail = self._compile_operands(node)
+
+        def _(scope: Mapping[str, Double]) -> Double:
+            total = head(scope)
+            for operand in tail:
+                total /= operand(scope)
+            return total
+
+        self.return_value = _
+        return node
+
+    def on_mul(self, node: Mul) -> Mul:
+        """Handle `Mul` node."""
+        head, tail = self._compile_operands(node)
+
+        def _(scope: Mapping[str, Double]) -> Double:
+            total = head(scope)
+            for operand in tail:
+                total *= operand(scope)
+            return total
+
+        self.return_value = _
+        return node
+
+    def on_sub(self, node: Sub) -> Sub:
+        """Handle `Sub` node."""
+        head, tail = self._compile_operands(node)
+
+        def _(scope: Mapping[str, Double]) -> Double:
+            total = head(scope)
+            for operand in tail:
+                total -= operand(scope)
+            return total
+
+        self.return_value = _
+        return node
+
+    # Math :: Operators :: Unary
+
+    def on_neg(self, node: Neg) -> Neg:
+        """Handle `Neg` node."""
+        operand = self.compile(node.operand)
+        self.return_value = lambda scope: -operand(scope)
+        return node
+
+    def on_pos(self, node: Pos) -> Pos:
+        """Handle `Pos` node."""
+        operand = self.compile(node.operand)
+        self.return_value = lambda scope: +operand(scope)
+        return node
+
+    def on_variable(self, node: Variable) -> Variable:
+        """Handle `Variable` node."""
+        variable = node.variable
+        self.return_value = lambda scope: scope[variable]
+        return node
+
+    def on_constant(self, node: Constant) -> Constant:
+        """Handle `Constant` node."""
+        self.return_value = _constant(node.constant)
+        return node
+
+
+def _constant(value: Double) -> CompiledExpression:
+    return lambda _: value
+
+
+class CompiledMacro:
+    """Aperture macro with all expressions in its body compiled with
+    `ExpressionCompileVisitor`.
+
+    Macro is compiled once, when it is instantiated for the first time, and then
+    expressions of its primitives are evaluated with `evaluate()` for each aperture
+    created from it.
+    """
+
+    def __init__(self, macro: AM) -> None:
+        self.macro = macro
+        self._expressions: Dict[int, CompiledExpression] = {}
+
+        compiler = ExpressionCompileVisitor()
+        for primitive in macro.primitives:
+            self._compile_fields(primitive, compiler)
+
+    def _compile_fields(self, node: Node, compiler: ExpressionCompileVisitor) -> None:
+        for name in type(node).model_fields:
+            value = getattr(node, name)
+            values = value if isinstance(value, list) else [value]
+
+            for item in values:
+                if isinstance(item, Expression):
+                    self._expressions[id(item)] = compiler.compile(item)
+                elif isinstance(item, Node):
+                    self._compile_fields(item, compiler)
+
+    def evaluate(self, node: Expression, scope: Mapping[str, Double]) -> Double:
+        """Evaluate expression from body of the macro with given scope."""
+        return self._expressions[id(node)](scope)
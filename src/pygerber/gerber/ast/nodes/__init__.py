@@ -63,6 +63,7 @@ from pygerber.gerber.ast.nodes.d_codes.D01 import D01
 from pygerber.gerber.ast.nodes.d_codes.D02 import D02
 from pygerber.gerber.ast.nodes.d_codes.D03 import D03
 from pygerber.gerber.ast.nodes.d_codes.Dnn import Dnn
+from pygerber.gerber.ast.nodes.d_codes.Operations import Operations
 from pygerber.gerber.ast.nodes.enums import (
     AperFunction,
     AxisCorrespondence,
@@ -238,6 +239,7 @@ __all__ = [
     "Mul",
     "Neg",
     "Node",
+    "Operations",
     "PackedCoordinateStr",
     "Parenthesis",
     "Part",
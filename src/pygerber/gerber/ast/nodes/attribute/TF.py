@@ -224,12 +224,10 @@ class TF_MD5(TF):  # noqa: N801
         if self.source_info is None:
             raise SourceNotAvailableError(self)
 
-        source = (
-            self.source_info.source[: self.source_info.location - 1]
-            .replace("\n", "")
-            .replace("\r", "")
-            .encode("utf-8")
-        )
+        source = self.source_info.source[: self.source_info.location - 1]
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        source = source.replace(b"\n", b"").replace(b"\r", b"")
         source_hash = hashlib.md5(source).hexdigest()  # noqa: S324
         return source_hash == self.md5
 
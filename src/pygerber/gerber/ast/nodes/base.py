@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import bisect
+import mmap
+import re
+import weakref
 from abc import abstractmethod
-from typing import TYPE_CHECKING, Callable, Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
 
 import pyparsing as pp
 from pydantic import Field
@@ -11,45 +15,111 @@ from pydantic import Field
 from pygerber.gerber.ast.nodes.model import ModelType
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from typing_extensions import Self
 
     from pygerber.gerber.ast.ast_visitor import AstVisitor
 
+SourceBuffer = Union[bytes, mmap.mmap]
+"""Type of `bytes`-like objects containing Gerber source code which can be parsed
+without decoding them to `str`.
+"""
+
+
+class LineIndex:
+    """Sorted table of offsets of line starts within the source, used to resolve
+    locations to line and column numbers with binary search.
+
+    Single index is shared by all `SourceInfo` objects referring to the same source,
+    use `LineIndex.get()` to obtain it.
+    """
+
+    _instances: weakref.WeakValueDictionary[int, LineIndex] = (
+        weakref.WeakValueDictionary()
+    )
+
+    def __init__(self, source: Union[str, SourceBuffer]) -> None:
+        self.source = source
+
+    @classmethod
+    def get(cls, source: Union[str, SourceBuffer]) -> LineIndex:
+        """Get line index for the source, create it if it does not exist yet."""
+        # Index holds reference to the source, hence as long as index exists, `id()` of
+        # the source can not be reused by other object.
+        index = cls._instances.get(id(source))
+        if index is None or index.source is not source:
+            index = cls(source)
+            cls._instances[id(source)] = index
+        return index
+
+    @pp.cached_property
+    def offsets(self) -> list[int]:
+        """Offsets of line starts, first line starts at offset 0."""
+        matches: Iterator[re.Match[Any]]
+        if isinstance(self.source, str):
+            matches = re.finditer("\n", self.source)
+        else:
+            matches = re.finditer(b"\n", self.source)
+        return [0, *(match.end() for match in matches)]
+
+    def line(self, location: int) -> int:
+        """Get the line number of location within the source; the first line is line
+        1, newlines start new rows.
+        """
+        return bisect.bisect_right(self.offsets, location)
+
+    def column(self, location: int) -> int:
+        """Get the column number of location within the source; the first column is
+        column 1, newlines reset the column number to 1.
+        """
+        return location - self.offsets[self.line(location) - 1] + 1
+
 
 class SourceInfo(ModelType):
-    """Source information for the node."""
+    """Source information for the node.
+
+    Source information holds only offsets within the source, line and column numbers
+    are calculated on demand. Source may be either `str` or `bytes`-like object, eg.
+    memory mapped file, in which case offsets are expressed in bytes.
+    """
 
-    source: str
+    source: Union[str, SourceBuffer]
     location: int
     length: int
 
+    @pp.cached_property
+    def line_index(self) -> LineIndex:
+        """Get line index of the source, shared by all nodes parsed from it."""
+        return LineIndex.get(self.source)
+
     @pp.cached_property
     def line(self) -> int:
         """Get the line number of the start location within the string; the first line
         is line 1, newlines start new rows.
         """
-        return pp.lineno(self.location, self.source)
+        return self.line_index.line(self.location)
 
     @pp.cached_property
     def column(self) -> int:
         """Get the column number of the start location within the string; the first
         column is column 1, newlines reset the column number to 1.
         """
-        return pp.col(self.location, self.source)
+        return self.line_index.column(self.location)
 
     @pp.cached_property
     def end_line(self) -> int:
         """Get the line number of the end location within the string; the first line
         is line 1, newlines start new rows.
         """
-        return pp.lineno(self.location + self.length, self.source)
+        return self.line_index.line(self.location + self.length)
 
     @pp.cached_property
     def end_column(self) -> int:
         """Get the column number of the end location within the string; the first
         column is column 1, newlines reset the column number to 1.
         """
-        return pp.col(self.location + self.length, self.source)
+        return self.line_index.column(self.location + self.length)
 
     @pp.cached_property
     def end_location(self) -> int:
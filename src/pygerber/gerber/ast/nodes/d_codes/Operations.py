@@ -0,0 +1,190 @@
+"""`pygerber.nodes.d_codes.Operations` module contains definition of `Operations`
+class.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Union
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import field_serializer, field_validator, model_validator
+
+from pygerber.gerber.ast.nodes.base import Node
+from pygerber.gerber.ast.nodes.d_codes.D01 import D01
+from pygerber.gerber.ast.nodes.d_codes.D02 import D02
+from pygerber.gerber.ast.nodes.d_codes.D03 import D03
+from pygerber.gerber.ast.nodes.enums import Zeros
+from pygerber.gerber.ast.nodes.other.CoordinateI import CoordinateI
+from pygerber.gerber.ast.nodes.other.CoordinateJ import CoordinateJ
+from pygerber.gerber.ast.nodes.other.CoordinateX import CoordinateX
+from pygerber.gerber.ast.nodes.other.CoordinateY import CoordinateY
+from pygerber.gerber.ast.nodes.properties.FS import FS
+from pygerber.gerber.ast.nodes.types import PackedCoordinateStr
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from typing_extensions import Self
+
+    from pygerber.gerber.ast.ast_visitor import AstVisitor
+
+
+class Operations(Node):
+    """Represents run of D01, D02 and D03 commands stored in columnar form.
+
+    Each operation is described by a row of arrays, its code (1, 2 or 3), mask of
+    present coordinates and values of coordinates decoded with `fs` to integers in
+    units of the last decimal digit. Coordinates not present in operation are
+    stored as 0.
+
+    Original commands can be recreated with `iter_nodes()`, but they will not have
+    source information and their coordinates will be spelled in canonical form, ie.
+    without redundant zeros and `+` signs.
+    """
+
+    HAS_X: ClassVar[int] = 1
+    """Bit of mask set when operation has X coordinate."""
+    HAS_Y: ClassVar[int] = 2
+    """Bit of mask set when operation has Y coordinate."""
+    HAS_I: ClassVar[int] = 4
+    """Bit of mask set when operation has I coordinate."""
+    HAS_J: ClassVar[int] = 8
+    """Bit of mask set when operation has J coordinate."""
+
+    fs: FS
+
+    codes: npt.NDArray[np.uint8]
+    mask: npt.NDArray[np.uint8]
+
+    x: npt.NDArray[np.int64]
+    y: npt.NDArray[np.int64]
+    i: npt.NDArray[np.int64]
+    j: npt.NDArray[np.int64]
+
+    @field_validator("codes", "mask", mode="before")
+    @classmethod
+    def _validate_uint8_array(cls, value: Any) -> npt.NDArray[np.uint8]:
+        return _to_read_only_array(value, np.uint8)
+
+    @field_validator("x", "y", "i", "j", mode="before")
+    @classmethod
+    def _validate_int64_array(cls, value: Any) -> npt.NDArray[np.int64]:
+        return _to_read_only_array(value, np.int64)
+
+    @model_validator(mode="after")
+    def _validate_lengths(self) -> Self:
+        length = len(self.codes)
+        for array in (self.mask, self.x, self.y, self.i, self.j):
+            if len(array) != length:
+                msg = "All arrays of operations must have the same length."
+                raise ValueError(msg)
+        return self
+
+    @field_serializer("codes", "mask", "x", "y", "i", "j", when_used="json")
+    def _serialize_array(self, value: npt.NDArray[Any]) -> list[int]:
+        return value.tolist()  # type: ignore[no-any-return]
+
+    def visit(self, visitor: AstVisitor) -> Operations:
+        """Handle visitor call."""
+        return visitor.on_operations(self)
+
+    def get_visitor_callback_function(
+        self, visitor: AstVisitor
+    ) -> Callable[[Self], Operations]:
+        """Get callback function for the node."""
+        return visitor.on_operations
+
+    def __hash__(self) -> int:
+        return hash(
+            (
+                self.fs,
+                self.codes.tobytes(),
+                self.mask.tobytes(),
+                self.x.tobytes(),
+                self.y.tobytes(),
+                self.i.tobytes(),
+                self.j.tobytes(),
+            )
+        )
+
+    def __eq__(self, value: object) -> bool:
+        if isinstance(value, Operations):
+            return (
+                self.fs == value.fs
+                and self.source_info == value.source_info
+                and np.array_equal(self.codes, value.codes)
+                and np.array_equal(self.mask, value.mask)
+                and np.array_equal(self.x, value.x)
+                and np.array_equal(self.y, value.y)
+                and np.array_equal(self.i, value.i)
+                and np.array_equal(self.j, value.j)
+            )
+
+        return NotImplemented
+
+    def iter_nodes(self) -> Iterator[Union[D01, D02, D03]]:
+        """Iterate over D01, D02 and D03 nodes represented by this node."""
+        encode_x = _get_encoder(self.fs.zeros, self.fs.x_integral, self.fs.x_decimal)
+        encode_y = _get_encoder(self.fs.zeros, self.fs.y_integral, self.fs.y_decimal)
+
+        for code, mask, x, y, i, j in zip(
+            self.codes.tolist(),
+            self.mask.tolist(),
+            self.x.tolist(),
+            self.y.tolist(),
+            self.i.tolist(),
+            self.j.tolist(),
+        ):
+            x_node = (
+                CoordinateX(value=PackedCoordinateStr(encode_x(x)))
+                if mask & self.HAS_X
+                else None
+            )
+            y_node = (
+                CoordinateY(value=PackedCoordinateStr(encode_y(y)))
+                if mask & self.HAS_Y
+                else None
+            )
+
+            if code == 1:
+                yield D01(
+                    x=x_node,
+                    y=y_node,
+                    i=(
+                        CoordinateI(value=PackedCoordinateStr(encode_x(i)))
+                        if mask & self.HAS_I
+                        else None
+                    ),
+                    j=(
+                        CoordinateJ(value=PackedCoordinateStr(encode_y(j)))
+                        if mask & self.HAS_J
+                        else None
+                    ),
+                )
+            elif code == 2:  # noqa: PLR2004
+                yield D02(x=x_node, y=y_node)
+            else:
+                yield D03(x=x_node, y=y_node)
+
+
+def _to_read_only_array(value: Any, dtype: type[np.generic]) -> npt.NDArray[Any]:
+    array = np.array(value, dtype=dtype)
+    if array.ndim != 1:
+        msg = "Arrays of operations must be one dimensional."
+        raise ValueError(msg)
+    array.setflags(write=False)
+    return array
+
+
+def _get_encoder(zeros: Zeros, integral: int, decimal: int) -> Callable[[int], str]:
+    if zeros == Zeros.SKIP_TRAILING:
+        digits = integral + decimal
+
+        def _(value: int) -> str:
+            sign = "-" if value < 0 else ""
+            return sign + (str(abs(value)).rjust(digits, "0").rstrip("0") or "0")
+
+        return _
+
+    return str
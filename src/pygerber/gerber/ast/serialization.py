@@ -0,0 +1,122 @@
+"""The `serialization` module contains compact binary serialization of AST nodes and
+other pydantic models, eg. `RVMC`, used for passing them between processes and for
+storing them on disk.
+
+Serialized nodes do not contain source code they were parsed from, only offsets
+within it, hence source code must be provided again when nodes are loaded.
+"""
+
+from __future__ import annotations
+
+import gc
+import io
+import pickle
+from typing import TYPE_CHECKING, Any, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from pygerber.gerber.ast.nodes import SourceInfo
+
+if TYPE_CHECKING:
+    from pygerber.gerber.ast.nodes.base import SourceBuffer
+
+_object_setattr = object.__setattr__
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize object, possibly containing AST nodes, to bytes."""
+    buffer = io.BytesIO()
+    ModelPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buffer.getvalue()
+
+
+def loads(data: bytes, source: Union[str, SourceBuffer], offset: int = 0) -> Any:
+    """Deserialize object created with `dumps()`.
+
+    Parameters
+    ----------
+    data : bytes
+        Serialized object.
+    source : Union[str, SourceBuffer]
+        Source code nodes were parsed from, it will be referenced by source
+        information of loaded nodes.
+    offset : int, optional
+        Offset added to locations of all nodes, by default 0. Useful when nodes were
+        parsed from fragment of the source code.
+
+    """
+    # Loading creates huge amounts of objects, none of which can be garbage yet, but
+    # they still trigger garbage collection over and over, which otherwise takes
+    # majority of loading time.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return ModelUnpickler(io.BytesIO(data), source, offset).load()
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _restore_model(
+    cls: type[BaseModel], fields: dict[str, Any], fields_set: Optional[set[str]]
+) -> BaseModel:
+    instance = cls.__new__(cls)
+    _object_setattr(instance, "__dict__", fields)
+    _object_setattr(
+        instance,
+        "__pydantic_fields_set__",
+        set(fields) if fields_set is None else fields_set,
+    )
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+    return instance
+
+
+class ModelPickler(pickle.Pickler):
+    """Pickler which stores pydantic models in compact form and source information of
+    nodes without source code.
+    """
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple[int, int]]:
+        """Store source information as location and length only."""
+        if isinstance(obj, SourceInfo):
+            return obj.location, obj.length
+        return None
+
+    def reducer_override(self, obj: Any) -> Any:
+        """Store pydantic models as class and field values only."""
+        if (
+            not isinstance(obj, BaseModel)
+            or obj.__pydantic_extra__
+            or obj.__pydantic_private__
+        ):
+            return NotImplemented
+
+        fields_set = obj.__pydantic_fields_set__
+        return _restore_model, (
+            type(obj),
+            obj.__dict__,
+            # Usually all fields are explicitly set, then there is no need to store
+            # names of fields again.
+            None if len(fields_set) == len(obj.__dict__) else fields_set,
+        )
+
+
+class ModelUnpickler(pickle.Unpickler):
+    """Unpickler which restores source information of nodes stored by `ModelPickler`,
+    pointing them to the provided source code.
+    """
+
+    def __init__(
+        self, file: io.BytesIO, source: Union[str, SourceBuffer], offset: int = 0
+    ) -> None:
+        super().__init__(file)
+        self.source = source
+        self.offset = offset
+
+    def persistent_load(self, pid: Any) -> SourceInfo:
+        """Restore source information stored by `ModelPickler`."""
+        location, length = pid
+        return SourceInfo(
+            source=self.source, location=self.offset + location, length=length
+        )
@@ -4,15 +4,26 @@
 
 from __future__ import annotations
 
+from bisect import bisect_right
 from contextlib import suppress
 from enum import Enum
 from itertools import chain
-from typing import Any, Callable, Dict, Literal, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    TypeVar,
+)
 
+import numpy as np
 from pydantic import BaseModel, ConfigDict, Field
 
 from pygerber.common.error import throw
-from pygerber.gerber.ast.ast_visitor import AstVisitor
+from pygerber.gerber.ast.ast_visitor import FastAstVisitor
 from pygerber.gerber.ast.errors import (
     ApertureNotFoundError,
     ApertureNotSelectedError,
@@ -20,7 +31,9 @@ from pygerber.gerber.ast.errors import (
     DirectADHandlerDispatchNotSupportedError,
     PackedCoordinateTooLongError,
     PackedCoordinateTooShortError,
+    StateCheckpointsNotRecordedError,
 )
+from pygerber.gerber.ast.expression_compile_visitor import CompiledMacro
 from pygerber.gerber.ast.nodes import (
     AB,
     AD,
@@ -71,7 +84,7 @@ from pygerber.gerber.ast.nodes import (
     CoordinateY,
     Dnn,
     Double,
-    File,
+    Operations,
     PackedCoordinateStr,
 )
 from pygerber.gerber.ast.nodes.base import Node
@@ -85,6 +98,16 @@ from pygerber.gerber.ast.nodes.enums import (
     Zeros,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    import numpy.typing as npt
+
+_MAX_EXACT_DIGITS = 15
+"""Maximal number of digits of coordinate which is always exactly representable as
+float.
+"""
+
 
 class _StateModel(BaseModel):
     """Base class for all models representing parts of Gerber state."""
@@ -135,6 +158,81 @@ class CoordinateFormat(_StateModel):
         msg = "Coordinate format was not properly set."
         raise NotImplementedError(msg)  # pragma: no cover
 
+    def unpack_x_array(
+        self, coordinates: Sequence[PackedCoordinateStr], /
+    ) -> npt.NDArray[np.float64]:
+        """Unpack many X coordinates at once using the current coordinate format.
+
+        Values are equal to values returned by `unpack_x()` for each coordinate, but
+        they are decoded with vectorized NumPy operations.
+        """
+        return self._unpack_array(
+            coordinates, self.x_integral, self.x_decimal, self.unpack_x
+        )
+
+    def unpack_y_array(
+        self, coordinates: Sequence[PackedCoordinateStr], /
+    ) -> npt.NDArray[np.float64]:
+        """Unpack many Y coordinates at once using the current coordinate format.
+
+        Values are equal to values returned by `unpack_y()` for each coordinate, but
+        they are decoded with vectorized NumPy operations.
+        """
+        return self._unpack_array(
+            coordinates, self.y_integral, self.y_decimal, self.unpack_y
+        )
+
+    def _unpack_array(
+        self,
+        coordinates: Sequence[PackedCoordinateStr],
+        integer: int,
+        decimal: int,
+        unpack: Callable[[PackedCoordinateStr], Double],
+    ) -> npt.NDArray[np.float64]:
+        digits = integer + decimal
+
+        if digits > _MAX_EXACT_DIGITS:
+            return np.array([unpack(c) for c in coordinates], dtype=np.float64)
+
+        # Coordinates are laid out as rows of ASCII codes padded with zero bytes.
+        packed = np.array(coordinates, dtype=np.bytes_)
+        width = packed.dtype.itemsize
+        chars = packed.view(np.uint8).reshape(-1, width)
+
+        is_negative = chars[:, 0] == ord("-")
+        is_signed = is_negative | (chars[:, 0] == ord("+"))
+        length = np.count_nonzero(chars, axis=1) - is_signed
+
+        if np.any(too_long := length > digits):
+            coordinate = coordinates[int(np.argmax(too_long))]
+            raise PackedCoordinateTooLongError(coordinate, integer, decimal)
+
+        if np.any(too_short := length <= 0):
+            coordinate = coordinates[int(np.argmax(too_short))]
+            raise PackedCoordinateTooShortError(coordinate, integer, decimal)
+
+        end = is_signed + length
+        values = np.zeros(len(chars), dtype=np.int64)
+
+        for column in range(width):
+            # Characters other than digits wrap around to values greater than 9.
+            digit = chars[:, column] - np.uint8(ord("0"))
+            is_digit = (column >= is_signed) & (column < end)
+
+            invalid = is_digit & (digit > 9)  # noqa: PLR2004
+            if np.any(invalid):
+                coordinate = coordinates[int(np.argmax(invalid))]
+                msg = f"Invalid packed coordinate: {coordinate!r}"
+                raise ValueError(msg)
+
+            values = np.where(is_digit, values * 10 + digit, values)
+
+        if self.zeros == Zeros.SKIP_TRAILING:
+            values *= 10 ** (digits - length)
+
+        unpacked = values / 10.0**decimal
+        return np.where(is_negative, -unpacked, unpacked)
+
     def _unpack_skip_trailing(
         self, integer: int, decimal: int
     ) -> Callable[[PackedCoordinateStr], Double]:
@@ -358,6 +456,28 @@ class ApertureStorage(_StateModel):
     per_aperture_attributes: Dict[str, Dict[str, TA]] = Field(default_factory=dict)
     """Attributes assigned to apertures during creation."""
 
+    compiled_macros: Dict[str, CompiledMacro] = Field(
+        default_factory=dict, exclude=True
+    )
+    """Cache of compiled macro definitions, see `get_compiled_macro()`."""
+
+    def get_compiled_macro(self, name: str) -> Optional[CompiledMacro]:
+        """Get compiled macro definition with given name or None if macro is not
+        defined.
+
+        Macro is compiled on first use and compiled definition is reused until macro
+        is redefined.
+        """
+        macro = self.macros.get(name)
+        if macro is None:
+            return None
+
+        compiled = self.compiled_macros.get(name)
+        if compiled is None or compiled.macro is not macro:
+            compiled = self.compiled_macros[name] = CompiledMacro(macro)
+
+        return compiled
+
     def get_next_free_aperture_code(self) -> int:
         """Get next free aperture code."""
         return (
@@ -437,6 +557,107 @@ class State(_StateModel):
 
         raise ApertureNotFoundError(self.current_aperture_id)
 
+    def snapshot(self) -> State:
+        """Create copy of the state which can be modified without affecting the
+        original.
+
+        Nodes stored in the state are immutable, hence they are shared between the
+        copies and only containers holding them are copied.
+        """
+        apertures = self.apertures
+        attributes = self.attributes
+        return self.model_copy(
+            update={
+                "transform": self.transform.model_copy(),
+                "apertures": apertures.model_copy(
+                    update={
+                        "apertures": apertures.apertures.copy(),
+                        "blocks": apertures.blocks.copy(),
+                        "macros": apertures.macros.copy(),
+                        "compiled_macros": apertures.compiled_macros.copy(),
+                        "per_aperture_attributes": (
+                            apertures.per_aperture_attributes.copy()
+                        ),
+                    }
+                ),
+                "attributes": attributes.model_copy(
+                    update={
+                        "aperture_attributes": attributes.aperture_attributes.copy(),
+                        "file_attributes": attributes.file_attributes.copy(),
+                        "object_attributes": attributes.object_attributes.copy(),
+                    }
+                ),
+                "image_attributes": self.image_attributes.model_copy(),
+            }
+        )
+
+
+class _StateCheckpoint:
+    """Snapshot of visitor state taken before visiting top level node."""
+
+    __slots__ = (
+        "dispatch_d01_handler",
+        "index",
+        "on_d01_handler",
+        "on_d03_handler",
+        "state",
+    )
+
+    def __init__(self, visitor: StateTrackingVisitor, index: int) -> None:
+        self.index = index
+        self.state = visitor.state.snapshot()
+        self.on_d01_handler = visitor._on_d01_handler  # noqa: SLF001
+        self.on_d03_handler = visitor._on_d03_handler  # noqa: SLF001
+        self.dispatch_d01_handler = visitor._dispatch_d01_handler  # noqa: SLF001
+
+    def restore(self, visitor: StateTrackingVisitor) -> None:
+        """Restore visitor state from the checkpoint."""
+        visitor.state = self.state.snapshot()
+        visitor._transform_version += 1  # noqa: SLF001
+        visitor._attributes_version += 1  # noqa: SLF001
+        visitor._on_d01_handler = self.on_d01_handler  # noqa: SLF001
+        visitor._on_d03_handler = self.on_d03_handler  # noqa: SLF001
+        visitor._dispatch_d01_handler = self.dispatch_d01_handler  # noqa: SLF001
+
+
+_NODE_CALLBACK_NAMES = (
+    "on_draw_line",
+    "on_draw_cw_arc_sq",
+    "on_draw_cw_arc_mq",
+    "on_draw_ccw_arc_sq",
+    "on_draw_ccw_arc_mq",
+    "on_in_region_draw_line",
+    "on_in_region_draw_cw_arc_sq",
+    "on_in_region_draw_cw_arc_mq",
+    "on_in_region_draw_ccw_arc_sq",
+    "on_in_region_draw_ccw_arc_mq",
+    "on_flash_circle",
+    "on_flash_rectangle",
+    "on_flash_obround",
+    "on_flash_polygon",
+    "on_flash_macro",
+    "on_flash_block",
+)
+"""Names of draw and flash callbacks of `StateTrackingVisitor` receiving D01 or D03
+node.
+"""
+
+_IGNORES_NODE_COORDINATES = "_ignores_node_coordinates"
+
+CallbackT = TypeVar("CallbackT", bound=Callable[..., Any])
+
+
+def ignores_node_coordinates(function: CallbackT) -> CallbackT:
+    """Mark draw or flash callback, eg. `on_draw_line()`, overridden in subclass of
+    `StateTrackingVisitor` as one which reads coordinates of operation from visitor
+    state, eg. `coordinate_x`, instead of from node it receives.
+
+    `Operations` nodes are applied without recreating D01 and D03 nodes only when all
+    overridden draw and flash callbacks are marked.
+    """
+    setattr(function, _IGNORES_NODE_COORDINATES, True)
+    return function
+
 
 class ProgramStop(Exception):  # noqa: N818
     """Exception raised when M00 or M02 command is encountered."""
@@ -446,20 +667,41 @@ class ProgramStop(Exception):  # noqa: N818
         super().__init__()
 
 
-class StateTrackingVisitor(AstVisitor):
+class StateTrackingVisitor(FastAstVisitor):
     """`StateTrackingVisitor` is a visitor class that tracks the internal state
     defined in the Gerber X3 specification and modifies it according to Gerber
     commands.
 
     Additionally, it defines a set of higher level callback methods that extend
     interface of `AstVisitor` class.
+
+    When `checkpoint_interval` is set, visitor records snapshot of its state every
+    `checkpoint_interval` top level nodes, which allows `state_at()` to restore
+    state at any location in source by replaying only nodes following the nearest
+    snapshot.
     """
 
-    def __init__(self, *, ignore_program_stop: bool = False) -> None:
+    def __init__(
+        self,
+        *,
+        ignore_program_stop: bool = False,
+        checkpoint_interval: Optional[int] = None,
+    ) -> None:
         super().__init__()
         self._ignore_program_stop = ignore_program_stop
 
+        if checkpoint_interval is not None and checkpoint_interval < 1:
+            msg = "Checkpoint interval must be a positive integer."
+            raise ValueError(msg)
+
+        self._checkpoint_interval = checkpoint_interval
+        self._checkpoint_nodes: List[Node] = []
+        self._checkpoints: List[_StateCheckpoint] = []
+        self._checkpoint_locations: List[int] = []
+
         self.state = State()
+        self._transform_version = 0
+        self._attributes_version = 0
         self._on_d01_handler = self.on_draw_line
         self._plot_mode_to_d01_handler = {
             PlotMode.LINEAR: {
@@ -528,6 +770,25 @@ class StateTrackingVisitor(AstVisitor):
             return 0.0
         return coordinate
 
+    @property
+    def transform_version(self) -> int:
+        """Get number which changes every time mirroring, rotation or scaling of
+        apertures changes.
+
+        Values derived from those parameters can be cached until this number changes.
+        Polarity changes do not affect it.
+        """
+        return self._transform_version
+
+    @property
+    def attributes_version(self) -> int:
+        """Get number which changes every time aperture or object attributes change.
+
+        Values derived from those attributes can be cached until this number changes.
+        File attributes do not affect it.
+        """
+        return self._attributes_version
+
     @property
     def is_negative(self) -> bool:
         """Check if current aperture is negative."""
@@ -561,6 +822,7 @@ class StateTrackingVisitor(AstVisitor):
     def on_ta(self, node: TA) -> None:
         """Handle `TA_UserName` node."""
         self.state.attributes.aperture_attributes[node.attribute_name] = node
+        self._attributes_version += 1
 
     def on_tf(self, node: TF) -> None:
         """Handle `TF` node."""
@@ -569,9 +831,11 @@ class StateTrackingVisitor(AstVisitor):
     def on_to(self, node: TO) -> None:
         """Handle `TO` node."""
         self.state.attributes.object_attributes[node.attribute_name] = node
+        self._attributes_version += 1
 
     def on_td(self, node: TD) -> TD:
         """Handle `TD` node."""
+        self._attributes_version += 1
         if node.name is None:
             self.state.attributes.aperture_attributes.clear()
             self.state.attributes.object_attributes.clear()
@@ -630,6 +894,82 @@ class StateTrackingVisitor(AstVisitor):
         self._update_coordinates()
         return node
 
+    def on_operations(self, node: Operations) -> Operations:
+        """Handle `Operations` node.
+
+        Unless visitor overrides handling of D01, D02, D03 or coordinate nodes, or
+        overrides draw or flash callbacks, eg. `on_draw_line()`, without marking them
+        with `ignores_node_coordinates()`, operations are applied directly from
+        arrays, without recreating nodes. Then draw and flash callbacks receive nodes
+        without coordinates, coordinates of operation are available as
+        `coordinate_x`, `coordinate_y` etc. Otherwise nodes are recreated with
+        `Operations.iter_nodes()` and visited one by one.
+        """
+        if not self._is_operations_fast_path_supported():
+            return super().on_operations(node)
+
+        if self.state.coordinate_format is None:
+            raise CoordinateFormatNotSetError(node)
+
+        self._apply_operations(node)
+        return node
+
+    def _apply_operations(self, node: Operations) -> None:
+        state = self.state
+        x_scale = 10**node.fs.x_decimal
+        y_scale = 10**node.fs.y_decimal
+        d01 = D01()
+        d03 = D03()
+
+        for code, mask, x, y, i, j in zip(
+            node.codes.tolist(),
+            node.mask.tolist(),
+            node.x.tolist(),
+            node.y.tolist(),
+            node.i.tolist(),
+            node.j.tolist(),
+        ):
+            if mask & Operations.HAS_X:
+                state.coordinate_x = x / x_scale
+            if mask & Operations.HAS_Y:
+                state.coordinate_y = y / y_scale
+            if mask & Operations.HAS_I:
+                state.coordinate_i = i / x_scale
+            if mask & Operations.HAS_J:
+                state.coordinate_j = j / y_scale
+
+            if code == 1:
+                self._on_d01_handler(d01)
+                self._update_coordinates()
+            elif code == 2:  # noqa: PLR2004
+                self._update_coordinates()
+                if state.is_region:
+                    self.on_flush_region()
+            else:
+                self._on_d03_handler(d03, state.current_aperture)
+                self._update_coordinates()
+
+    def _is_operations_fast_path_supported(self) -> bool:
+        cls = type(self)
+        return all(
+            getattr(cls, name) is getattr(StateTrackingVisitor, name)
+            for name in (
+                "on_d01",
+                "on_d02",
+                "on_d03",
+                "on_coordinate",
+                "on_coordinate_x",
+                "on_coordinate_y",
+                "on_coordinate_i",
+                "on_coordinate_j",
+                "_update_coordinates",
+            )
+        ) and all(
+            getattr(cls, name) is getattr(StateTrackingVisitor, name)
+            or getattr(getattr(cls, name), _IGNORES_NODE_COORDINATES, False)
+            for name in _NODE_CALLBACK_NAMES
+        )
+
     def on_flash_circle(self, node: D03, aperture: ADC) -> None:
         """Handle `D03` node with `ADC` aperture."""
 
@@ -805,6 +1145,7 @@ class StateTrackingVisitor(AstVisitor):
         """Handle `LM` node."""
         super().on_lm(node)
         self.state.transform.mirroring = node.mirroring
+        self._transform_version += 1
         return node
 
     def on_ln(self, node: LN) -> LN:
@@ -823,12 +1164,14 @@ class StateTrackingVisitor(AstVisitor):
         """Handle `LR` node."""
         super().on_lr(node)
         self.state.transform.rotation = node.rotation
+        self._transform_version += 1
         return node
 
     def on_ls(self, node: LS) -> LS:
         """Handle `LS` node."""
         super().on_ls(node)
         self.state.transform.scaling = node.scale
+        self._transform_version += 1
         return node
 
     def on_m00(self, node: M00) -> M00:
@@ -939,11 +1282,68 @@ class StateTrackingVisitor(AstVisitor):
         self.state.image_attributes.b_axis_scale = node.b_scale
         return node
 
-    def on_file(self, node: File) -> File:
-        """Handle `File` node."""
+    def visit_nodes(self, nodes: Iterable[Node]) -> None:
+        """Visit top level nodes one by one, eg. as they are yielded by `iter_parse()`.
+
+        Visiting stops after program stop command is encountered.
+        """
+        if self._checkpoint_interval is not None:
+            nodes = self._iter_recording_checkpoints(nodes, self._checkpoint_interval)
+
         with suppress(ProgramStop):
-            super().on_file(node)
-        return node
+            super().visit_nodes(nodes)
+
+    def _iter_recording_checkpoints(
+        self, nodes: Iterable[Node], interval: int
+    ) -> Iterator[Node]:
+        self._checkpoint_nodes = []
+        self._checkpoints = []
+        self._checkpoint_locations = []
+        location = 0
+
+        for index, node in enumerate(nodes):
+            if index % interval == 0:
+                self._checkpoints.append(_StateCheckpoint(self, index))
+                self._checkpoint_locations.append(location)
+
+            self._checkpoint_nodes.append(node)
+            # Generator is resumed only after node was visited.
+            yield node
+
+            if node.source_info is not None:
+                location = node.source_info.end_location
+
+    def state_at(self, location: int) -> State:
+        """Get state before the first top level node which ends after `location`.
+
+        State is restored from the nearest checkpoint recorded during the last visit
+        and then only nodes following it are visited again, hence all callbacks of
+        visitor are invoked for them once more. After this call visitor holds the
+        returned state. Nodes without source information are considered to end
+        where the preceding node does.
+        """
+        if not self._checkpoints:
+            raise StateCheckpointsNotRecordedError
+
+        checkpoint_index = max(
+            bisect_right(self._checkpoint_locations, location) - 1, 0
+        )
+        checkpoint = self._checkpoints[checkpoint_index]
+        checkpoint.restore(self)
+
+        with suppress(ProgramStop):
+            super().visit_nodes(self._iter_nodes_until(checkpoint.index, location))
+
+        return self.state
+
+    def _iter_nodes_until(self, start: int, location: int) -> Iterator[Node]:
+        for node in self._checkpoint_nodes[start:]:
+            if (
+                node.source_info is not None
+                and node.source_info.end_location > location
+            ):
+                return
+            yield node
 
     def on_exception(self, node: Node, exception: Exception) -> bool:  # noqa: ARG002
         """Handle exception."""
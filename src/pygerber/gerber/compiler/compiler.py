@@ -4,12 +4,13 @@ abstract syntax tree to PyGerber rendering VM commands (RVMC).
 
 from __future__ import annotations
 
+import hashlib
 import math
-import time
 from math import cos, radians, sin
 from typing import TYPE_CHECKING, ClassVar, Optional
 
 from pygerber.gerber.ast.ast_visitor import AstVisitor
+from pygerber.gerber.ast.expression_compile_visitor import CompiledMacro
 from pygerber.gerber.ast.expression_eval_visitor import ExpressionEvalVisitor
 from pygerber.gerber.ast.nodes import (
     AB,
@@ -40,6 +41,7 @@ from pygerber.gerber.ast.nodes.aperture.SR import SR
 from pygerber.gerber.ast.nodes.types import ApertureIdStr, Double
 from pygerber.gerber.ast.state_tracking_visitor import (
     StateTrackingVisitor,
+    ignores_node_coordinates,
 )
 from pygerber.gerber.compiler.errors import (
     ContourBufferNotSetError,
@@ -51,6 +53,8 @@ from pygerber.vm.commands import (
     EndLayer,
     Line,
     PasteLayer,
+    PasteLayerBatch,
+    Polyline,
     Shape,
     ShapeSegment,
     StartLayer,
@@ -61,8 +65,12 @@ from pygerber.vm.types import Box, LayerID, Matrix3x3, Vector
 from pygerber.vm.vm import DrawCmdT
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from typing_extensions import Protocol
 
+    from pygerber.gerber.ast.nodes import Node
+
     class _ArcFactory(Protocol):
         def __call__(
             self,
@@ -72,10 +80,85 @@ if TYPE_CHECKING:
             thickness: float,
             *,
             is_negative: bool,
-            metadata: Optional[dict[str, str]] = None,
+            metadata_id: Optional[int] = None,
         ) -> Shape: ...
 
 
+MIN_FLASH_BATCH_SIZE = 4
+"""Minimal number of consecutive flashes merged into `PasteLayerBatch` command."""
+
+
+class _FlashRun:
+    """Consecutive pastes of the same layer with the same polarity and metadata."""
+
+    __slots__ = ("centers", "is_negative", "metadata_id", "source_layer_id")
+
+    def __init__(
+        self,
+        source_layer_id: str,
+        *,
+        is_negative: bool,
+        metadata_id: Optional[int],
+    ) -> None:
+        self.source_layer_id = source_layer_id
+        self.is_negative = is_negative
+        self.metadata_id = metadata_id
+        self.centers: list[tuple[float, float]] = []
+
+    def to_commands(self) -> list[PasteLayer | PasteLayerBatch]:
+        """Convert run to paste commands.
+
+        Runs shorter than `MIN_FLASH_BATCH_SIZE` are converted to separate
+        `PasteLayer` commands, as for them batching costs VMs more than it saves.
+        """
+        if len(self.centers) < MIN_FLASH_BATCH_SIZE:
+            return [
+                PasteLayer(
+                    source_layer_id=LayerID(id=self.source_layer_id),
+                    center=Vector.from_tuple(center),
+                    is_negative=self.is_negative,
+                    metadata_id=self.metadata_id,
+                )
+                for center in self.centers
+            ]
+        return [
+            PasteLayerBatch(
+                source_layer_id=LayerID(id=self.source_layer_id),
+                centers=self.centers,
+                is_negative=self.is_negative,
+                metadata_id=self.metadata_id,
+            )
+        ]
+
+
+class _LineRun:
+    """Consecutive connected lines with the same width, polarity and metadata."""
+
+    __slots__ = ("is_negative", "metadata_id", "points", "width")
+
+    def __init__(
+        self,
+        start: Vector,
+        width: float,
+        *,
+        is_negative: bool,
+        metadata_id: Optional[int],
+    ) -> None:
+        self.width = width
+        self.is_negative = is_negative
+        self.metadata_id = metadata_id
+        self.points: list[Vector] = [start]
+
+    def to_command(self) -> Polyline:
+        """Convert run to polyline command."""
+        return Polyline(
+            points=self.points,
+            width=self.width,
+            is_negative=self.is_negative,
+            metadata_id=self.metadata_id,
+        )
+
+
 class CommandBuffer:
     """Container for commands and metadata about relations with other containers."""
 
@@ -87,6 +170,8 @@ class CommandBuffer:
         commands: list[DrawCmdT],
         depends_on: set[str],
         resolved_dependencies: list[CommandBuffer],
+        *,
+        draw_on_paste: bool = False,
     ) -> None:
         self.id_str = id_
         self.commands = commands
@@ -94,21 +179,115 @@ class CommandBuffer:
         self.origin = origin
         self.depends_on = depends_on
         self.resolved_dependencies = resolved_dependencies
+        self.draw_on_paste = draw_on_paste
+        self._open_line_run: Optional[_LineRun] = None
+        self._open_flash_run: Optional[_FlashRun] = None
 
     @property
     def layer_id(self) -> LayerID:
         """Get layer id."""
         return LayerID(id=self.id_str)
 
+    def flush(self) -> None:
+        """Append pending run of lines or flashes to commands.
+
+        Must be called before commands of buffer are used.
+        """
+        if self._open_line_run is not None:
+            self.commands.append(self._open_line_run.to_command())
+            self._open_line_run = None
+        if self._open_flash_run is not None:
+            self.commands.extend(self._open_flash_run.to_commands())
+            self._open_flash_run = None
+
     def append_shape(self, command: Shape) -> None:
         """Append command to buffer."""
+        self.flush()
         self.commands.append(command)
 
-    def append_paste(self, command: PasteLayer) -> None:
+    def append_polyline(self, command: Polyline) -> None:
         """Append command to buffer."""
+        self.flush()
+        self.commands.append(command)
+
+    def append_paste(self, command: PasteLayer | PasteLayerBatch) -> None:
+        """Append command to buffer."""
+        self.flush()
         self.depends_on.add(command.source_layer_id.id)
         self.commands.append(command)
 
+    def append_flash(
+        self,
+        source_layer_id: str,
+        center: tuple[float, float],
+        *,
+        is_negative: bool,
+        metadata_id: Optional[int],
+    ) -> None:
+        """Append paste of layer to buffer.
+
+        Consecutive pastes of the same layer with the same polarity and metadata are
+        merged into single `PasteLayerBatch` command when buffer is flushed.
+        """
+        flash_run = self._open_flash_run
+        if (
+            flash_run is None
+            or flash_run.source_layer_id != source_layer_id
+            or flash_run.is_negative != is_negative
+            or flash_run.metadata_id != metadata_id
+        ):
+            self.flush()
+            self.depends_on.add(source_layer_id)
+            flash_run = _FlashRun(
+                source_layer_id, is_negative=is_negative, metadata_id=metadata_id
+            )
+            self._open_flash_run = flash_run
+
+        flash_run.centers.append(center)
+
+    def append_line(
+        self,
+        start: Vector,
+        end: Vector,
+        width: float,
+        *,
+        is_negative: bool,
+        metadata_id: Optional[int],
+    ) -> None:
+        """Append straight line to buffer.
+
+        Consecutive lines, each starting where previous one ends, with the same
+        width, polarity and metadata are merged into single `Polyline` command when
+        buffer is flushed.
+        """
+        line_run = self._open_line_run
+        if (
+            line_run is None
+            or line_run.points[-1] != start
+            or line_run.width != width
+            or line_run.is_negative != is_negative
+            or line_run.metadata_id != metadata_id
+        ):
+            self.flush()
+            line_run = _LineRun(
+                start, width, is_negative=is_negative, metadata_id=metadata_id
+            )
+            self._open_line_run = line_run
+
+        line_run.points.append(end)
+
+
+def _get_commands_content_hash(commands: Iterable[DrawCmdT]) -> str:
+    """Get hash of commands which is equal for buffers drawing exactly the same
+    geometry with the same metadata.
+    """
+    content_hash = hashlib.sha256()
+    for command in commands:
+        content_hash.update(
+            command.model_dump_json(serialize_as_any=True).encode("utf-8")
+        )
+    return content_hash.hexdigest()
+
 
 def _convert_attributes_to_metadata(
     attributes: dict[str, TA] | dict[str, TF] | dict[str, TO],
@@ -122,6 +301,16 @@ def _convert_attributes_to_metadata(
 class Compiler(StateTrackingVisitor):
     """Compiler for transforming transforming Gerber (AST) to PyGerber rendering VM
     commands (RVMC).
+
+    IDs of all layers created by compiler are deterministic. They are derived from
+    aperture IDs, transformation matrices and hashes of layer content, hence
+    compiling the same AST always produces RVMC which is identical byte-for-byte,
+    regardless of process or machine it was compiled on.
+
+    When `include_metadata` is set, aperture and object attributes are converted to
+    metadata only after `TA`, `TO` or `TD` command changes them. Each distinct set of
+    attributes is stored once in `RVMC.metadata_table` and commands reference it with
+    `metadata_id`.
     """
 
     MAIN_BUFFER_ID: ClassVar[str] = "%main%"
@@ -133,6 +322,15 @@ class Compiler(StateTrackingVisitor):
         self._include_metadata = include_metadata
         self._buffers: dict[str, CommandBuffer] = {}
         self._buffer_stack: list[str] = []
+        self._buffer_aliases: dict[str, str] = {}
+        self._aperture_transform_version = -1
+        self._aperture_transform_matrix = Matrix3x3.new_scale(1.0, 1.0)
+        self._aperture_buffer_cache: dict[str, CommandBuffer] = {}
+        self._metadata_table: list[dict[str, str]] = []
+        self._metadata_ids: dict[tuple[tuple[str, str], ...], int] = {}
+        self._metadata_attributes_version = -1
+        self._aperture_metadata_id: Optional[int] = None
+        self._object_metadata_id: Optional[int] = None
         self._contour_buffer: Optional[list[ShapeSegment]] = []
         self._create_main_buffer()
 
@@ -152,20 +350,63 @@ class Compiler(StateTrackingVisitor):
         """Get buffer by id."""
         return self._buffers.get(id_)
 
+    def _deduplicate_buffer(self, buffer: CommandBuffer) -> str:
+        """Replace aperture buffer with buffer with ID derived from its content.
+
+        Aperture ID becomes an alias of that buffer, so all flashes of apertures with
+        identical content share one layer and one set of transformed variants.
+        Content derived IDs are never reused for different content, hence redefinition
+        of aperture only changes its own alias. Returns ID of buffer which should be
+        used.
+        """
+        aperture_id = buffer.id_str
+        self._del_buffer(aperture_id)
+        canonical_id = self._get_buffer_with_content_id("%%AD%", buffer).id_str
+        self._buffer_aliases[aperture_id] = canonical_id
+
+        return canonical_id
+
+    def _get_buffer_with_content_id(
+        self, prefix: str, buffer: CommandBuffer
+    ) -> CommandBuffer:
+        """Get registered buffer with ID derived from hash of `buffer` content.
+
+        If there is no such buffer yet, `buffer` is renamed and registered.
+        """
+        id_ = f"{prefix}{_get_commands_content_hash(buffer.commands)}"
+        existing_buffer = self._get_buffer_opt(id_)
+        if existing_buffer is not None:
+            return existing_buffer
+
+        buffer.id_str = id_
+        self._set_buffer(buffer)
+        return buffer
+
+    def _resolve_buffer_alias(self, id_: str) -> str:
+        """Get ID of buffer which given ID refers to."""
+        return self._buffer_aliases.get(id_, id_)
+
     def _get_current_buffer(self) -> CommandBuffer:
         return self._get_buffer(self._buffer_stack[-1])
 
     def _append_shape_to_current_buffer(self, command: Shape) -> None:
         self._get_current_buffer().append_shape(command)
 
-    def _append_paste_to_current_buffer(self, command: PasteLayer) -> None:
+    def _append_polyline_to_current_buffer(self, command: Polyline) -> None:
+        self._get_current_buffer().append_polyline(command)
+
+    def _append_paste_to_current_buffer(
+        self, command: PasteLayer | PasteLayerBatch
+    ) -> None:
         self._get_current_buffer().append_paste(command)
 
     def _expand_buffer_to_current_buffer(self, buffer: CommandBuffer) -> None:
         for command in buffer.commands:
             if isinstance(command, Shape):
                 self._append_shape_to_current_buffer(command)
-            elif isinstance(command, PasteLayer):
+            elif isinstance(command, Polyline):
+                self._append_polyline_to_current_buffer(command)
+            elif isinstance(command, (PasteLayer, PasteLayerBatch)):
                 self._append_paste_to_current_buffer(command)
             else:
                 raise NotImplementedError(type(command))
@@ -189,7 +430,7 @@ class Compiler(StateTrackingVisitor):
         self._buffer_stack.append(id_)
 
     def _pop_buffer(self) -> None:
-        self._buffer_stack.pop()
+        self._get_buffer(self._buffer_stack.pop()).flush()
 
     def _get_line_thickness(self, line_direction: Vector) -> float:
         current_aperture = self.state.current_aperture
@@ -223,53 +464,105 @@ class Compiler(StateTrackingVisitor):
         return node
 
     def on_sr(self, node: SR) -> SR:
-        """Handle `SR` node."""
-        aperture_buffer = self._create_aperture_buffer(
-            ApertureIdStr(f"%%SR%{id(node)}%{time.time():.0f}")
-        )
+        """Handle `SR` node.
+
+        Body of SR block is compiled into single layer, which is pasted at every
+        repeat position. Layer is marked with `draw_on_paste`, so raster VMs draw its
+        commands at every position instead of copying its image, which gives the same
+        result as expanded block. Blocks containing clear polarity objects are
+        expanded by compiler.
+        """
+        aperture_buffer = self._create_aperture_buffer(ApertureIdStr("%%SR%"))
         self._push_buffer(aperture_buffer.id_str)
 
         super().on_sr(node)
 
         self._pop_buffer()
+        self._del_buffer(aperture_buffer.id_str)
 
-        buffer = self._get_buffer(aperture_buffer.id_str)
+        if len(aperture_buffer.commands) == 0:
+            return node
 
         x_delta = node.open.x_delta
         y_delta = node.open.y_delta
 
+        is_instanced = self._can_instance_step_and_repeat(aperture_buffer)
+
+        if is_instanced:
+            # Layer ID is derived from content of block to make it deterministic.
+            buffer = self._get_buffer_with_content_id("%%SR%", aperture_buffer)
+            buffer.draw_on_paste = True
+        else:
+            buffer = aperture_buffer
+
         for x in range(node.open.x_repeats):
             for y in range(node.open.y_repeats):
                 x_coordinate = self.coordinate_x + (x * x_delta)
                 y_coordinate = self.coordinate_y + (y * y_delta)
+
+                if is_instanced:
+                    self._get_current_buffer().append_flash(
+                        buffer.id_str,
+                        (x_coordinate, y_coordinate),
+                        is_negative=False,
+                        metadata_id=None,
+                    )
+                    continue
+
                 tmp_buffer = self._apply_transform_to_buffer_non_recursive_tmp(
                     buffer, Matrix3x3.new_translate(x=x_coordinate, y=y_coordinate)
                 )
 
                 self._expand_buffer_to_current_buffer(tmp_buffer)
 
-        self._del_buffer(aperture_buffer.id_str)
         return node
 
-    def _get_aperture_metadata(self) -> Optional[dict[str, str]]:
+    def _can_instance_step_and_repeat(self, buffer: CommandBuffer) -> bool:
+        # Clear objects in SR block clear also objects below the block, which can't
+        # be expressed by pasting a layer, hence such blocks have to be expanded.
+        return not any(cmd.is_negative for cmd in buffer.commands)
+
+    def _update_metadata_ids(self) -> None:
+        """Intern metadata of currently active aperture and object attributes."""
+        self._metadata_attributes_version = self.attributes_version
+        self._aperture_metadata_id = self._intern_metadata(
+            _convert_attributes_to_metadata(self.state.attributes.aperture_attributes)
+        )
+        self._object_metadata_id = self._intern_metadata(
+            _convert_attributes_to_metadata(self.state.attributes.object_attributes)
+        )
+
+    def _intern_metadata(self, metadata: dict[str, str]) -> int:
+        """Get index of metadata in metadata table, adding it if necessary."""
+        key = tuple(sorted(metadata.items()))
+        metadata_id = self._metadata_ids.get(key)
+
+        if metadata_id is None:
+            metadata_id = len(self._metadata_table)
+            self._metadata_table.append(metadata)
+            self._metadata_ids[key] = metadata_id
+
+        return metadata_id
+
+    def _get_aperture_metadata_id(self) -> Optional[int]:
         if self._include_metadata:
-            return _convert_attributes_to_metadata(
-                self.state.attributes.aperture_attributes
-            )
+            if self._metadata_attributes_version != self.attributes_version:
+                self._update_metadata_ids()
+            return self._aperture_metadata_id
         return None
 
     def on_adc(self, node: ADC) -> ADC:
         """Handle `AD` circle node."""
         self.on_ad(node)
         aperture_buffer = self._create_aperture_buffer(node.aperture_id)
-        metadata = self._get_aperture_metadata()
+        metadata_id = self._get_aperture_metadata_id()
 
         aperture_buffer.append_shape(
             Shape.new_circle(
                 (0.0, 0.0),
                 node.diameter,
                 is_negative=False,
-                metadata=metadata,
+                metadata_id=metadata_id,
             )
         )
         if node.hole_diameter is not None and node.hole_diameter > 0:
@@ -278,9 +571,10 @@ class Compiler(StateTrackingVisitor):
                     (0.0, 0.0),
                     min(node.hole_diameter, node.diameter),
                     is_negative=True,
-                    metadata=metadata,
+                    metadata_id=metadata_id,
                 )
             )
+        self._deduplicate_buffer(aperture_buffer)
         return node
 
     def _create_aperture_buffer(self, aperture_id: ApertureIdStr) -> CommandBuffer:
@@ -292,6 +586,8 @@ class Compiler(StateTrackingVisitor):
             depends_on=set(),
             resolved_dependencies=[],
         )
+        self._buffer_aliases.pop(aperture_id, None)
+        self._aperture_buffer_cache.pop(aperture_id, None)
         self._set_buffer(buffer)
 
         return buffer
@@ -300,7 +596,7 @@ class Compiler(StateTrackingVisitor):
         """Handle `AD` rectangle node."""
         self.on_ad(node)
         aperture_buffer = self._create_aperture_buffer(node.aperture_id)
-        metadata = self._get_aperture_metadata()
+        metadata_id = self._get_aperture_metadata_id()
 
         aperture_buffer.append_shape(
             Shape.new_rectangle(
@@ -308,7 +604,7 @@ class Compiler(StateTrackingVisitor):
                 node.width,
                 node.height,
                 is_negative=False,
-                metadata=metadata,
+                metadata_id=metadata_id,
             )
         )
         if node.hole_diameter is not None and node.hole_diameter > 0:
@@ -317,16 +613,17 @@ class Compiler(StateTrackingVisitor):
                     (0.0, 0.0),
                     min(node.hole_diameter, node.width, node.height),
                     is_negative=True,
-                    metadata=metadata,
+                    metadata_id=metadata_id,
                 )
             )
+        self._deduplicate_buffer(aperture_buffer)
         return node
 
     def on_ado(self, node: ADO) -> ADO:
         """Handle `AD` obround node."""
         self.on_ad(node)
         aperture_buffer = self._create_aperture_buffer(node.aperture_id)
-        metadata = self._get_aperture_metadata()
+        metadata_id = self._get_aperture_metadata_id()
 
         aperture_buffer.append_shape(
             Shape.new_obround(
@@ -334,7 +631,7 @@ class Compiler(StateTrackingVisitor):
                 node.width,
                 node.height,
                 is_negative=False,
-                metadata=metadata,
+                metadata_id=metadata_id,
             )
         )
         if node.hole_diameter is not None and node.hole_diameter > 0:
@@ -343,16 +640,17 @@ class Compiler(StateTrackingVisitor):
                     (0.0, 0.0),
                     min(node.hole_diameter, node.width, node.height),
                     is_negative=True,
-                    metadata=metadata,
+                    metadata_id=metadata_id,
                 )
             )
+        self._deduplicate_buffer(aperture_buffer)
         return node
 
     def on_adp(self, node: ADP) -> ADP:
         """Handle `AD` polygon node."""
         self.on_ad(node)
         aperture_buffer = self._create_aperture_buffer(node.aperture_id)
-        metadata = self._get_aperture_metadata()
+        metadata_id = self._get_aperture_metadata_id()
 
         aperture_buffer.append_shape(
             Shape.new_polygon(
@@ -361,7 +659,7 @@ class Compiler(StateTrackingVisitor):
                 node.vertices,
                 node.rotation or 0.0,
                 is_negative=False,
-                metadata=metadata,
+                metadata_id=metadata_id,
             )
         )
         if node.hole_diameter is not None and node.hole_diameter > 0:
@@ -370,39 +668,50 @@ class Compiler(StateTrackingVisitor):
                     (0.0, 0.0),
                     min(node.hole_diameter, node.outer_diameter),
                     is_negative=True,
-                    metadata=metadata,
+                    metadata_id=metadata_id,
                 )
             )
+        self._deduplicate_buffer(aperture_buffer)
         return node
 
     def on_ad_macro(self, node: ADmacro) -> ADmacro:
         """Handle `AD` macro node."""
         self.on_ad(node)
         aperture_buffer = self._create_aperture_buffer(node.aperture_id)
-        metadata = self._get_aperture_metadata()
+        metadata_id = self._get_aperture_metadata_id()
 
         if node.params is None:
             scope = {}
         else:
             scope = {f"${i + 1}": param for i, param in enumerate(node.params)}
 
-        macro = self.state.apertures.macros.get(node.name)
-        if macro is None:
+        compiled_macro = self.state.apertures.get_compiled_macro(node.name)
+        if compiled_macro is None:
             raise MacroNotDefinedError(node.name)
 
-        macro.visit(MacroEvalVisitor(self, aperture_buffer, scope, metadata=metadata))
+        compiled_macro.macro.visit(
+            MacroEvalVisitor(
+                self,
+                aperture_buffer,
+                scope,
+                metadata_id=metadata_id,
+                compiled_macro=compiled_macro,
+            )
+        )
+        self._deduplicate_buffer(aperture_buffer)
         return node
 
-    def _get_object_metadata(self) -> Optional[dict[str, str]]:
+    def _get_object_metadata_id(self) -> Optional[int]:
         if self._include_metadata:
-            return _convert_attributes_to_metadata(
-                self.state.attributes.object_attributes
-            )
+            if self._metadata_attributes_version != self.attributes_version:
+                self._update_metadata_ids()
+            return self._object_metadata_id
         return None
 
+    @ignores_node_coordinates
     def on_draw_line(self, node: D01) -> None:  # noqa: ARG002
         """Handle `D01` node in linear interpolation mode."""
-        metadata = self._get_object_metadata()
+        metadata_id = self._get_object_metadata_id()
 
         start_x = self.state.current_x
         start_y = self.state.current_y
@@ -415,38 +724,32 @@ class Compiler(StateTrackingVisitor):
         thickness = self._get_line_thickness(
             Vector.from_tuple((self.coordinate_x, self.coordinate_y))
         )
-        self._append_shape_to_current_buffer(
-            Shape.new_circle(
-                start_point,
-                thickness,
-                is_negative=self.is_negative,
-                metadata=metadata,
-            )
-        )
-        self._append_shape_to_current_buffer(
-            Shape.new_line(
-                start_point,
-                end_point,
-                thickness=thickness,
-                is_negative=self.is_negative,
-                metadata=metadata,
-            ),
-        )
-        self._append_shape_to_current_buffer(
-            Shape.new_circle(
-                end_point,
-                thickness,
-                is_negative=self.is_negative,
-                metadata=metadata,
+        if start_point == end_point:
+            self._append_shape_to_current_buffer(
+                Shape.new_circle(
+                    start_point,
+                    thickness,
+                    is_negative=self.is_negative,
+                    metadata_id=metadata_id,
+                )
             )
+            return
+
+        self._get_current_buffer().append_line(
+            Vector.from_tuple(start_point),
+            Vector.from_tuple(end_point),
+            thickness,
+            is_negative=self.is_negative,
+            metadata_id=metadata_id,
         )
 
+    @ignores_node_coordinates
     def on_draw_cw_arc_mq(self, node: D01) -> None:  # noqa: ARG002
         """Handle `D01` node in clockwise circular interpolation multi quadrant mode."""
         self._on_draw_arc_mq(Shape.new_cw_arc)
 
     def _on_draw_arc_mq(self, factory_method: _ArcFactory) -> None:
-        metadata = self._get_object_metadata()
+        metadata_id = self._get_object_metadata_id()
 
         start_x = self.state.current_x
         start_y = self.state.current_y
@@ -469,7 +772,7 @@ class Compiler(StateTrackingVisitor):
                 start_point,
                 thickness,
                 is_negative=self.is_negative,
-                metadata=metadata,
+                metadata_id=metadata_id,
             )
         )
         if start_point == end_point:
@@ -484,7 +787,7 @@ class Compiler(StateTrackingVisitor):
                     center,
                     thickness,
                     is_negative=self.is_negative,
-                    metadata=metadata,
+                    metadata_id=metadata_id,
                 )
             )
             self._append_shape_to_current_buffer(
@@ -494,7 +797,7 @@ class Compiler(StateTrackingVisitor):
                     center,
                     thickness,
                     is_negative=self.is_negative,
-                    metadata=metadata,
+                    metadata_id=metadata_id,
                 )
             )
 
@@ -506,7 +809,7 @@ class Compiler(StateTrackingVisitor):
                     center,
                     thickness,
                     is_negative=self.is_negative,
-                    metadata=metadata,
+                    metadata_id=metadata_id,
                 )
             )
         self._append_shape_to_current_buffer(
@@ -514,10 +817,11 @@ class Compiler(StateTrackingVisitor):
                 end_point,
                 thickness,
                 is_negative=self.is_negative,
-                metadata=metadata,
+                metadata_id=metadata_id,
             )
         )
 
+    @ignores_node_coordinates
     def on_draw_ccw_arc_mq(self, node: D01) -> None:  # noqa: ARG002
         """Handle `D01` node in counter-clockwise circular interpolation multi quadrant
         mode.
@@ -529,6 +833,7 @@ class Compiler(StateTrackingVisitor):
         super().on_start_region()
         self._contour_buffer = []
 
+    @ignores_node_coordinates
     def on_in_region_draw_line(self, node: D01) -> None:  # noqa: ARG002
         """Handle `D01` node in linear interpolation mode in region."""
         if self._contour_buffer is None:
@@ -544,6 +849,7 @@ class Compiler(StateTrackingVisitor):
 
         self._contour_buffer.append(Line.from_tuples(start_point, end_point))
 
+    @ignores_node_coordinates
     def on_in_region_draw_cw_arc_mq(self, node: D01) -> None:  # noqa: ARG002
         """Handle `D01` node in clockwise circular interpolation multi quadrant mode
         within region statement.
@@ -596,25 +902,16 @@ class Compiler(StateTrackingVisitor):
                 )
             )
 
+    @ignores_node_coordinates
     def on_in_region_draw_ccw_arc_mq(self, node: D01) -> None:  # noqa: ARG002
         """Handle `D01` node in counter-clockwise circular interpolation multi quadrant
         mode within region statement.
         """
         self._on_in_region_draw_arc_mq(is_clockwise=False)
 
-    def _get_region_metadata(self) -> Optional[dict[str, str]]:
-        if self._include_metadata:
-            metadata = _convert_attributes_to_metadata(
-                self.state.attributes.object_attributes
-            )
-            metadata.update(
-                _convert_attributes_to_metadata(self.state.attributes.object_attributes)
-            )
-        return None
-
     def on_flush_region(self) -> None:
         """Handle flush region after D02 command or after G37."""
-        metadata = self._get_region_metadata()
+        metadata_id = self._get_object_metadata_id()
 
         if self._contour_buffer is None:
             raise ContourBufferNotSetError
@@ -624,7 +921,7 @@ class Compiler(StateTrackingVisitor):
                 Shape(
                     commands=self._contour_buffer,
                     is_negative=self.is_negative,
-                    metadata=metadata,
+                    metadata_id=metadata_id,
                 )
             )
 
@@ -635,34 +932,51 @@ class Compiler(StateTrackingVisitor):
         super().on_end_region()
         self._contour_buffer = None
 
+    @ignores_node_coordinates
     def on_flash_circle(self, node: D03, aperture: ADC) -> None:  # noqa: ARG002
         """Handle `D03` node with `ADC` aperture."""
         self._on_flash_aperture(aperture.aperture_id)
 
     def _on_flash_aperture(self, aperture_id: ApertureIdStr) -> None:
-        metadata = self._get_object_metadata()
+        metadata_id = self._get_object_metadata_id()
 
         buffer = self._get_aperture_buffer(aperture_id)
 
-        self._append_paste_to_current_buffer(
-            PasteLayer(
-                source_layer_id=buffer.layer_id,
-                center=Vector(x=self.coordinate_x, y=self.coordinate_y),
-                is_negative=self.is_negative,
-                metadata=metadata,
-            ),
+        self._get_current_buffer().append_flash(
+            buffer.id_str,
+            (self.coordinate_x, self.coordinate_y),
+            is_negative=self.is_negative,
+            metadata_id=metadata_id,
         )
 
     def _get_aperture_buffer(self, aperture_id: str) -> CommandBuffer:
+        if self._aperture_transform_version != self.transform_version:
+            self._update_aperture_transform()
+
+        buffer = self._aperture_buffer_cache.get(aperture_id)
+
+        if buffer is None:
+            buffer = self._get_buffer_with_transform(
+                self._resolve_buffer_alias(aperture_id),
+                self._aperture_transform_matrix,
+            )
+            self._aperture_buffer_cache[aperture_id] = buffer
+
+        return buffer
+
+    def _update_aperture_transform(self) -> None:
+        """Recalculate aperture transform matrix after LM, LR or LS command."""
         transform = self.state.transform
 
         mirroring_matrix = Matrix3x3.new_reflect(**transform.mirroring.kwargs)
         rotation_matrix = Matrix3x3.new_rotate(transform.rotation)
         scale_matrix = Matrix3x3.new_scale(transform.scaling, transform.scaling)
 
-        transform_matrix = mirroring_matrix @ rotation_matrix @ scale_matrix
-
-        return self._get_buffer_with_transform(aperture_id, transform_matrix)
+        self._aperture_transform_matrix = (
+            mirroring_matrix @ rotation_matrix @ scale_matrix
+        )
+        self._aperture_transform_version = self.transform_version
+        self._aperture_buffer_cache.clear()
 
     def _get_buffer_with_transform(
         self, aperture_id: str, transform_matrix: Matrix3x3
@@ -687,7 +1001,7 @@ class Compiler(StateTrackingVisitor):
         depends_on: set[str] = set()
 
         for cmd in buffer.commands:
-            if isinstance(cmd, Shape):
+            if isinstance(cmd, (Shape, Polyline)):
                 commands.append(cmd.transform(transform_matrix))
 
             elif isinstance(cmd, PasteLayer):
@@ -698,7 +1012,16 @@ class Compiler(StateTrackingVisitor):
                         source_layer_id=LayerID(id=aperture_buffer.id_str),
                         center=cmd.center.transform(transform_matrix),
                         is_negative=cmd.is_negative,
-                        metadata=cmd.metadata,
+                        metadata_id=cmd.metadata_id,
+                    )
+                )
+
+            elif isinstance(cmd, PasteLayerBatch):
+                aperture_buffer = self._get_aperture_buffer(cmd.source_layer_id.id)
+                depends_on.add(aperture_buffer.id_str)
+                commands.append(
+                    cmd.transform(transform_matrix).model_copy(
+                        update={"source_layer_id": aperture_buffer.layer_id}
                     )
                 )
 
@@ -714,22 +1037,27 @@ class Compiler(StateTrackingVisitor):
             resolved_dependencies=[],
         )
 
+    @ignores_node_coordinates
     def on_flash_rectangle(self, node: D03, aperture: ADR) -> None:  # noqa: ARG002
         """Handle `D03` node with `ADC` aperture."""
         self._on_flash_aperture(aperture.aperture_id)
 
+    @ignores_node_coordinates
     def on_flash_obround(self, node: D03, aperture: ADO) -> None:  # noqa: ARG002
         """Handle `D03` node with `ADO` aperture."""
         self._on_flash_aperture(aperture.aperture_id)
 
+    @ignores_node_coordinates
     def on_flash_polygon(self, node: D03, aperture: ADP) -> None:  # noqa: ARG002
         """Handle `D03` node with `ADP` aperture."""
         self._on_flash_aperture(aperture.aperture_id)
 
+    @ignores_node_coordinates
     def on_flash_macro(self, node: D03, aperture: ADmacro) -> None:  # noqa: ARG002
         """Handle `D03` node with `ADM` aperture."""
         self._on_flash_aperture(aperture.aperture_id)
 
+    @ignores_node_coordinates
     def on_flash_block(self, node: D03, aperture: AB) -> None:  # noqa: ARG002
         """Handle `D03` node with `AB` aperture."""
         aperture_id = aperture.open.aperture_id
@@ -747,7 +1075,7 @@ class Compiler(StateTrackingVisitor):
         depends_on: set[str] = set()
 
         for cmd in buffer.commands:
-            if isinstance(cmd, Shape):
+            if isinstance(cmd, (Shape, Polyline)):
                 commands.append(cmd.transform(transform_matrix))
 
             elif isinstance(cmd, PasteLayer):
@@ -757,10 +1085,14 @@ class Compiler(StateTrackingVisitor):
                         source_layer_id=cmd.source_layer_id,
                         center=cmd.center.transform(transform_matrix),
                         is_negative=cmd.is_negative,
-                        metadata=cmd.metadata,
+                        metadata_id=cmd.metadata_id,
                     )
                 )
 
+            elif isinstance(cmd, PasteLayerBatch):
+                depends_on.add(cmd.source_layer_id.id)
+                commands.append(cmd.transform(transform_matrix))
+
             else:
                 raise NotImplementedError(type(cmd))
 
@@ -774,21 +1106,32 @@ class Compiler(StateTrackingVisitor):
         )
 
     def _resolve_buffer_submit_order(self) -> list[CommandBuffer]:
-        buffer_submit_order: list[str] = []
+        buffer_submit_order: dict[str, CommandBuffer] = {}
+        buffers_in_progress: set[str] = set()
 
         def _(buffer: CommandBuffer) -> None:
-            for dependency_id in buffer.depends_on:
+            if buffer.id_str in buffer_submit_order:
+                # Layers can be shared by multiple other layers, but they have to be
+                # submitted only once.
+                return
+
+            buffers_in_progress.add(buffer.id_str)
+            # Dependencies are sorted to make order of layers in RVMC independent
+            # of string hash seed.
+            for dependency_id in sorted(buffer.depends_on):
                 dependency = self._get_buffer(dependency_id)
-                _(dependency)
 
-                if buffer.id_str in buffer_submit_order:
+                if dependency_id in buffers_in_progress:
                     raise CyclicBufferDependencyError(buffer, dependency)
 
-            buffer_submit_order.append(buffer.id_str)
+                _(dependency)
+
+            buffers_in_progress.discard(buffer.id_str)
+            buffer_submit_order[buffer.id_str] = buffer
 
         _(self._get_buffer(self.MAIN_BUFFER_ID))
 
-        return [self._get_buffer(id_) for id_ in buffer_submit_order]
+        return list(buffer_submit_order.values())
 
     def _get_file_metadata(self) -> Optional[dict[str, str]]:
         if self._include_metadata:
@@ -802,11 +1145,22 @@ class Compiler(StateTrackingVisitor):
         buffer_submit_order = self._resolve_buffer_submit_order()
 
         for buffer in buffer_submit_order:
-            commands.append(StartLayer(id=LayerID(id=buffer.id_str), box=buffer.box))
+            buffer.flush()
+            commands.append(
+                StartLayer(
+                    id=LayerID(id=buffer.id_str),
+                    box=buffer.box,
+                    draw_on_paste=buffer.draw_on_paste,
+                )
+            )
             commands.extend(buffer.commands)
             commands.append(EndLayer())
 
-        return RVMC(commands=commands, metadata=self._get_file_metadata())
+        return RVMC(
+            commands=commands,
+            metadata=self._get_file_metadata(),
+            metadata_table=self._metadata_table,
+        )
 
     def compile(self, ast: File) -> RVMC:
         """Compile Gerber AST to RVMC."""
@@ -814,6 +1168,16 @@ class Compiler(StateTrackingVisitor):
 
         return self._convert_buffers_to_rvmc()
 
+    def compile_nodes(self, nodes: Iterable[Node]) -> RVMC:
+        """Compile top level Gerber AST nodes to RVMC.
+
+        Nodes are consumed one by one, hence it is possible to compile nodes yielded
+        by `iter_parse()` without constructing whole AST in memory.
+        """
+        self.visit_nodes(nodes)
+
+        return self._convert_buffers_to_rvmc()
+
 
 class MacroEvalVisitor(AstVisitor):
     """Visitor for evaluating macro primitives."""
@@ -823,15 +1187,24 @@ class MacroEvalVisitor(AstVisitor):
         compiler: Compiler,
         aperture_buffer: CommandBuffer,
         scope: dict[str, Double],
-        metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
+        compiled_macro: Optional[CompiledMacro] = None,
     ) -> None:
+        """Initialize visitor.
+
+        When `compiled_macro` is provided, expressions of visited macro are evaluated
+        with closures compiled for them instead of walking expression trees.
+        """
         self._compiler = compiler
         self._aperture_buffer = aperture_buffer
         self._scope = scope
         self._expression_eval = ExpressionEvalVisitor(self._scope)
-        self._metadata = metadata
+        self._compiled_macro = compiled_macro
+        self._metadata_id = metadata_id
 
     def _eval(self, node: Expression) -> float:
+        if self._compiled_macro is not None:
+            return self._compiled_macro.evaluate(node, self._scope)
         return self._expression_eval.evaluate(node)
 
     def on_code_1(self, node: Code1) -> Code1:
@@ -846,7 +1219,7 @@ class MacroEvalVisitor(AstVisitor):
             (center_x, center_y),
             diameter,
             is_negative=(exposure == 0),
-            metadata=self._metadata,
+            metadata_id=self._metadata_id,
         )
         if rotation is not None:
             shape = shape.transform(Matrix3x3.new_rotate(rotation))
@@ -871,7 +1244,7 @@ class MacroEvalVisitor(AstVisitor):
             end,
             thickness=width,
             is_negative=(exposure == 0),
-            metadata=self._metadata,
+            metadata_id=self._metadata_id,
         )
         if rotation is not None:
             shape = shape.transform(Matrix3x3.new_rotate(rotation))
@@ -889,7 +1262,7 @@ class MacroEvalVisitor(AstVisitor):
             start,
             *points,
             is_negative=(exposure == 0),
-            metadata=self._metadata,
+            metadata_id=self._metadata_id,
         )
         if rotation is not None:
             shape = shape.transform(Matrix3x3.new_rotate(rotation))
@@ -912,7 +1285,7 @@ class MacroEvalVisitor(AstVisitor):
             number_of_vertices,
             rotation,
             is_negative=(exposure == 0),
-            metadata=self._metadata,
+            metadata_id=self._metadata_id,
         )
         if rotation is not None:
             shape = shape.transform(Matrix3x3.new_rotate(rotation))
@@ -944,7 +1317,7 @@ class MacroEvalVisitor(AstVisitor):
                     (center_x, center_y + half_crosshair_length),
                     crosshair_thickness,
                     is_negative=False,
-                    metadata=self._metadata,
+                    metadata_id=self._metadata_id,
                 )
             )
             shapes.append(
@@ -953,7 +1326,7 @@ class MacroEvalVisitor(AstVisitor):
                     (center_x + half_crosshair_length, center_y),
                     crosshair_thickness,
                     is_negative=False,
-                    metadata=self._metadata,
+                    metadata_id=self._metadata_id,
                 )
             )
 
@@ -1014,9 +1387,8 @@ class MacroEvalVisitor(AstVisitor):
         if thickness <= 0:
             return node
 
-        aperture_id = ApertureIdStr(f"%%Code7%{id(node)}%{time.time():.0f}")
         aperture_buffer = self._compiler._create_aperture_buffer(  # noqa: SLF001
-            aperture_id
+            ApertureIdStr("%%Code7%")
         )
 
         shapes: list[Shape] = []
@@ -1026,7 +1398,7 @@ class MacroEvalVisitor(AstVisitor):
                 outer_diameter,
                 inner_diameter,
                 is_negative=False,
-                metadata=self._metadata,
+                metadata_id=self._metadata_id,
             )
         )
 
@@ -1038,7 +1410,7 @@ class MacroEvalVisitor(AstVisitor):
                 (0 + radius_delta, 0),
                 thickness=gap_thickness,
                 is_negative=True,
-                metadata=self._metadata,
+                metadata_id=self._metadata_id,
             )
         )
         shapes.append(
@@ -1047,7 +1419,7 @@ class MacroEvalVisitor(AstVisitor):
                 (0, 0 + radius_delta),
                 thickness=gap_thickness,
                 is_negative=True,
-                metadata=self._metadata,
+                metadata_id=self._metadata_id,
             )
         )
 
@@ -1061,6 +1433,10 @@ class MacroEvalVisitor(AstVisitor):
         for shape in shapes:
             aperture_buffer.append_shape(shape)
 
+        self._compiler._del_buffer(aperture_buffer.id_str)  # noqa: SLF001
+        aperture_id = self._compiler._get_buffer_with_content_id(  # noqa: SLF001
+            "%%Code7%", aperture_buffer
+        ).id_str
         self._aperture_buffer.append_paste(
             PasteLayer.new(
                 source_layer_id=aperture_id,
@@ -1089,7 +1465,7 @@ class MacroEvalVisitor(AstVisitor):
             width,
             height,
             is_negative=(exposure == 0),
-            metadata=self._metadata,
+            metadata_id=self._metadata_id,
         )
         if rotation is not None:
             shape = shape.transform(Matrix3x3.new_rotate(rotation))
@@ -1111,7 +1487,7 @@ class MacroEvalVisitor(AstVisitor):
             width,
             height,
             is_negative=(exposure == 0),
-            metadata=self._metadata,
+            metadata_id=self._metadata_id,
         )
         if rotation is not None:
             shape = shape.transform(Matrix3x3.new_rotate(rotation))
@@ -19,7 +19,7 @@ from typing import (
 from pyparsing import cached_property
 from typing_extensions import ParamSpec
 
-from pygerber.gerber.ast.ast_visitor import AstVisitor
+from pygerber.gerber.ast.ast_visitor import FastAstVisitor
 from pygerber.gerber.ast.nodes import (
     ADC,
     ADO,
@@ -225,7 +225,7 @@ def _insert_var(
     return _decorator
 
 
-class Formatter(AstVisitor):
+class Formatter(FastAstVisitor):
     """Gerber X3 compatible formatter."""
 
     def __init__(  # noqa: PLR0912, PLR0915
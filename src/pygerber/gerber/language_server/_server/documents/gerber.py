@@ -10,7 +10,10 @@ from pygerber.gerber.ast.nodes import File, Invalid
 from pygerber.gerber.ast.state_tracking_visitor import State, StateTrackingVisitor
 from pygerber.gerber.formatter import Formatter
 from pygerber.gerber.language_server._server.documents.document import Document
-from pygerber.gerber.language_server._server.hover.gerber import GerberHoverCreator
+from pygerber.gerber.language_server._server.hover.gerber import (
+    GerberHoverCreator,
+    new_state_tracker,
+)
 from pygerber.gerber.language_server.status import is_language_server_available
 from pygerber.gerber.parser.pyparsing.parser import Parser
 
@@ -35,6 +38,7 @@ class GerberDocument(Document):
         self.parser = Parser(resilient=True)
         self.ast: Optional[File] = None
         self.state: Optional[State] = None
+        self.state_tracker: Optional[StateTrackingVisitor] = None
         self.source_hash = sha256("")
         self.uri = ""
         self.cached_aperture_completion: Optional[lspt.CompletionList] = None
@@ -85,7 +89,9 @@ class GerberDocument(Document):
         if node is None:
             return None
 
-        message = GerberHoverCreator(self.ast).create_hover_markdown(node)
+        message = GerberHoverCreator(
+            self.ast, self.get_state_tracker()
+        ).create_hover_markdown(node)
 
         source_info = node.source_info
         if source_info is None:
@@ -173,14 +179,23 @@ class GerberDocument(Document):
     def get_gerber_state(self) -> Optional[State]:
         """Get the state of the document."""
         if self.state is None:
-            visitor = StateTrackingVisitor(ignore_program_stop=True)
+            self.get_state_tracker()
+
+        return self.state
+
+    def get_state_tracker(self) -> Optional[StateTrackingVisitor]:
+        """Get visitor holding state checkpoints of the document."""
+        if self.state_tracker is None:
             if self.ast is None:
                 return None
 
+            visitor = new_state_tracker()
             self.ast.visit(visitor)
-            self.state = visitor.state
+            # State of visitor is replaced on hover, hence final state is copied.
+            self.state = visitor.state.snapshot()
+            self.state_tracker = visitor
 
-        return self.state
+        return self.state_tracker
 
     def get_completion_g_codes(self) -> lspt.CompletionList | None:
         """Get the list of G-codes."""
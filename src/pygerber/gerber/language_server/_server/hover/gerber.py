@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import base64
 import io
-from contextlib import contextmanager, suppress
+from contextlib import contextmanager
 from io import StringIO
 from typing import TYPE_CHECKING, Generator, Optional, cast
 
@@ -25,7 +25,6 @@ from pygerber.gerber.ast.nodes import (
     LM,
     LR,
     LS,
-    M02,
     MO,
     TA,
     TD,
@@ -66,7 +65,6 @@ from pygerber.gerber.ast.nodes.enums import Mirroring, Polarity
 from pygerber.gerber.ast.state_tracking_visitor import (
     ArcInterpolation,
     PlotMode,
-    ProgramStop,
     StateTrackingVisitor,
 )
 from pygerber.gerber.compiler import compile
@@ -78,36 +76,16 @@ from pygerber.vm.types.style import Style
 if TYPE_CHECKING:
     from PIL import Image
 
+STATE_CHECKPOINT_INTERVAL = 256
+"""Number of top level nodes between state checkpoints used for hover."""
 
-class LimitedStateTrackingVisitor(StateTrackingVisitor):
-    """The `LimitedStateTrackingVisitor` class which stops AST walk before particular
-    location in source.
-    """
-
-    def __init__(self, max_location: int) -> None:
-        super().__init__()
-        self.max_location = max_location
 
-    def on_file(self, node: File) -> File:
-        """Handle `File` node."""
-        with suppress(ProgramStop):
-            try:
-                for command in node.nodes:
-                    source_info = command.source_info
-                    assert source_info is not None
-
-                    if source_info.end_location > self.max_location:
-                        raise ProgramStop(M02())
-
-                    try:
-                        command.visit(self)
-                    except Exception as e:
-                        if self.on_exception(command, e):
-                            raise
-            finally:
-                self.on_end_of_file(node)
-
-        return node
+def new_state_tracker() -> StateTrackingVisitor:
+    """Create visitor recording state checkpoints used to resolve hover state."""
+    return StateTrackingVisitor(
+        ignore_program_stop=True,
+        checkpoint_interval=STATE_CHECKPOINT_INTERVAL,
+    )
 
 
 class ToMarkdown(AstVisitor):
@@ -262,9 +240,19 @@ class GerberHoverCreator(AstVisitor):
     node.
     """
 
-    def __init__(self, ast: File) -> None:
+    def __init__(
+        self, ast: File, state_tracker: Optional[StateTrackingVisitor] = None
+    ) -> None:
+        """Initialize hover creator.
+
+        `state_tracker` should be a visitor which visited `ast` with
+        `checkpoint_interval` set, so that state at hovered node can be restored
+        without replaying whole file. When not provided, such visitor is created on
+        first use.
+        """
         super().__init__()
         self.ast = ast
+        self.state_tracker = state_tracker
         self.hover_markdown: StringIO
 
     def create_hover_markdown(self, node: Node) -> str:
@@ -274,10 +262,11 @@ class GerberHoverCreator(AstVisitor):
         source_info = node.source_info
         assert source_info is not None
 
-        visitor = LimitedStateTrackingVisitor(source_info.location)
-        self.ast.visit(visitor)
+        if self.state_tracker is None:
+            self.state_tracker = new_state_tracker()
+            self.ast.visit(self.state_tracker)
 
-        self.state = visitor.state
+        self.state = self.state_tracker.state_at(source_info.location)
 
         node.visit(self)
 
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Callable
 
-from pygerber.gerber.ast import AstVisitor
+from pygerber.gerber.ast.ast_visitor import FastAstVisitor
 from pygerber.gerber.ast.nodes import Node
 
 if TYPE_CHECKING:
@@ -91,6 +91,7 @@ if TYPE_CHECKING:
         Mul,
         Neg,
         Node,
+        Operations,
         Parenthesis,
         Point,
         Pos,
@@ -125,7 +126,7 @@ if TYPE_CHECKING:
     )
 
 
-class EventAstVisitor(AstVisitor):
+class EventAstVisitor(FastAstVisitor):
     """EventAstVisitor class is a specialization of AstVisitor which sends a visit event
     to every listener which subscribed to event of visiting particular node.
     """
@@ -368,6 +369,10 @@ class EventAstVisitor(AstVisitor):
         self._trigger_listeners(node)
         return super().on_dnn(node)
 
+    def on_operations(self, node: Operations) -> Operations:  # noqa: D102
+        self._trigger_listeners(node)
+        return super().on_operations(node)
+
     def on_g01(self, node: G01) -> G01:  # noqa: D102
         self._trigger_listeners(node)
         return super().on_g01(node)
@@ -7,12 +7,16 @@ source.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Literal, Optional, Type
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, Optional, TextIO, Type, Union
 
 from typing_extensions import Protocol
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from pygerber.gerber.ast.nodes import File, Node
+    from pygerber.gerber.ast.nodes.base import SourceBuffer
 
 
 class ParserProtocol(Protocol):
@@ -23,25 +27,31 @@ class ParserProtocol(Protocol):
 
 
 def parse(
-    code: str,
+    code: Union[str, SourceBuffer],
     *,
     strict: bool = True,
-    parser: Literal["pyparsing"] = "pyparsing",
+    parser: Literal["pyparsing", "native"] = "pyparsing",
     resilient: bool = False,
     ast_node_class_overrides: Optional[dict[str, Type[Node]]] = None,
+    optimization: int = 0,
+    jobs: int = 1,
 ) -> File:
     """Parse Gerber X3 file source code and construct AST from it.
 
     Parameters
     ----------
-    code : str
-        Gerber source code.
+    code : str | bytes | mmap.mmap
+        Gerber source code. `bytes`-like source code, eg. memory mapped file, is
+        parsed by "native" parser without decoding it to `str`, source information
+        of nodes is then expressed in bytes. "pyparsing" parser decodes it as UTF-8.
     strict : bool, optional
         Toggle enforcement of parsing whole code, by default True
         When set to False, parser will try to parse as much as possible and will stop
         after it encounters first unrecognized token.
-    parser : Literal[&quot;pyparsing&quot;], optional
+    parser : Literal[&quot;pyparsing&quot;, &quot;native&quot;], optional
         Parsing backend to use, by default "pyparsing"
+        Hand-written "native" parser produces exactly the same AST as "pyparsing"
+        parser, but is considerably faster.
     resilient : bool, optional
         Toggle resilient parsing. When set to True, when parser encounters invalid token
         it will wrap it in `InvalidToken` node and continue parsing, by default False
@@ -52,6 +62,24 @@ def parse(
         available for given node. Keys in dictionary have to be string corresponding to
         names of overridden node classes for parser to use them. In most cases it is
         necessary for replacement node class to inherit from original one.
+    optimization : int, optional
+        Combination of `pygerber.gerber.parser.pyparsing.grammar.Optimization` flags,
+        by default 0
+        `Optimization.DISCARD_COMMENTS` and `Optimization.DISCARD_ATTRIBUTES` make
+        parser skip construction of comment and attribute nodes, which is useful when
+        AST is only used for rendering.
+        `Optimization.INTERN_NODES` makes parser reuse single node for all identical
+        G codes, Dnn, load commands and coordinates within one `parse()` call.
+        Interned nodes have no source information and are shared by many parents,
+        hence they must not be mutated, eg. with `object.__setattr__()`, as change
+        would affect every place where node occurs.
+    jobs : int, optional
+        Number of processes to use for parsing, by default 1
+        When greater than 1, source code is split into chunks at statement boundaries
+        and chunks are parsed in parallel, see `pygerber.gerber.parser.parallel`.
+        Classes from `ast_node_class_overrides` must be picklable in such case.
+        Resilient parsing is always done in single process, as invalid code can not
+        be reliably split into chunks.
 
     Returns
     -------
@@ -64,12 +92,107 @@ def parse(
         For unrecognized parser backend names.
 
     """
+    if parser == "pyparsing" and not isinstance(code, str):
+        code = code[:].decode("utf-8")
+
+    if jobs > 1 and not resilient:
+        from pygerber.gerber.parser.parallel import parse_parallel  # noqa: PLC0415
+
+        return parse_parallel(
+            code,
+            jobs=jobs,
+            strict=strict,
+            parser=parser,
+            ast_node_class_overrides=ast_node_class_overrides,
+            optimization=optimization,
+        )
+
     if parser == "pyparsing":
         from pygerber.gerber.parser.pyparsing.parser import Parser  # noqa: PLC0415
 
+        assert isinstance(code, str)
         return Parser(
-            resilient=resilient, ast_node_class_overrides=ast_node_class_overrides
+            resilient=resilient,
+            ast_node_class_overrides=ast_node_class_overrides,
+            optimization=optimization,
+        ).parse(code, strict=strict)
+
+    if parser == "native":
+        from pygerber.gerber.parser.native.parser import (  # noqa: PLC0415
+            Parser as NativeParser,
+        )
+
+        return NativeParser(
+            resilient=resilient,
+            ast_node_class_overrides=ast_node_class_overrides,
+            optimization=optimization,
         ).parse(code, strict=strict)
 
     msg = f"Parser '{parser}' is not supported."  # type: ignore[unreachable]
     raise NotImplementedError(msg)
+
+
+def iter_parse(
+    source: Union[TextIO, Path],
+    *,
+    strict: bool = True,
+    parser: Literal["native"] = "native",
+    resilient: bool = False,
+    ast_node_class_overrides: Optional[dict[str, Type[Node]]] = None,
+    optimization: int = 0,
+) -> Iterator[Node]:
+    """Parse Gerber X3 source code from text stream or file and yield top level AST
+    nodes one by one, as soon as they are parsed.
+
+    Only part of the source which was not yet parsed is kept in memory, therefore
+    `SourceInfo.source` of yielded nodes contains only chunk of the source and
+    `SourceInfo.location` is relative to the beginning of that chunk.
+
+    Parameters
+    ----------
+    source : TextIO | Path
+        Text stream or path to file containing Gerber source code.
+    strict : bool, optional
+        Toggle enforcement of parsing whole code, by default True
+        When set to False, parser will try to parse as much as possible and will stop
+        after it encounters first unrecognized token.
+    parser : Literal[&quot;native&quot;], optional
+        Parsing backend to use, by default "native"
+    resilient : bool, optional
+        Toggle resilient parsing. When set to True, when parser encounters invalid token
+        it will wrap it in `InvalidToken` node and continue parsing, by default False
+    ast_node_class_overrides : Optional[dict[str, Type[Node]]], optional
+        Override classes representing nodes used by parser to construct abstract syntax
+        tree, by default None
+    optimization : int, optional
+        Combination of `pygerber.gerber.parser.pyparsing.grammar.Optimization` flags,
+        by default 0
+
+    Yields
+    ------
+    Node
+        Top level nodes of abstract syntax tree, in order of appearance in source.
+
+    Raises
+    ------
+    NotImplementedError
+        For parser backends which do not support streaming.
+
+    """
+    if parser != "native":
+        msg = f"Parser '{parser}' does not support streaming."  # type: ignore[unreachable]
+        raise NotImplementedError(msg)
+
+    from pygerber.gerber.parser.native.parser import Parser  # noqa: PLC0415
+
+    native_parser = Parser(
+        resilient=resilient,
+        ast_node_class_overrides=ast_node_class_overrides,
+        optimization=optimization,
+    )
+
+    if isinstance(source, Path):
+        with source.open(encoding="utf-8") as stream:
+            yield from native_parser.parse_stream(stream, strict=strict)
+    else:
+        yield from native_parser.parse_stream(source, strict=strict)
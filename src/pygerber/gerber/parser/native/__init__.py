@@ -1 +1,5 @@
-"""The `native` package will contain C++/Rust implementation of Gerber X3 parser."""
+"""The `native` package contains hand-written Gerber X3 parser implementation.
+
+It does not depend on parser combinator machinery and produces exactly the same AST as
+the pyparsing based parser.
+"""
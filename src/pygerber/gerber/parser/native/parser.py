@@ -0,0 +1,1649 @@
+"""The `parser` module contains hand-written Gerber X3 parser implementation.
+
+Parser is a backtracking recursive descent parser which mirrors the grammar defined in
+`pygerber.gerber.parser.pyparsing.grammar` rule by rule, hence it produces exactly the
+same abstract syntax tree (including source information of nodes), but avoids
+the overhead of pyparsing parser element machinery.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterator,
+    Optional,
+    TextIO,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
+
+import pyparsing as pp
+
+from pygerber.gerber.ast.nodes import (
+    AB,
+    ADC,
+    ADO,
+    ADP,
+    ADR,
+    AM,
+    AS,
+    D01,
+    D02,
+    D03,
+    FS,
+    G01,
+    G02,
+    G03,
+    G04,
+    G36,
+    G37,
+    G54,
+    G55,
+    G70,
+    G71,
+    G74,
+    G75,
+    G90,
+    G91,
+    IN,
+    IP,
+    IR,
+    LM,
+    LN,
+    LP,
+    LR,
+    LS,
+    M00,
+    M01,
+    M02,
+    MI,
+    MO,
+    OF,
+    SF,
+    SR,
+    TD,
+    TF_MD5,
+    TO_C,
+    TO_CMNP,
+    TO_N,
+    TO_P,
+    ABclose,
+    ABopen,
+    Add,
+    ADmacro,
+    AMclose,
+    AMopen,
+    Assignment,
+    Code0,
+    Code1,
+    Code2,
+    Code4,
+    Code5,
+    Code6,
+    Code7,
+    Code20,
+    Code21,
+    Code22,
+    Constant,
+    Coordinate,
+    CoordinateI,
+    CoordinateJ,
+    CoordinateX,
+    CoordinateY,
+    Div,
+    Dnn,
+    File,
+    Invalid,
+    Mul,
+    Neg,
+    Node,
+    PackedCoordinateStr,
+    Parenthesis,
+    Point,
+    Pos,
+    SourceInfo,
+    SRclose,
+    SRopen,
+    Sub,
+    TA_AperFunction,
+    TA_DrillTolerance,
+    TA_FlashText,
+    TA_UserName,
+    TF_CreationDate,
+    TF_FileFunction,
+    TF_FilePolarity,
+    TF_GenerationSoftware,
+    TF_Part,
+    TF_ProjectId,
+    TF_SameCoordinates,
+    TF_UserName,
+    TO_CFtp,
+    TO_CHgt,
+    TO_CLbD,
+    TO_CLbN,
+    TO_CMfr,
+    TO_CMnt,
+    TO_CPgD,
+    TO_CPgN,
+    TO_CRot,
+    TO_CSup,
+    TO_CVal,
+    TO_UserName,
+    Variable,
+)
+from pygerber.gerber.ast.nodes.base import SourceBuffer
+from pygerber.gerber.ast.nodes.enums import AperFunction
+from pygerber.gerber.parser.pyparsing.grammar import Optimization, SyntaxSwitches
+
+if TYPE_CHECKING:
+    from typing_extensions import TypeAlias
+
+T = TypeVar("T", bound=Node)
+
+
+def _one_of(*values: str) -> re.Pattern[str]:
+    # Longest alternatives first, same as `pyparsing.one_of` does for alternatives
+    # which are prefixes of each other.
+    return re.compile(
+        "|".join(re.escape(v) for v in sorted(values, key=len, reverse=True))
+    )
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r"[^%*]+")
+_NAME = re.compile(r"[._a-zA-Z$][._a-zA-Z0-9]*")
+_USER_NAME = re.compile(r"[_a-zA-Z$][._a-zA-Z0-9]*")
+_FIELD = re.compile(r"[^%*,]*")
+_DOUBLE = re.compile(r"[+-]?(([0-9]+(\.[0-9]+)?)|(\.[0-9]+))")
+_INTEGER = re.compile(r"[+-]?[0-9]+")
+_BOOLEAN = _one_of("0", "1")
+_DIGIT = re.compile(r"[0-9]")
+_APERTURE_ID = re.compile(r"D[0]*[1-9][0-9]+")
+_D_CODE = re.compile(r"D0*([123])")
+_COORDINATES_PATTERN = (
+    r"([Xx][+-]?[0-9]+)?([Yy][+-]?[0-9]+)?([Ii][+-]?[0-9]+)?([Jj][+-]?[0-9]+)?"
+)
+_COORDINATE_D_CODE = re.compile(rf"{_COORDINATES_PATTERN}(?:D0*([123]))?\*")
+_COORDINATE_D_CODE_REQUIRED = re.compile(rf"{_COORDINATES_PATTERN}D0*([123])\*")
+_G04 = re.compile(r"G0*4")
+_G_CODE = re.compile(r"G([0-9]+)")
+_M_CODE = re.compile(r"M0*([012])")
+_VARIABLE = re.compile(r"\$[0-9]+")
+_INVALID = re.compile(r".+")
+_ADD_OPERATOR = re.compile(r"\+")
+_SUB_OPERATOR = re.compile(r"-")
+_MUL_OPERATOR = _one_of("x", "X")
+_DIV_OPERATOR = re.compile(r"/")
+_APER_FUNCTION = _one_of(*(v.value for v in AperFunction))
+_POLARITY = _one_of("C", "D")
+_MIRRORING = _one_of("N", "XY", "X", "Y")
+_ZEROS = _one_of("L", "T", "")
+_COORDINATE_MODE = _one_of("I", "A")
+_IMAGE_POLARITY = _one_of("POS", "NEG")
+_UNIT_MODE = _one_of("IN", "MM")
+_CORRESPONDENCE = _one_of("AXBY", "AYBX")
+_FLASH_TEXT_MODE = _one_of("B", "C")
+_FLASH_TEXT_MIRRORING = _one_of("R", "M")
+_NON_STANDALONE_LOOKAHEAD = frozenset("DXYIJ")
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+SOURCE_ENCODING = "utf-8"
+
+_G_CODES: dict[int, Type[Node]] = {
+    int(cls.__qualname__.lstrip("G")): cls
+    for cls in (G01, G02, G03, G36, G37, G54, G55, G70, G71, G74, G75, G90, G91)
+}
+_M_CODES: dict[str, Type[Node]] = {"0": M00, "1": M01, "2": M02}
+_COORDINATES: Tuple[Tuple[str, Type[Coordinate]], ...] = (
+    ("x", CoordinateX),
+    ("y", CoordinateY),
+    ("i", CoordinateI),
+    ("j", CoordinateJ),
+)
+
+_PRIMITIVES: dict[str, Tuple[Type[Node], Tuple[str, ...]]] = {
+    "1": (Code1, ("exposure", "diameter", "center_x", "center_y")),
+    "2": (
+        Code2,
+        (
+            "exposure",
+            "width",
+            "start_x",
+            "start_y",
+            "end_x",
+            "end_y",
+            "rotation",
+        ),
+    ),
+    "5": (
+        Code5,
+        (
+            "exposure",
+            "number_of_vertices",
+            "center_x",
+            "center_y",
+            "diameter",
+            "rotation",
+        ),
+    ),
+    "6": (
+        Code6,
+        (
+            "center_x",
+            "center_y",
+            "outer_diameter",
+            "ring_thickness",
+            "gap_between_rings",
+            "max_ring_count",
+            "crosshair_thickness",
+            "crosshair_length",
+            "rotation",
+        ),
+    ),
+    "7": (
+        Code7,
+        (
+            "center_x",
+            "center_y",
+            "outer_diameter",
+            "inner_diameter",
+            "gap_thickness",
+            "rotation",
+        ),
+    ),
+    "20": (
+        Code20,
+        (
+            "exposure",
+            "width",
+            "start_x",
+            "start_y",
+            "end_x",
+            "end_y",
+            "rotation",
+        ),
+    ),
+    "21": (
+        Code21,
+        ("exposure", "width", "height", "center_x", "center_y", "rotation"),
+    ),
+    "22": (
+        Code22,
+        (
+            "exposure",
+            "width",
+            "height",
+            "x_lower_left",
+            "y_lower_left",
+            "rotation",
+        ),
+    ),
+}
+
+
+class _NoMatchError(Exception):
+    """Raised internally when parser rule does not match at current position."""
+
+
+class _Cursor:
+    """Position within parsed source code.
+
+    Cursor keeps track of the sum of lengths of consumed tokens, which is used to
+    calculate length of nodes in the same way as pyparsing based parser does, ie.
+    whitespace skipped between tokens is not accounted for.
+
+    Additionally cursor remembers if any rule attempted to look past the end of the
+    source, in which case outcome of parsing may change when more source is appended.
+    """
+
+    __slots__ = ("is_exhausted", "length", "position", "source")
+
+    def __init__(self, source: str, position: int = 0) -> None:
+        self.source = source
+        self.position = position
+        self.length = 0
+        self.is_exhausted = False
+
+    def mark(self) -> Tuple[int, int]:
+        """Get state of the cursor which can be restored with `reset()`."""
+        return self.position, self.length
+
+    def reset(self, mark: Tuple[int, int]) -> None:
+        """Restore state of the cursor."""
+        self.position, self.length = mark
+
+    def skip(self) -> int:
+        """Skip whitespace characters and return new position."""
+        match = _WHITESPACE.match(self.source, self.position)
+        assert match is not None
+        self.position = match.end()
+        if self.position == len(self.source):
+            self.is_exhausted = True
+        return self.position
+
+    def peek(self) -> str:
+        """Get next non-whitespace character without consuming it."""
+        position = self.skip()
+        return self.text(position, position + 1)
+
+    def text(self, start: int, end: int) -> str:
+        """Get source text between `start` and `end` positions."""
+        return self.source[start:end]
+
+    def startswith(self, text: str, position: int) -> bool:
+        """Check if source contains `text` at `position`."""
+        return self.source.startswith(text, position)
+
+    def literal(self, text: str) -> str:
+        """Consume literal text."""
+        position = self.skip()
+        if not self.startswith(text, position):
+            raise _NoMatchError
+        self.position = position + len(text)
+        self.length += len(text)
+        return text
+
+    def caseless(self, text: str) -> str:
+        """Consume literal text, ignoring case."""
+        position = self.skip()
+        end = position + len(text)
+        if self.text(position, end).upper() != text.upper():
+            raise _NoMatchError
+        self.position = end
+        self.length += len(text)
+        return text
+
+    def regex(self, pattern: re.Pattern[str], group: int = 0) -> str:
+        """Consume text matching regular expression and return matched text or
+        content of selected group.
+        """
+        position = self.skip()
+        match = pattern.match(self.source, position)
+        if match is None:
+            raise _NoMatchError
+        self.position = match.end()
+        self.length += self.position - position
+        return match.group(group)
+
+    def groups(self, pattern: re.Pattern[str]) -> Tuple[Optional[str], ...]:
+        """Consume text matching regular expression and return all its groups."""
+        position = self.skip()
+        match = pattern.match(self.source, position)
+        if match is None:
+            raise _NoMatchError
+        self.position = match.end()
+        self.length += self.position - position
+        return match.groups()
+
+    def string(self) -> str:
+        """Consume string of characters other than `%` and `*`, whitespace included."""
+        match = _STRING.match(self.source, self.position)
+        if match is None:
+            if self.position == len(self.source):
+                self.is_exhausted = True
+            raise _NoMatchError
+        value = match.group(0)
+        self.position = match.end()
+        self.length += len(value)
+        return value
+
+
+class _BufferCursor(_Cursor):
+    """Position within parsed source code stored in `bytes`-like buffer.
+
+    Source is never decoded as a whole, only matched tokens are converted to `str`.
+    """
+
+    source: SourceBuffer  # type: ignore[assignment]
+
+    def __init__(self, source: SourceBuffer, position: int = 0) -> None:
+        super().__init__(source, position)  # type: ignore[arg-type]
+
+    def skip(self) -> int:
+        """Skip whitespace characters and return new position."""
+        match = _as_bytes_pattern(_WHITESPACE).match(self.source, self.position)
+        assert match is not None
+        self.position = match.end()
+        if self.position == len(self.source):
+            self.is_exhausted = True
+        return self.position
+
+    def text(self, start: int, end: int) -> str:
+        """Get source text between `start` and `end` positions."""
+        return self.source[start:end].decode(SOURCE_ENCODING)
+
+    def startswith(self, text: str, position: int) -> bool:
+        """Check if source contains `text` at `position`."""
+        return self.source[position : position + len(text)] == text.encode(
+            SOURCE_ENCODING
+        )
+
+    def regex(self, pattern: re.Pattern[str], group: int = 0) -> str:
+        """Consume text matching regular expression and return matched text or
+        content of selected group.
+        """
+        position = self.skip()
+        match = _as_bytes_pattern(pattern).match(self.source, position)
+        if match is None:
+            raise _NoMatchError
+        self.position = match.end()
+        self.length += self.position - position
+        return match.group(group).decode(SOURCE_ENCODING)
+
+    def groups(self, pattern: re.Pattern[str]) -> Tuple[Optional[str], ...]:
+        """Consume text matching regular expression and return all its groups."""
+        position = self.skip()
+        match = _as_bytes_pattern(pattern).match(self.source, position)
+        if match is None:
+            raise _NoMatchError
+        self.position = match.end()
+        self.length += self.position - position
+        return tuple(
+            None if group is None else group.decode(SOURCE_ENCODING)
+            for group in match.groups()
+        )
+
+    def string(self) -> str:
+        """Consume string of characters other than `%` and `*`, whitespace included."""
+        match = _as_bytes_pattern(_STRING).match(self.source, self.position)
+        if match is None:
+            if self.position == len(self.source):
+                self.is_exhausted = True
+            raise _NoMatchError
+        self.position = match.end()
+        self.length += match.end() - match.start()
+        return match.group(0).decode(SOURCE_ENCODING)
+
+
+_BYTES_PATTERNS: dict[re.Pattern[str], re.Pattern[bytes]] = {}
+
+
+def _as_bytes_pattern(pattern: re.Pattern[str]) -> re.Pattern[bytes]:
+    """Get equivalent of `pattern` which can be used to match `bytes`-like objects."""
+    bytes_pattern = _BYTES_PATTERNS.get(pattern)
+    if bytes_pattern is None:
+        bytes_pattern = re.compile(pattern.pattern.encode(SOURCE_ENCODING))
+        _BYTES_PATTERNS[pattern] = bytes_pattern
+    return bytes_pattern
+
+
+class _StreamReader:
+    """Reader loading text stream in chunks containing only complete lines.
+
+    Loading complete lines guarantees that tabs are expanded the same way as they would
+    be when whole source was loaded at once.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int) -> None:
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.is_eof = False
+        self._incomplete_line = ""
+
+    def read(self, position: int) -> int:
+        """Discard text preceding line containing `position` and load next chunk of
+        source.
+
+        Returns
+        -------
+        int
+            Position in new text corresponding to `position` in previous text.
+
+        """
+        start = self.text.rfind("\n", 0, position) + 1
+        text = self.text[start:]
+
+        while not self.is_eof:
+            chunk = self._incomplete_line + self.stream.read(self.chunk_size)
+            end = chunk.rfind("\n") + 1
+
+            if len(chunk) == len(self._incomplete_line):
+                self.is_eof = True
+                end = len(chunk)
+
+            self._incomplete_line = chunk[end:]
+            if end:
+                text += chunk[:end].expandtabs()
+                break
+
+        self.text = text
+        return position - start
+
+
+Rule: TypeAlias = Callable[[_Cursor], Node]
+
+# Placeholder returned instead of nodes discarded due to optimization flags.
+_DISCARDED_NODE = cast("Node", object())
+
+
+class Parser:
+    """Gerber X3 parser implementation."""
+
+    def __init__(
+        self,
+        ast_node_class_overrides: Optional[dict[str, Type[Node]]] = None,
+        *,
+        resilient: bool = False,
+        syntax_switches: Optional[SyntaxSwitches] = None,
+        optimization: int = 0,
+    ) -> None:
+        self.ast_node_class_overrides = ast_node_class_overrides or {}
+        self.resilient = resilient
+        self.syntax_switches = syntax_switches or SyntaxSwitches()
+        self._coordinate_d_code_pattern = (
+            _COORDINATE_D_CODE
+            if self.syntax_switches.allow_d01_without_code
+            else _COORDINATE_D_CODE_REQUIRED
+        )
+        self.optimization = optimization
+        self.discarded_node_types = Optimization(
+            optimization
+        ).get_discarded_node_types()
+        self.interned_node_types = Optimization(optimization).get_interned_node_types()
+        self._intern_coordinates = issubclass(Coordinate, self.interned_node_types)
+        self._interned_nodes: dict[tuple[Any, ...], Node] = {}
+
+        load_commands: dict[str, list[Rule]] = {
+            "LN": [self._ln],
+            "LP": [self._lp],
+            "LR": [self._lr],
+            "LS": [self._ls],
+            "LM": [self._lm],
+        }
+        properties: dict[str, list[Rule]] = {
+            "FS": [self._fs],
+            "MO": [self._mo],
+            "IP": [self._ip],
+            "IR": [self._ir],
+            "OF": [self._of],
+            "AS": [self._as],
+            "MI": [self._mi],
+            "IN": [self._in],
+            "SF": [self._sf],
+        }
+        attributes: dict[str, list[Rule]] = {
+            "TA": [
+                self._ta_user_name,
+                self._ta_aper_function,
+                self._ta_drill_tolerance,
+                self._ta_flash_text,
+            ],
+            "TD": [self._td],
+            "TF": [
+                self._tf_user_name,
+                self._tf_part,
+                self._tf_file_function,
+                self._tf_file_polarity,
+                self._tf_same_coordinates,
+                self._tf_creation_date,
+                self._tf_generation_software,
+                self._tf_project_id,
+                self._tf_md5,
+            ],
+            "TO": [
+                self._to_user_name,
+                self._to_n,
+                self._to_p,
+                self._to_c,
+                *(
+                    self._to_single_field(cls, code, field)
+                    for (cls, code, field) in (
+                        (TO_CRot, ".CRot", "angle"),
+                        (TO_CMfr, ".CMfr", "manufacturer"),
+                        (TO_CMNP, ".CMPN", "part_number"),
+                        (TO_CVal, ".CVal", "value"),
+                        (TO_CMnt, ".CMnt", "mount"),
+                        (TO_CFtp, ".CFtp", "footprint"),
+                        (TO_CPgN, ".CPgN", "name"),
+                        (TO_CPgD, ".CPgD", "description"),
+                        (TO_CHgt, ".CHgt", "height"),
+                        (TO_CLbN, ".CLbn", "name"),
+                        (TO_CLbD, ".CLbD", "description"),
+                    )
+                ),
+                self._to_csup,
+            ],
+        }
+        # Nested step and repeat blocks are not recognized by the pyparsing grammar,
+        # hence they are available only on the top level.
+        self._block_extended_commands: dict[str, list[Rule]] = {
+            **load_commands,
+            **properties,
+            **attributes,
+            "AD": [
+                self._adc,
+                self._adr_ado(ADR, "R,"),
+                self._adr_ado(ADO, "O,"),
+                self._adp,
+                self._ad_macro,
+            ],
+            "AB": [self._ab],
+            "AM": [self._am],
+        }
+        self._extended_commands: dict[str, list[Rule]] = {
+            **self._block_extended_commands,
+            "SR": [self._sr],
+        }
+
+    def get_cls(self, node_cls: Type[T]) -> Type[T]:
+        """Get the class of the node."""
+        return self.ast_node_class_overrides.get(node_cls.__qualname__, node_cls)  # type: ignore[return-value]
+
+    def parse(self, code: Union[str, SourceBuffer], *, strict: bool = True) -> File:
+        """Parse the input.
+
+        Source code can be either `str` or `bytes`-like object, eg. memory mapped file.
+        `bytes`-like source is parsed without decoding it as a whole, only text of
+        tokens is decoded. In such case source information is expressed in bytes and
+        tabs are not expanded, hence locations may differ from ones of `str` source
+        containing tab characters.
+        """
+        # Nodes are interned only within single file, to not keep nodes of all parsed
+        # files alive for the lifetime of parser.
+        self._interned_nodes = {}
+        cursor: _Cursor
+        if isinstance(code, str):
+            # Tabs are expanded to keep source information consistent with pyparsing.
+            code = code.expandtabs()
+            cursor = _Cursor(code)
+        else:
+            cursor = _BufferCursor(code)
+        nodes: list[Node] = []
+        is_empty = True
+
+        while True:
+            mark = cursor.mark()
+            try:
+                self._statement(cursor, nodes, self._extended_commands)
+            except _NoMatchError:
+                cursor.reset(mark)
+                if not self.resilient or not self._invalid(cursor, nodes):
+                    break
+            is_empty = False
+
+        if is_empty or (strict and cursor.skip() != len(code)):
+            msg = "Expected Gerber statement" if is_empty else "Expected end of text"
+            if not isinstance(code, str):
+                code = code[:].decode(SOURCE_ENCODING, errors="replace")
+            raise pp.ParseException(code, cursor.skip(), msg)
+
+        return self.get_cls(File)(
+            source_info=SourceInfo(source=code, location=0, length=len(code)),
+            nodes=nodes,
+        )
+
+    def parse_stream(
+        self,
+        stream: TextIO,
+        *,
+        strict: bool = True,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[Node]:
+        """Parse the input stream and yield top level nodes as soon as they are parsed.
+
+        Only part of the stream containing statements which were not yet parsed is kept
+        in memory. Therefore `SourceInfo.source` of yielded nodes contains only a chunk
+        of the source and `SourceInfo.location` is relative to the beginning of that
+        chunk. Chunks always start at the beginning of a line.
+        """
+        self._interned_nodes = {}
+        reader = _StreamReader(stream, chunk_size)
+        position = reader.read(0)
+        is_empty = True
+
+        while True:
+            cursor = _Cursor(reader.text, position)
+            nodes: list[Node] = []
+            is_matched = True
+            try:
+                self._statement(cursor, nodes, self._extended_commands)
+            except _NoMatchError:
+                cursor.position = position
+                is_matched = self.resilient and self._invalid(cursor, nodes)
+
+            if cursor.is_exhausted and not reader.is_eof:
+                # Statement may span many chunks (eg. large step and repeat block),
+                # hence chunk size is increased to avoid reparsing it over and over.
+                reader.chunk_size *= 2
+                position = reader.read(position)
+                continue
+
+            if not is_matched:
+                break
+
+            yield from nodes
+            is_empty = False
+            position = cursor.position
+            reader.chunk_size = chunk_size
+
+        cursor = _Cursor(reader.text, position)
+        if is_empty or (strict and cursor.skip() != len(reader.text)):
+            msg = "Expected Gerber statement" if is_empty else "Expected end of text"
+            raise pp.ParseException(reader.text, cursor.skip(), msg)
+
+    def _node(
+        self,
+        node_cls: Type[Node],
+        cursor: _Cursor,
+        location: int,
+        length: int,
+        **kw: Any,
+    ) -> Node:
+        if self.discarded_node_types and issubclass(
+            node_cls, self.discarded_node_types
+        ):
+            return _DISCARDED_NODE
+        if self.interned_node_types and issubclass(node_cls, self.interned_node_types):
+            return self.intern(node_cls, kw)
+        return self.get_cls(node_cls)(
+            source_info=SourceInfo(
+                source=cursor.source,
+                location=location,
+                length=cursor.length - length,
+            ),
+            **kw,
+        )
+
+    def intern(self, node_cls: Type[Node], fields: dict[str, Any]) -> Node:
+        """Get shared node of given type with given fields, construct it on first
+        use.
+        """
+        key = (node_cls, *sorted(fields.items()))
+        node = self._interned_nodes.get(key)
+        if node is None:
+            node = self.get_cls(node_cls)(**fields)
+            self._interned_nodes[key] = node
+        return node
+
+    def _statement(
+        self, cursor: _Cursor, nodes: list[Node], extended: dict[str, list[Rule]]
+    ) -> None:
+        character = cursor.peek()
+
+        if character == "%":
+            node = self._extended(cursor, extended)
+            if node is not _DISCARDED_NODE:
+                nodes.append(node)
+            return
+
+        for rule in (self._d_codes, self._g_codes, self._m_codes):
+            mark = cursor.mark()
+            try:
+                rule(cursor, nodes)
+            except _NoMatchError:
+                cursor.reset(mark)
+            else:
+                return
+
+        raise _NoMatchError
+
+    def _extended(self, cursor: _Cursor, extended: dict[str, list[Rule]]) -> Node:
+        position = cursor.skip()
+        cursor.position += 1
+        code_position = cursor.skip()
+        cursor.position = position
+
+        rules = extended.get(cursor.text(code_position, code_position + 2), ())
+
+        for rule in rules:
+            mark = cursor.mark()
+            try:
+                return rule(cursor)
+            except _NoMatchError:
+                cursor.reset(mark)
+
+        raise _NoMatchError
+
+    def _invalid(self, cursor: _Cursor, nodes: list[Node]) -> bool:
+        location = cursor.skip()
+        length = cursor.length
+        try:
+            string = cursor.regex(_INVALID)
+        except _NoMatchError:
+            return False
+        nodes.append(self._node(Invalid, cursor, location, length, string=string))
+        return True
+
+    #  █████  ██████  ███████ ██████  ████████ ██    ██ ██████  ███████
+    # ██   ██ ██   ██ ██      ██   ██    ██    ██    ██ ██   ██ ██
+    # ███████ ██████  █████   ██████     ██    ██    ██ ██████  █████
+    # ██   ██ ██      ██      ██   ██    ██    ██    ██ ██   ██ ██
+    # ██   ██ ██      ███████ ██   ██    ██     ██████  ██   ██ ███████
+
+    def _block_body(self, cursor: _Cursor) -> list[Node]:
+        nodes: list[Node] = []
+        while True:
+            mark = cursor.mark()
+            try:
+                self._statement(cursor, nodes, self._block_extended_commands)
+            except _NoMatchError:
+                cursor.reset(mark)
+                return nodes
+
+    def _ab(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+
+        cursor.literal("%")
+        cursor.literal("AB")
+        aperture_id = cursor.regex(_APERTURE_ID)
+        cursor.literal("*")
+        cursor.literal("%")
+        open_ = self._node(ABopen, cursor, location, length, aperture_id=aperture_id)
+
+        nodes = self._block_body(cursor)
+
+        close_location, close_length = cursor.skip(), cursor.length
+        cursor.literal("%")
+        cursor.literal("AB")
+        cursor.literal("*")
+        cursor.literal("%")
+        close = self._node(ABclose, cursor, close_location, close_length)
+
+        return self._node(
+            AB, cursor, location, length, open=open_, nodes=nodes, close=close
+        )
+
+    def _sr(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+
+        cursor.literal("%")
+        cursor.literal("SR")
+        fields = {}
+        for name in ("X", "Y", "I", "J"):
+            value = self._opt_prefixed(cursor, name, _DOUBLE)
+            if value is not None:
+                fields[name.lower()] = value
+        cursor.literal("*")
+        cursor.literal("%")
+        open_ = self._node(SRopen, cursor, location, length, **fields)
+
+        nodes = self._block_body(cursor)
+
+        close_location, close_length = cursor.skip(), cursor.length
+        cursor.literal("%")
+        cursor.literal("SR")
+        cursor.literal("*")
+        cursor.literal("%")
+        close = self._node(SRclose, cursor, close_location, close_length)
+
+        return self._node(
+            SR, cursor, location, length, open=open_, nodes=nodes, close=close
+        )
+
+    def _am(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+
+        cursor.literal("%")
+        cursor.literal("AM")
+        name = cursor.regex(_NAME)
+        cursor.literal("*")
+        open_ = self._node(AMopen, cursor, location, length, name=name)
+
+        primitives: list[Node] = []
+        while True:
+            mark = cursor.mark()
+            try:
+                primitives.append(self._primitive(cursor))
+            except _NoMatchError:
+                cursor.reset(mark)
+                break
+
+        close_location, close_length = cursor.skip(), cursor.length
+        cursor.literal("%")
+        close = self._node(AMclose, cursor, close_location, close_length)
+
+        return self._node(
+            AM,
+            cursor,
+            location,
+            length,
+            open=open_,
+            primitives=primitives,
+            close=close,
+        )
+
+    def _ad(self, cursor: _Cursor, shape: str) -> str:
+        cursor.literal("%")
+        cursor.literal("AD")
+        aperture_id = cursor.regex(_APERTURE_ID)
+        cursor.literal(shape)
+        return aperture_id
+
+    def _adc(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+        fields = {"aperture_id": self._ad(cursor, "C,")}
+        fields["diameter"] = cursor.regex(_DOUBLE)
+        self._opt_field(cursor, fields, "hole_diameter", "X", _DOUBLE)
+        cursor.literal("*")
+        cursor.literal("%")
+        return self._node(ADC, cursor, location, length, **fields)
+
+    def _adr_ado(self, cls: Type[Node], shape: str) -> Rule:
+        def _(cursor: _Cursor) -> Node:
+            location, length = cursor.skip(), cursor.length
+            fields = {"aperture_id": self._ad(cursor, shape)}
+            fields["width"] = cursor.regex(_DOUBLE)
+            cursor.literal("X")
+            fields["height"] = cursor.regex(_DOUBLE)
+            self._opt_field(cursor, fields, "hole_diameter", "X", _DOUBLE)
+            cursor.literal("*")
+            cursor.literal("%")
+            return self._node(cls, cursor, location, length, **fields)
+
+        return _
+
+    def _adp(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+        fields = {"aperture_id": self._ad(cursor, "P,")}
+        fields["outer_diameter"] = cursor.regex(_DOUBLE)
+        cursor.literal("X")
+        fields["vertices"] = cursor.regex(_DOUBLE)
+        self._opt_field(cursor, fields, "rotation", "X", _DOUBLE)
+        self._opt_field(cursor, fields, "hole_diameter", "X", _DOUBLE)
+        cursor.literal("*")
+        cursor.literal("%")
+        return self._node(ADP, cursor, location, length, **fields)
+
+    def _ad_macro(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+        fields: dict[str, Any] = {"aperture_id": self._ad(cursor, "")}
+        fields["name"] = cursor.regex(_NAME)
+
+        mark = cursor.mark()
+        try:
+            cursor.literal(",")
+            params = [cursor.regex(_DOUBLE)]
+        except _NoMatchError:
+            cursor.reset(mark)
+        else:
+            while (param := self._opt_prefixed(cursor, "X", _DOUBLE)) is not None:
+                params.append(param)
+            fields["params"] = params
+
+        cursor.literal("*")
+        cursor.literal("%")
+        return self._node(ADmacro, cursor, location, length, **fields)
+
+    #  █████  ████████ ████████ ██████  ██ ██████  ██    ██ ████████ ███████
+    # ██   ██    ██       ██    ██   ██ ██ ██   ██ ██    ██    ██    ██
+    # ███████    ██       ██    ██████  ██ ██████  ██    ██    ██    █████
+    # ██   ██    ██       ██    ██   ██ ██ ██   ██ ██    ██    ██    ██
+    # ██   ██    ██       ██    ██   ██ ██ ██████   ██████     ██    ███████
+
+    def _attribute(
+        self,
+        cursor: _Cursor,
+        cls: Type[Node],
+        prefix: str,
+        body: Callable[[_Cursor, dict[str, Any]], None],
+    ) -> Node:
+        location, length = cursor.skip(), cursor.length
+        fields: dict[str, Any] = {}
+        cursor.literal("%")
+        cursor.literal(prefix)
+        body(cursor, fields)
+        cursor.literal("*")
+        cursor.literal("%")
+        return self._node(cls, cursor, location, length, **fields)
+
+    def _fields(self, cursor: _Cursor, fields: dict[str, Any], name: str) -> None:
+        values = []
+        while (value := self._opt_prefixed(cursor, ",", _FIELD)) is not None:
+            values.append(value)
+        if values:
+            fields[name] = values
+
+    def _user_name(self, cls: Type[Node], prefix: str) -> Rule:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            fields["user_name"] = cursor.regex(_USER_NAME)
+            self._fields(cursor, fields, "fields")
+
+        return lambda cursor: self._attribute(cursor, cls, prefix, _body)
+
+    @pp.cached_property
+    def _ta_user_name(self) -> Rule:
+        return self._user_name(TA_UserName, "TA")
+
+    def _ta_aper_function(self, cursor: _Cursor) -> Node:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            cursor.literal(".AperFunction")
+            self._opt_field(cursor, fields, "function", ",", _APER_FUNCTION)
+            self._fields(cursor, fields, "fields")
+
+        return self._attribute(cursor, TA_AperFunction, "TA", _body)
+
+    def _ta_drill_tolerance(self, cursor: _Cursor) -> Node:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            cursor.literal(".DrillTolerance")
+            if self._opt_field(cursor, fields, "plus_tolerance", ",", _DOUBLE):
+                self._opt_field(cursor, fields, "minus_tolerance", ",", _DOUBLE)
+
+        return self._attribute(cursor, TA_DrillTolerance, "TA", _body)
+
+    def _ta_flash_text(self, cursor: _Cursor) -> Node:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            cursor.literal(".FlashText")
+            cursor.literal(",")
+            fields["string"] = cursor.regex(_FIELD)
+            cursor.literal(",")
+            fields["mode"] = cursor.regex(_FLASH_TEXT_MODE)
+            cursor.literal(",")
+            self._opt_field(cursor, fields, "mirroring", "", _FLASH_TEXT_MIRRORING)
+            cursor.literal(",")
+            fields["font"] = cursor.regex(_FIELD)
+            cursor.literal(",")
+            fields["size"] = cursor.regex(_FIELD)
+            self._fields(cursor, fields, "comments")
+
+        return self._attribute(cursor, TA_FlashText, "TA", _body)
+
+    def _td(self, cursor: _Cursor) -> Node:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            mark = cursor.mark()
+            try:
+                fields["name"] = cursor.string()
+            except _NoMatchError:
+                cursor.reset(mark)
+
+        return self._attribute(cursor, TD, "TD", _body)
+
+    @pp.cached_property
+    def _tf_user_name(self) -> Rule:
+        return self._user_name(TF_UserName, "TF")
+
+    def _tf_with_fields(self, cls: Type[Node], code: str, field: str) -> Rule:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            cursor.caseless(code)
+            cursor.literal(",")
+            fields[field] = cursor.regex(_FIELD)
+            self._fields(cursor, fields, "fields")
+
+        return lambda cursor: self._attribute(cursor, cls, "TF", _body)
+
+    @pp.cached_property
+    def _tf_part(self) -> Rule:
+        return self._tf_with_fields(TF_Part, ".Part", "part")
+
+    @pp.cached_property
+    def _tf_file_function(self) -> Rule:
+        return self._tf_with_fields(TF_FileFunction, ".FileFunction", "file_function")
+
+    def _single_field(
+        self, cls: Type[Node], prefix: str, code: str, field: str
+    ) -> Rule:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            cursor.caseless(code)
+            cursor.literal(",")
+            fields[field] = cursor.regex(_FIELD)
+
+        return lambda cursor: self._attribute(cursor, cls, prefix, _body)
+
+    def _optional_fields(
+        self, cls: Type[Node], prefix: str, code: str, *names: str
+    ) -> Rule:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            cursor.caseless(code)
+            for name in names:
+                if not self._opt_field(cursor, fields, name, ",", _FIELD):
+                    break
+
+        return lambda cursor: self._attribute(cursor, cls, prefix, _body)
+
+    @pp.cached_property
+    def _tf_file_polarity(self) -> Rule:
+        return self._single_field(TF_FilePolarity, "TF", ".FilePolarity", "polarity")
+
+    @pp.cached_property
+    def _tf_same_coordinates(self) -> Rule:
+        return self._optional_fields(
+            TF_SameCoordinates, "TF", ".SameCoordinates", "identifier"
+        )
+
+    @pp.cached_property
+    def _tf_creation_date(self) -> Rule:
+        return self._single_field(
+            TF_CreationDate, "TF", ".CreationDate", "creation_date"
+        )
+
+    @pp.cached_property
+    def _tf_generation_software(self) -> Rule:
+        return self._optional_fields(
+            TF_GenerationSoftware,
+            "TF",
+            ".GenerationSoftware",
+            "vendor",
+            "application",
+            "version",
+        )
+
+    @pp.cached_property
+    def _tf_project_id(self) -> Rule:
+        return self._optional_fields(
+            TF_ProjectId, "TF", ".ProjectId", "name", "guid", "revision"
+        )
+
+    @pp.cached_property
+    def _tf_md5(self) -> Rule:
+        return self._single_field(TF_MD5, "TF", ".MD5", "md5")
+
+    @pp.cached_property
+    def _to_user_name(self) -> Rule:
+        return self._user_name(TO_UserName, "TO")
+
+    def _to_n(self, cursor: _Cursor) -> Node:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            cursor.caseless(".N")
+            self._fields(cursor, fields, "net_names")
+
+        return self._attribute(cursor, TO_N, "TO", _body)
+
+    def _to_p(self, cursor: _Cursor) -> Node:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            cursor.caseless(".P")
+            cursor.literal(",")
+            fields["refdes"] = cursor.regex(_FIELD)
+            cursor.literal(",")
+            fields["number"] = cursor.regex(_FIELD)
+            self._opt_field(cursor, fields, "function", ",", _FIELD)
+
+        return self._attribute(cursor, TO_P, "TO", _body)
+
+    @pp.cached_property
+    def _to_c(self) -> Rule:
+        return self._single_field(TO_C, "TO", ".C", "refdes")
+
+    def _to_single_field(self, cls: Type[Node], code: str, field: str) -> Rule:
+        return self._single_field(cls, "TO", code, field)
+
+    def _to_csup(self, cursor: _Cursor) -> Node:
+        def _body(cursor: _Cursor, fields: dict[str, Any]) -> None:
+            cursor.caseless(".CSup")
+            cursor.literal(",")
+            fields["supplier"] = cursor.regex(_FIELD)
+            cursor.literal(",")
+            fields["supplier_part"] = cursor.regex(_FIELD)
+            self._fields(cursor, fields, "other_suppliers")
+
+        return self._attribute(cursor, TO_CSup, "TO", _body)
+
+    # ██████      █████ ███████ ██████  ███████ ███████
+    # ██   ██    ██     ██   ██ ██   ██ ██      ██
+    # ██   ██    ██     ██   ██ ██   ██ █████   ███████
+    # ██   ██    ██     ██   ██ ██   ██ ██           ██
+    # ██████      █████ ███████ ██████  ███████ ███████
+
+    def _d_codes(
+        self, cursor: _Cursor, nodes: list[Node], *, is_standalone: bool = True
+    ) -> None:
+        location, length = cursor.skip(), cursor.length
+
+        for rule in (self._dnn, self._coordinate_d_code):
+            mark = cursor.mark()
+            try:
+                nodes.append(
+                    rule(cursor, location, length, is_standalone=is_standalone)
+                )
+            except _NoMatchError:
+                cursor.reset(mark)
+            else:
+                return
+
+        fields: dict[str, Any] = {}
+        for name, cls in _COORDINATES:
+            coordinate = self._coordinate(cursor, name, cls)
+            if coordinate is not None:
+                fields[name] = coordinate
+
+        mark = cursor.mark()
+        try:
+            code = cursor.regex(_D_CODE, 1)
+        except _NoMatchError:
+            if not self.syntax_switches.allow_d01_without_code:
+                raise
+            cursor.reset(mark)
+            code = "1"
+
+        cursor.literal("*")
+
+        if code == "1":
+            cls = D01
+        elif "i" in fields or "j" in fields:
+            raise _NoMatchError
+        else:
+            cls = D02 if code == "2" else D03
+
+        nodes.append(
+            self._node(
+                cls, cursor, location, length, is_standalone=is_standalone, **fields
+            )
+        )
+
+    def _dnn(
+        self, cursor: _Cursor, location: int, length: int, *, is_standalone: bool
+    ) -> Node:
+        if not cursor.startswith("D", location):
+            raise _NoMatchError
+
+        aperture_id = cursor.regex(_APERTURE_ID)
+        cursor.literal("*")
+        return self._node(
+            Dnn,
+            cursor,
+            location,
+            length,
+            is_standalone=is_standalone,
+            aperture_id=aperture_id,
+        )
+
+    def _coordinate_d_code(
+        self, cursor: _Cursor, location: int, length: int, *, is_standalone: bool
+    ) -> Node:
+        # Fast path for D01, D02 and D03 commands without whitespace between tokens,
+        # which make up vast majority of typical Gerber files.
+        *coordinates, code = cursor.groups(self._coordinate_d_code_pattern)
+
+        fields: dict[str, Node] = {}
+        coordinate_location = location
+        for token, (name, coordinate_cls) in zip(coordinates, _COORDINATES):
+            if token is not None and self._intern_coordinates:
+                fields[name] = self.intern(
+                    coordinate_cls, {"value": PackedCoordinateStr(token[1:])}
+                )
+                coordinate_location += len(token)
+            elif token is not None:
+                fields[name] = self.get_cls(coordinate_cls)(
+                    source_info=SourceInfo(
+                        source=cursor.source,
+                        location=coordinate_location,
+                        length=len(token),
+                    ),
+                    value=PackedCoordinateStr(token[1:]),
+                )
+                coordinate_location += len(token)
+
+        if code is None or code == "1":
+            cls = D01
+        elif "i" in fields or "j" in fields:
+            raise _NoMatchError
+        else:
+            cls = D02 if code == "2" else D03
+
+        return self._node(
+            cls, cursor, location, length, is_standalone=is_standalone, **fields
+        )
+
+    def _coordinate(
+        self, cursor: _Cursor, name: str, cls: Type[Node]
+    ) -> Optional[Node]:
+        mark = cursor.mark()
+        location, length = cursor.skip(), cursor.length
+        try:
+            cursor.caseless(name)
+            value = cursor.regex(_INTEGER)
+        except _NoMatchError:
+            cursor.reset(mark)
+            return None
+        return self._node(cls, cursor, location, length, value=value)
+
+    #  ██████      █████ ███████ ██████  ███████ ███████
+    # ██          ██     ██   ██ ██   ██ ██      ██
+    # ██   ███    ██     ██   ██ ██   ██ █████   ███████
+    # ██    ██    ██     ██   ██ ██   ██ ██           ██
+    #  ██████      █████ ███████ ██████  ███████ ███████
+
+    def _g_codes(self, cursor: _Cursor, nodes: list[Node]) -> None:
+        location, length = cursor.skip(), cursor.length
+        mark = cursor.mark()
+
+        try:
+            cursor.regex(_G04)
+            fields = {}
+            if not cursor.startswith("*", cursor.position):
+                fields["string"] = cursor.string()
+            cursor.literal("*")
+        except _NoMatchError:
+            cursor.reset(mark)
+        else:
+            node = self._node(G04, cursor, location, length, **fields)
+            if node is not _DISCARDED_NODE:
+                nodes.append(node)
+            return
+
+        code = cursor.regex(_G_CODE, 1)
+        cls = _G_CODES.get(int(code))
+        if cls is None:
+            raise _NoMatchError
+
+        if cursor.peek() == "*":
+            cursor.literal("*")
+            nodes.append(self._node(cls, cursor, location, length, is_standalone=True))
+            return
+
+        if cursor.peek() not in _NON_STANDALONE_LOOKAHEAD:
+            raise _NoMatchError
+
+        g_code = self._node(cls, cursor, location, length, is_standalone=False)
+        self._d_codes(cursor, nodes, is_standalone=False)
+        nodes.insert(len(nodes) - 1, g_code)
+
+    # ███    ███     █████ ███████ ██████  ███████ ███████
+    # ████  ████    ██     ██   ██ ██   ██ ██      ██
+    # ██ ████ ██    ██     ██   ██ ██   ██ █████   ███████
+    # ██  ██  ██    ██     ██   ██ ██   ██ ██           ██
+    # ██      ██     █████ ███████ ██████  ███████ ███████
+
+    def _m_codes(self, cursor: _Cursor, nodes: list[Node]) -> None:
+        location, length = cursor.skip(), cursor.length
+        code = cursor.regex(_M_CODE, 1)
+        cursor.literal("*")
+        nodes.append(self._node(_M_CODES[code], cursor, location, length))
+
+    # ██      ██████   █████  ██████      █████ ███████ ███    ███ ███    ███  █████  ███    ██ ██████  ███████ # noqa: E501
+    # ██     ██    ██ ██   ██ ██   ██    ██     ██   ██ ████  ████ ████  ████ ██   ██ ████   ██ ██   ██ ██      # noqa: E501
+    # ██     ██    ██ ███████ ██   ██    ██     ██   ██ ██ ████ ██ ██ ████ ██ ███████ ██ ██  ██ ██   ██ ███████ # noqa: E501
+    # ██     ██    ██ ██   ██ ██   ██    ██     ██   ██ ██  ██  ██ ██  ██  ██ ██   ██ ██  ██ ██ ██   ██      ██ # noqa: E501
+    # ██████ ███████  ██   ██ ██████      █████ ███████ ██      ██ ██      ██ ██   ██ ██   ████ ██████  ███████ # noqa: E501
+
+    def _simple_extended(
+        self, cursor: _Cursor, cls: Type[Node], code: str, field: str, value: Any
+    ) -> Node:
+        location, length = cursor.skip(), cursor.length
+        cursor.literal("%")
+        cursor.literal(code)
+        if isinstance(value, re.Pattern):
+            fields = {field: cursor.regex(value)}
+        else:
+            fields = {field: cursor.string()}
+        cursor.literal("*")
+        cursor.literal("%")
+        return self._node(cls, cursor, location, length, **fields)
+
+    def _ln(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(cursor, LN, "LN", "name", None)
+
+    def _lp(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(cursor, LP, "LP", "polarity", _POLARITY)
+
+    def _lr(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(cursor, LR, "LR", "rotation", _DOUBLE)
+
+    def _ls(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(cursor, LS, "LS", "scale", _DOUBLE)
+
+    def _lm(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(cursor, LM, "LM", "mirroring", _MIRRORING)
+
+    # ██████  ██████   ██████  ██████  ███████ ██████  ████████ ██ ███████ ███████
+    # ██   ██ ██   ██ ██    ██ ██   ██ ██      ██   ██    ██    ██ ██      ██
+    # ██████  ██████  ██    ██ ██████  █████   ██████     ██    ██ █████   ███████
+    # ██      ██   ██ ██    ██ ██      ██      ██   ██    ██    ██ ██           ██
+    # ██      ██   ██  ██████  ██      ███████ ██   ██    ██    ██ ███████ ███████
+
+    def _fs(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+        cursor.literal("%")
+        cursor.literal("FS")
+        fields = {
+            "zeros": cursor.regex(_ZEROS),
+            "coordinate_mode": cursor.regex(_COORDINATE_MODE),
+        }
+        cursor.caseless("X")
+        fields["x_integral"] = cursor.regex(_DIGIT)
+        fields["x_decimal"] = cursor.regex(_DIGIT)
+        cursor.caseless("Y")
+        fields["y_integral"] = cursor.regex(_DIGIT)
+        fields["y_decimal"] = cursor.regex(_DIGIT)
+        cursor.literal("*")
+        cursor.literal("%")
+        return self._node(FS, cursor, location, length, **fields)
+
+    def _mo(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(cursor, MO, "MO", "mode", _UNIT_MODE)
+
+    def _ip(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(cursor, IP, "IP", "polarity", _IMAGE_POLARITY)
+
+    def _ir(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(cursor, IR, "IR", "rotation_degrees", _DOUBLE)
+
+    def _as(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(
+            cursor, AS, "AS", "correspondence", _CORRESPONDENCE
+        )
+
+    def _in(self, cursor: _Cursor) -> Node:
+        return self._simple_extended(cursor, IN, "IN", "name", None)
+
+    def _a_b(
+        self,
+        cursor: _Cursor,
+        cls: Type[Node],
+        code: str,
+        names: Tuple[str, str],
+        value: re.Pattern[str],
+    ) -> Node:
+        location, length = cursor.skip(), cursor.length
+        cursor.literal("%")
+        cursor.literal(code)
+        fields: dict[str, Any] = {}
+        self._opt_field(cursor, fields, names[0], "A", value)
+        self._opt_field(cursor, fields, names[1], "B", value)
+        cursor.literal("*")
+        cursor.literal("%")
+        return self._node(cls, cursor, location, length, **fields)
+
+    def _of(self, cursor: _Cursor) -> Node:
+        return self._a_b(cursor, OF, "OF", ("a_offset", "b_offset"), _DOUBLE)
+
+    def _mi(self, cursor: _Cursor) -> Node:
+        return self._a_b(cursor, MI, "MI", ("a_mirroring", "b_mirroring"), _BOOLEAN)
+
+    def _sf(self, cursor: _Cursor) -> Node:
+        return self._a_b(cursor, SF, "SF", ("a_scale", "b_scale"), _DOUBLE)
+
+    # ██████  ██████  ██ ███    ███ ██ ████████ ██ ██    ██ ███████ ███████
+    # ██   ██ ██   ██ ██ ████  ████ ██    ██    ██ ██    ██ ██      ██
+    # ██████  ██████  ██ ██ ████ ██ ██    ██    ██ ██    ██ █████   ███████
+    # ██      ██   ██ ██ ██  ██  ██ ██    ██    ██  ██  ██  ██           ██
+    # ██      ██   ██ ██ ██      ██ ██    ██    ██   ████   ███████ ███████
+
+    def _primitive(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+        if cursor.startswith("$", location):
+            variable = self._variable(cursor)
+            cursor.literal("=")
+            expression = self._expression(cursor)
+            cursor.literal("*")
+            return self._node(
+                Assignment,
+                cursor,
+                location,
+                length,
+                variable=variable,
+                expression=expression,
+            )
+
+        if cursor.startswith("0", location):
+            cursor.literal("0")
+            string = cursor.string()
+            cursor.literal("*")
+            return self._node(Code0, cursor, location, length, string=string)
+
+        if cursor.startswith("4", location):
+            return self._code_4(cursor, location, length)
+
+        code = cursor.text(location, location + 2)
+        if code not in _PRIMITIVES:
+            code = code[:1]
+        cls, names = _PRIMITIVES.get(code, (None, ()))
+        if cls is None:
+            raise _NoMatchError
+
+        cursor.literal(code)
+        fields = {}
+        for name in names:
+            cursor.literal(",")
+            fields[name] = self._expression(cursor)
+        if cls is Code1:
+            mark = cursor.mark()
+            try:
+                cursor.literal(",")
+                fields["rotation"] = self._expression(cursor)
+            except _NoMatchError:
+                cursor.reset(mark)
+        cursor.literal("*")
+        return self._node(cls, cursor, location, length, **fields)
+
+    def _code_4(self, cursor: _Cursor, location: int, length: int) -> Node:
+        cursor.literal("4")
+        fields: dict[str, Any] = {}
+        for name in ("exposure", "number_of_points", "start_x", "start_y"):
+            cursor.literal(",")
+            fields[name] = self._expression(cursor)
+
+        points = []
+        while True:
+            mark = cursor.mark()
+            point_location, point_length = cursor.skip(), cursor.length
+            try:
+                cursor.literal(",")
+                x = self._expression(cursor)
+                cursor.literal(",")
+                y = self._expression(cursor)
+            except _NoMatchError:
+                cursor.reset(mark)
+                break
+            points.append(
+                self._node(Point, cursor, point_location, point_length, x=x, y=y)
+            )
+        if not points:
+            raise _NoMatchError
+        fields["points"] = points
+
+        cursor.literal(",")
+        fields["rotation"] = self._expression(cursor)
+        cursor.literal("*")
+        return self._node(Code4, cursor, location, length, **fields)
+
+    # ███    ███  █████  ████████ ██   ██
+    # ████  ████ ██   ██    ██    ██   ██
+    # ██ ████ ██ ███████    ██    ███████
+    # ██  ██  ██ ██   ██    ██    ██   ██
+    # ██      ██ ██   ██    ██    ██   ██
+
+    def _expression(self, cursor: _Cursor) -> Node:
+        return self._add(cursor)
+
+    def _binary(
+        self,
+        cursor: _Cursor,
+        cls: Type[Node],
+        operator: re.Pattern[str],
+        operand: Rule,
+    ) -> Node:
+        location, length = cursor.skip(), cursor.length
+        head = operand(cursor)
+        tail = []
+        while True:
+            mark = cursor.mark()
+            try:
+                cursor.regex(operator)
+                tail.append(operand(cursor))
+            except _NoMatchError:
+                cursor.reset(mark)
+                break
+        if not tail:
+            return head
+        return self._node(cls, cursor, location, length, head=head, tail=tail)
+
+    def _unary(
+        self, cursor: _Cursor, cls: Type[Node], operator: str, operand: Rule
+    ) -> Node:
+        mark = cursor.mark()
+        location, length = cursor.skip(), cursor.length
+        if cursor.startswith(operator, location):
+            try:
+                cursor.literal(operator)
+                value = self._unary(cursor, cls, operator, operand)
+            except _NoMatchError:
+                cursor.reset(mark)
+            else:
+                return self._node(cls, cursor, location, length, operand=value)
+        return operand(cursor)
+
+    def _add(self, cursor: _Cursor) -> Node:
+        return self._binary(cursor, Add, _ADD_OPERATOR, self._sub)
+
+    def _sub(self, cursor: _Cursor) -> Node:
+        return self._binary(cursor, Sub, _SUB_OPERATOR, self._mul)
+
+    def _mul(self, cursor: _Cursor) -> Node:
+        return self._binary(cursor, Mul, _MUL_OPERATOR, self._div)
+
+    def _div(self, cursor: _Cursor) -> Node:
+        return self._binary(cursor, Div, _DIV_OPERATOR, self._pos)
+
+    def _pos(self, cursor: _Cursor) -> Node:
+        return self._unary(cursor, Pos, "+", self._neg)
+
+    def _neg(self, cursor: _Cursor) -> Node:
+        return self._unary(cursor, Neg, "-", self._factor)
+
+    def _factor(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+        character = cursor.text(location, location + 1)
+
+        if character == "$":
+            return self._variable(cursor)
+
+        if character == "(":
+            cursor.literal("(")
+            inner = self._expression(cursor)
+            cursor.literal(")")
+            return self._node(Parenthesis, cursor, location, length, inner=inner)
+
+        constant = cursor.regex(_DOUBLE)
+        return self._node(Constant, cursor, location, length, constant=constant)
+
+    def _variable(self, cursor: _Cursor) -> Node:
+        location, length = cursor.skip(), cursor.length
+        variable = cursor.regex(_VARIABLE)
+        return self._node(Variable, cursor, location, length, variable=variable)
+
+    #  ██████ ████████ ██   ██ ███████ ██████
+    # ██    ██   ██    ██   ██ ██      ██   ██
+    # ██    ██   ██    ███████ █████   ██████
+    # ██    ██   ██    ██   ██ ██      ██   ██
+    #  ██████    ██    ██   ██ ███████ ██   ██
+
+    def _opt_prefixed(
+        self, cursor: _Cursor, prefix: str, pattern: re.Pattern[str]
+    ) -> Optional[str]:
+        mark = cursor.mark()
+        try:
+            cursor.literal(prefix)
+            return cursor.regex(pattern)
+        except _NoMatchError:
+            cursor.reset(mark)
+            return None
+
+    def _opt_field(
+        self,
+        cursor: _Cursor,
+        fields: dict[str, Any],
+        name: str,
+        prefix: str,
+        pattern: re.Pattern[str],
+    ) -> bool:
+        value = self._opt_prefixed(cursor, prefix, pattern)
+        if value is None:
+            return False
+        fields[name] = value
+        return True
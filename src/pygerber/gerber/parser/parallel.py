@@ -0,0 +1,173 @@
+"""The `parallel` module contains implementation of parallel parsing of single Gerber
+file across multiple processes.
+
+Source code is split into chunks at statement boundaries which are safe to split at,
+ie. after `*` or `%` ending statement which is neither inside of extended command
+(`%...%`) nor inside of aperture block (`AB`) or step and repeat block (`SR`).
+Chunks are parsed in separate processes and resulting nodes are merged into single
+`File` node, with source information pointing to original source code.
+"""
+
+from __future__ import annotations
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Literal,
+    NoReturn,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+import pyparsing as pp
+
+from pygerber.gerber.ast.nodes import File, Node, SourceInfo
+from pygerber.gerber.ast.serialization import dumps, loads
+
+if TYPE_CHECKING:
+    from pygerber.gerber.ast.nodes.base import SourceBuffer
+
+_STATEMENT_END = re.compile(r"[%*]")
+_STATEMENT_END_BYTES = re.compile(rb"[%*]")
+_BLOCK_COMMAND = re.compile(r"[ \t\n\r]*(AB|SR)[ \t\n\r]*(\*)?")
+_BLOCK_COMMAND_BYTES = re.compile(rb"[ \t\n\r]*(AB|SR)[ \t\n\r]*(\*)?")
+
+
+def get_chunk_offsets(code: Union[str, SourceBuffer], chunk_count: int) -> list[int]:
+    """Get offsets of beginnings of chunks of similar size which source code can be
+    split into without splitting any statement.
+
+    Returned list always starts with 0. It may contain less than `chunk_count` offsets
+    when there is not enough safe places to split source code at.
+    """
+    if isinstance(code, str):
+        statement_end, block_command = _STATEMENT_END, _BLOCK_COMMAND
+        percent: Union[str, bytes] = "%"
+    else:
+        statement_end, block_command = _STATEMENT_END_BYTES, _BLOCK_COMMAND_BYTES  # type: ignore[assignment]
+        percent = b"%"
+
+    target_size = len(code) // chunk_count
+    offsets = [0]
+    is_extended = False
+    block_depth = 0
+
+    for match in statement_end.finditer(code):  # type: ignore[arg-type]
+        end = match.end()
+
+        if match.group(0) == percent:
+            is_extended = not is_extended
+            if is_extended:
+                block = block_command.match(code, end)  # type: ignore[arg-type]
+                if block is not None:
+                    # Block is closed with `%AB*%` or `%SR*%`, any other variant opens
+                    # new block.
+                    block_depth += -1 if block.group(2) else 1
+                continue
+
+        elif is_extended:
+            continue
+
+        if (
+            block_depth == 0
+            and end - offsets[-1] >= target_size
+            and len(offsets) < chunk_count
+        ):
+            offsets.append(end)
+
+    # Last chunk must contain at least one statement.
+    if len(offsets) > 1 and not code[offsets[-1] :].strip():
+        offsets.pop()
+
+    return offsets
+
+
+def parse_parallel(
+    code: Union[str, SourceBuffer],
+    *,
+    jobs: int,
+    strict: bool = True,
+    parser: Literal["pyparsing", "native"] = "pyparsing",
+    ast_node_class_overrides: Optional[dict[str, Type[Node]]] = None,
+    optimization: int = 0,
+) -> File:
+    """Parse Gerber X3 source code in chunks, in `jobs` processes in parallel.
+
+    See `pygerber.gerber.parser.parse()` for description of parameters.
+    """
+    if isinstance(code, str):
+        # Tabs are expanded to keep source information consistent with sequential
+        # parsing, as chunks are no longer aware of their column offsets.
+        code = code.expandtabs()
+
+    offsets = get_chunk_offsets(code, jobs)
+    chunks = [code[start:end] for start, end in zip(offsets, [*offsets[1:], len(code)])]
+    options: dict[str, Any] = {
+        "parser": parser,
+        "ast_node_class_overrides": ast_node_class_overrides,
+        "optimization": optimization,
+    }
+    nodes: list[Node] = []
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as executor:
+        results = executor.map(_parse_chunk, chunks, repeat(options))
+
+        for offset, result in zip(offsets, results):
+            if isinstance(result, bytes):
+                nodes.extend(_load_nodes(result, code, offset))
+                continue
+
+            if strict:
+                _raise_parse_exception(code, offset + result[0], result[1])
+
+            # Non-strict parsing stops at first unrecognized token, hence rest of the
+            # code is parsed without splitting, as it would be in sequential parsing.
+            tail_result = _parse_chunk(code[offset:], {**options, "strict": False})
+            if isinstance(tail_result, bytes):
+                nodes.extend(_load_nodes(tail_result, code, offset))
+            elif not nodes:
+                _raise_parse_exception(code, offset + tail_result[0], tail_result[1])
+            break
+
+    file_cls = cast(
+        "Type[File]", (ast_node_class_overrides or {}).get(File.__qualname__, File)
+    )
+    return file_cls(
+        source_info=SourceInfo(source=code, location=0, length=len(code)),
+        nodes=nodes,
+    )
+
+
+def _parse_chunk(
+    chunk: Union[str, bytes], options: dict[str, Any]
+) -> Union[bytes, Tuple[int, str]]:
+    from pygerber.gerber.parser import parse  # noqa: PLC0415
+
+    try:
+        ast = parse(chunk, **options)
+    except pp.ParseException as exception:
+        # Exceptions raised by pyparsing may hold reference to parser element, which
+        # can not be pickled, hence only location and message are sent back.
+        return exception.loc, exception.msg
+
+    return dumps(ast.nodes)
+
+
+def _load_nodes(data: bytes, code: Union[str, SourceBuffer], offset: int) -> list[Node]:
+    nodes = loads(data, code, offset)
+    assert isinstance(nodes, list)
+    return nodes
+
+
+def _raise_parse_exception(
+    code: Union[str, SourceBuffer], location: int, message: str
+) -> NoReturn:
+    if not isinstance(code, str):
+        code = code[:].decode("utf-8", errors="replace")
+    raise pp.ParseException(code, location, message)
@@ -4,8 +4,21 @@ library.
 
 from __future__ import annotations
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from enum import IntFlag
-from typing import Any, Callable, Iterable, Literal, Optional, Type, TypeVar, cast
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Literal,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import pyparsing as pp
 from pydantic import BaseModel
@@ -52,8 +65,11 @@ from pygerber.gerber.ast.nodes import (
     OF,
     SF,
     SR,
+    TA,
     TD,
+    TF,
     TF_MD5,
+    TO,
     TO_C,
     TO_CMNP,
     TO_N,
@@ -76,6 +92,7 @@ from pygerber.gerber.ast.nodes import (
     Code21,
     Code22,
     Constant,
+    Coordinate,
     CoordinateI,
     CoordinateJ,
     CoordinateX,
@@ -83,6 +100,7 @@ from pygerber.gerber.ast.nodes import (
     Div,
     Dnn,
     File,
+    G,
     Invalid,
     Mul,
     Neg,
@@ -124,12 +142,59 @@ from pygerber.gerber.ast.nodes.enums import AperFunction
 
 T = TypeVar("T", bound=Node)
 
+_INTERNED_NODES: ContextVar[Optional[dict[tuple[Any, ...], Node]]] = ContextVar(
+    "_INTERNED_NODES", default=None
+)
+
+
+@contextmanager
+def intern_scope() -> Iterator[None]:
+    """Share interned nodes only between nodes parsed within this context.
+
+    Built grammars are cached and shared by all parsers, hence table of interned nodes
+    can not be stored in grammar, it would grow with every parsed file and would be
+    modified by parsers running in other threads.
+    """
+    token = _INTERNED_NODES.set({})
+    try:
+        yield
+    finally:
+        _INTERNED_NODES.reset(token)
+
 
 class Optimization(IntFlag):
     """Namespace class holding optimization level constants."""
 
     DISCARD_COMMENTS = 0b0000_0010
+    """Discard comments (G04), they are parsed but nodes are not constructed."""
+
     DISCARD_ATTRIBUTES = 0b0000_0100
+    """Discard attributes (TA, TD, TF, TO), they are parsed but nodes are not
+    constructed.
+    """
+
+    INTERN_NODES = 0b0000_1000
+    """Share single instance between all parameter-identical G codes, Dnn, load
+    commands (LN, LP, LM, LR, LS) and coordinates, instead of constructing new node
+    for each occurrence. Shared nodes have no source information, hence this flag is
+    meant for rendering only pipelines, where source locations are not needed.
+    Shared nodes must not be mutated, as change would affect all their occurrences.
+    """
+
+    def get_discarded_node_types(self) -> tuple[Type[Node], ...]:
+        """Get node types which should be discarded during parsing."""
+        discarded: tuple[Type[Node], ...] = ()
+        if self & Optimization.DISCARD_COMMENTS:
+            discarded += (G04,)
+        if self & Optimization.DISCARD_ATTRIBUTES:
+            discarded += (TA, TD, TF, TO)
+        return discarded
+
+    def get_interned_node_types(self) -> tuple[Type[Node], ...]:
+        """Get node types which should be interned during parsing."""
+        if self & Optimization.INTERN_NODES:
+            return (G, Dnn, LN, LP, LM, LR, LS, Coordinate)
+        return ()
 
 
 class SyntaxSwitches(BaseModel):
@@ -182,6 +247,10 @@ class Grammar:
         self.packrat_cache_size = packrat_cache_size
         self.enable_debug = enable_debug
         self.optimization = optimization
+        self.discarded_node_types = Optimization(
+            optimization
+        ).get_discarded_node_types()
+        self.interned_node_types = Optimization(optimization).get_interned_node_types()
 
         self.step_repeat_forward = pp.Forward()
         self.aperture_block_forward = pp.Forward()
@@ -326,8 +395,32 @@ class Grammar:
         self,
         node_type: Type[Node],
         **kwargs: Any,
-    ) -> Callable[[str, int, pp.ParseResults], Node]:
-        """Create a callback for unpacking the results of the parser."""
+    ) -> Callable[[str, int, pp.ParseResults], Node | list[Node]]:
+        """Create a callback for unpacking the results of the parser.
+
+        For node types discarded due to optimization flags, callback does not construct
+        node and returns no tokens instead. For node types interned due to optimization
+        flags, callback returns shared node without source information.
+        """
+        if issubclass(node_type, self.discarded_node_types):
+
+            def _discard(s: str, loc: int, tokens: pp.ParseResults) -> list[Node]:  # noqa: ARG001
+                return []
+
+            return _discard
+
+        if issubclass(node_type, self.interned_node_types):
+            field_names = self.get_cls(node_type).model_fields.keys()
+
+            def _intern(s: str, loc: int, tokens: pp.ParseResults) -> Node:  # noqa: ARG001
+                # Results may contain names of nested results, which are not fields
+                # of the node and would prevent sharing identical nodes.
+                fields = {**tokens.as_dict(), **kwargs}
+                return self.intern(
+                    node_type, {k: v for k, v in fields.items() if k in field_names}
+                )
+
+            return _intern
 
         def _(s: str, loc: int, tokens: pp.ParseResults) -> Node:
             return self.get_cls(node_type)(
@@ -340,6 +433,23 @@ class Grammar:
 
         return _
 
+    def intern(self, node_type: Type[Node], fields: dict[str, Any]) -> Node:
+        """Get shared node of given type with given fields, construct it on first
+        use within current `intern_scope()`.
+
+        Outside of `intern_scope()` new node is constructed on every call.
+        """
+        interned_nodes = _INTERNED_NODES.get()
+        if interned_nodes is None:
+            return self.get_cls(node_type)(**fields)
+
+        key = (node_type, *sorted(fields.items()))
+        node = interned_nodes.get(key)
+        if node is None:
+            node = self.get_cls(node_type)(**fields)
+            interned_nodes[key] = node
+        return node
+
     #  █████  ██████  ███████ ██████  ████████ ██    ██ ██████  ███████
     # ██   ██ ██   ██ ██      ██   ██    ██    ██    ██ ██   ██ ██
     # ███████ ██████  █████   ██████     ██    ██    ██ ██████  █████
@@ -1126,7 +1236,74 @@ class Grammar:
     @pp.cached_property
     def d_codes_standalone(self) -> pp.ParserElement:
         """Create a parser element capable of parsing standalone D-codes."""
-        return self._d_codes(is_standalone=True)
+        return pp.MatchFirst(
+            [
+                self._coordinate_d_codes_fast_path,
+                self._d_codes(is_standalone=True),
+            ]
+        )
+
+    @pp.cached_property
+    def _coordinate_d_codes_fast_path(self) -> pp.ParserElement:
+        """Create a parser element capable of parsing D01, D02 and D03 commands
+        written without whitespace between tokens, eg. `X123Y456D01*`.
+
+        Such statements make up vast majority of typical Gerber files, therefore they
+        are matched with single regular expression and nodes are constructed directly
+        from its groups, bypassing the general D-code grammar. Anything else is left
+        for the general grammar to handle.
+        """
+        code = r"(D0*(?P<code>[123]))"
+        if self.syntax_switches.allow_d01_without_code:
+            code += "?"
+
+        intern_coordinates = issubclass(Coordinate, self.interned_node_types)
+
+        def _(s: str, loc: int, tokens: pp.ParseResults) -> Node:
+            fields: dict[str, Any] = {}
+            location = loc
+
+            for name, cls in (
+                ("x", CoordinateX),
+                ("y", CoordinateY),
+                ("i", CoordinateI),
+                ("j", CoordinateJ),
+            ):
+                token = tokens.get(name)
+                if token is not None and intern_coordinates:
+                    fields[name] = self.intern(cls, {"value": token[1:]})
+                    location += len(token)
+                elif token is not None:
+                    fields[name] = self.get_cls(cls)(
+                        source_info=SourceInfo(
+                            source=s, location=location, length=len(token)
+                        ),
+                        value=token[1:],
+                    )
+                    location += len(token)
+
+            node_cls: Type[Union[D01, D02, D03]] = D01
+            if tokens.get("code") in ("2", "3"):
+                if "i" in fields or "j" in fields:
+                    msg = "Expected D01 command"
+                    raise pp.ParseException(s, loc, msg)
+                node_cls = D02 if tokens.get("code") == "2" else D03
+
+            return self.get_cls(node_cls)(
+                source_info=SourceInfo(source=s, location=loc, length=len(tokens[0])),
+                is_standalone=True,
+                **fields,
+            )
+
+        return (
+            pp.Regex(
+                r"(?P<x>[Xx][+-]?[0-9]+)?(?P<y>[Yy][+-]?[0-9]+)?"
+                r"(?P<i>[Ii][+-]?[0-9]+)?(?P<j>[Jj][+-]?[0-9]+)?"
+                rf"{code}\*"
+            )
+            .set_parse_action(_)
+            .set_name("coordinate D-code")
+        )
 
     @pp.cached_property
     def d_codes_non_standalone(self) -> pp.ParserElement:
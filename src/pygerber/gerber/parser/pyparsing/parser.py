@@ -4,30 +4,97 @@ library.
 
 from __future__ import annotations
 
-from typing import Optional, Type
+import threading
+from typing import TYPE_CHECKING, Optional, Tuple, Type
 
 from pygerber.gerber.ast.nodes.base import Node
 from pygerber.gerber.ast.nodes.file import File
-from pygerber.gerber.parser.pyparsing.grammar import Grammar
+from pygerber.gerber.parser.pyparsing.grammar import (
+    Grammar,
+    SyntaxSwitches,
+    intern_scope,
+)
+
+if TYPE_CHECKING:
+    import pyparsing as pp
+    from typing_extensions import TypeAlias
+
+GrammarKey: TypeAlias = Tuple[
+    Tuple[Tuple[str, Type[Node]], ...], bool, Tuple[Tuple[str, bool], ...], int
+]
+
+_GRAMMAR_CACHE: dict[GrammarKey, pp.ParserElement] = {}
+_GRAMMAR_CACHE_LOCK = threading.Lock()
+
+
+def get_grammar(
+    ast_node_class_overrides: Optional[dict[str, Type[Node]]] = None,
+    *,
+    resilient: bool = False,
+    syntax_switches: Optional[SyntaxSwitches] = None,
+    optimization: int = 0,
+) -> pp.ParserElement:
+    """Get built grammar from process-wide cache, build it if it was not built yet.
+
+    Building grammar is expensive, hence grammars are built only once for every
+    combination of arguments and then reused by all parsers.
+    """
+    ast_node_class_overrides = ast_node_class_overrides or {}
+    syntax_switches = syntax_switches or SyntaxSwitches()
+    key: GrammarKey = (
+        tuple(sorted(ast_node_class_overrides.items())),
+        resilient,
+        tuple(syntax_switches.model_dump().items()),
+        int(optimization),
+    )
+    grammar = _GRAMMAR_CACHE.get(key)
+    if grammar is not None:
+        return grammar
+
+    with _GRAMMAR_CACHE_LOCK:
+        grammar = _GRAMMAR_CACHE.get(key)
+        if grammar is None:
+            builder = Grammar(
+                ast_node_class_overrides,
+                syntax_switches,
+                optimization=optimization,
+            )
+            grammar = builder.build_resilient() if resilient else builder.build()
+            # Streamlining modifies grammar, hence it has to be done before grammar
+            # is shared between threads.
+            grammar.streamline()
+            _GRAMMAR_CACHE[key] = grammar
+
+    return grammar
 
 
 class Parser:
-    """Gerber X3 parser implementation."""
+    """Gerber X3 parser implementation.
+
+    Parser does not hold any state between `parse()` calls, therefore single instance
+    can be reused for parsing many files, also from multiple threads.
+    """
 
     def __init__(
         self,
         ast_node_class_overrides: Optional[dict[str, Type[Node]]] = None,
         *,
         resilient: bool = False,
+        syntax_switches: Optional[SyntaxSwitches] = None,
+        optimization: int = 0,
     ) -> None:
-        builder = Grammar(ast_node_class_overrides or {})
-        if resilient:
-            self.grammar = builder.build_resilient()
-        else:
-            self.grammar = builder.build()
+        self.grammar = get_grammar(
+            ast_node_class_overrides,
+            resilient=resilient,
+            syntax_switches=syntax_switches,
+            optimization=optimization,
+        )
 
     def parse(self, code: str, *, strict: bool = True) -> File:
         """Parse the input."""
-        parse_result = self.grammar.parseString(code, parse_all=strict).get("root_node")
+        with intern_scope():
+            parse_result = self.grammar.parseString(code, parse_all=strict).get(
+                "root_node"
+            )
         assert isinstance(parse_result, File)
         return parse_result
@@ -9,7 +9,14 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from pygerber.vm.commands import EndLayer, PasteLayer, Shape, StartLayer
+    from pygerber.vm.commands import (
+        EndLayer,
+        PasteLayer,
+        PasteLayerBatch,
+        Polyline,
+        Shape,
+        StartLayer,
+    )
 
 
 class CommandVisitor:
@@ -18,6 +25,9 @@ class CommandVisitor:
     def on_shape(self, command: Shape) -> None:
         """Visit `Shape` command."""
 
+    def on_polyline(self, command: Polyline) -> None:
+        """Visit `Polyline` command."""
+
     def on_start_layer(self, command: StartLayer) -> None:
         """Visit `StartLayer` command."""
 
@@ -26,3 +36,6 @@ class CommandVisitor:
 
     def on_paste_layer(self, command: PasteLayer) -> None:
         """Visit `PasteLayer` command."""
+
+    def on_paste_layer_batch(self, command: PasteLayerBatch) -> None:
+        """Visit `PasteLayerBatch` command."""
@@ -6,7 +6,8 @@ from __future__ import annotations
 
 from pygerber.vm.commands.command import Command
 from pygerber.vm.commands.layer import EndLayer, StartLayer
-from pygerber.vm.commands.paste import PasteLayer
+from pygerber.vm.commands.paste import PasteLayer, PasteLayerBatch
+from pygerber.vm.commands.polyline import Polyline
 from pygerber.vm.commands.shape import Shape
 from pygerber.vm.commands.shape_segments import Arc, Line, ShapeSegment
 
@@ -16,6 +17,8 @@ __all__ = [
     "EndLayer",
     "Line",
     "PasteLayer",
+    "PasteLayerBatch",
+    "Polyline",
     "Shape",
     "ShapeSegment",
     "StartLayer",
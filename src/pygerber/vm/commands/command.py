@@ -14,9 +14,14 @@ if TYPE_CHECKING:
 
 
 class Command(ModelType):
-    """Base class for drawing commands."""
+    """Base class for drawing commands.
+
+    Metadata can be stored directly in command with `metadata` or referenced by
+    index in `RVMC.metadata_table` with `metadata_id`.
+    """
 
     metadata: Optional[Dict[str, str]] = Field(default=None)
+    metadata_id: Optional[int] = Field(default=None)
 
     @abstractmethod
     def visit(self, visitor: CommandVisitor) -> None:
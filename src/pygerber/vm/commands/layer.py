@@ -14,11 +14,18 @@ from pygerber.vm.types.vector import Vector
 
 
 class StartLayer(Command):
-    """Draw a line from the current position to the given position."""
+    """Start new layer, following commands are drawn into it until `EndLayer`.
+
+    When `draw_on_paste` is set, pasting layer should give the same result as drawing
+    its commands at paste location. Raster VMs, which otherwise copy image of layer
+    rendered once, draw commands of such layer again for each paste, hence pixel
+    coordinates are rounded the same way as if commands were drawn directly.
+    """
 
     id: LayerID
     box: Optional[Box] = Field(default=None)
     origin: Vector = Field(default_factory=lambda: Vector(x=0, y=0))
+    draw_on_paste: bool = Field(default=False)
 
     def visit(self, visitor: CommandVisitor) -> None:
         """Visit start layer command."""
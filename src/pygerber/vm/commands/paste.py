@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Sequence
 
-from pydantic import Field
+import numpy as np
+import numpy.typing as npt
+from pydantic import Field, field_serializer, field_validator
 
 from pygerber.vm.command_visitor import CommandVisitor
 from pygerber.vm.commands.command import Command
 from pygerber.vm.types.layer_id import LayerID
+from pygerber.vm.types.matrix import Matrix3x3
 from pygerber.vm.types.vector import Vector
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from typing_extensions import Self
 
 
@@ -40,3 +45,106 @@ class PasteLayer(Command):
             center=Vector.from_tuple(center),
             is_negative=is_negative,
         )
+
+
+class PasteLayerBatch(Command):
+    """Paste contents of one layer into other layer at multiple positions.
+
+    Result is equivalent to sequence of `PasteLayer` commands with the same source
+    layer and polarity, one for each row of `centers` array.
+    """
+
+    source_layer_id: LayerID
+    centers: npt.NDArray[np.float64]
+    is_negative: bool = Field(default=False)
+
+    @field_validator("centers", mode="before")
+    @classmethod
+    def _validate_centers(cls, value: Any) -> npt.NDArray[np.float64]:
+        return _to_read_only_centers(value)
+
+    @field_serializer("centers", when_used="json")
+    def _serialize_centers(self, value: npt.NDArray[np.float64]) -> list[list[float]]:
+        return value.tolist()  # type: ignore[no-any-return]
+
+    def __hash__(self) -> int:
+        return hash(
+            (
+                self.source_layer_id,
+                self.centers.tobytes(),
+                self.is_negative,
+                self.metadata_id,
+            )
+        )
+
+    def __eq__(self, value: object) -> bool:
+        if isinstance(value, PasteLayerBatch):
+            return (
+                self.metadata == value.metadata
+                and self.metadata_id == value.metadata_id
+                and self.source_layer_id == value.source_layer_id
+                and self.is_negative == value.is_negative
+                and np.array_equal(self.centers, value.centers)
+            )
+
+        return NotImplemented
+
+    def transform(self, transform: Matrix3x3) -> Self:
+        """Transform centers of pastes by matrix."""
+        x = self.centers[:, 0]
+        y = self.centers[:, 1]
+        return self.model_copy(
+            update={
+                "centers": _to_read_only_centers(
+                    np.stack(
+                        [
+                            transform[0][0] * x + transform[0][1] * y + transform[0][2],
+                            transform[1][0] * x + transform[1][1] * y + transform[1][2],
+                        ],
+                        axis=1,
+                    )
+                )
+            }
+        )
+
+    def visit(self, visitor: CommandVisitor) -> None:
+        """Visit paste layer batch command."""
+        visitor.on_paste_layer_batch(self)
+
+    def iter_paste_layer(self) -> Iterator[PasteLayer]:
+        """Iterate over `PasteLayer` commands equivalent to this command."""
+        for x, y in self.centers.tolist():
+            yield PasteLayer(
+                source_layer_id=self.source_layer_id,
+                center=Vector(x=x, y=y),
+                is_negative=self.is_negative,
+                metadata=self.metadata,
+                metadata_id=self.metadata_id,
+            )
+
+    @classmethod
+    def new(
+        cls,
+        source_layer_id: str,
+        centers: Sequence[tuple[float, float]],
+        *,
+        is_negative: bool = False,
+    ) -> Self:
+        """Create a new paste layer batch command from values."""
+        return cls(
+            source_layer_id=LayerID(id=source_layer_id),
+            centers=centers,
+            is_negative=is_negative,
+        )
+
+
+def _to_read_only_centers(value: Any) -> npt.NDArray[np.float64]:
+    array = np.array(value, dtype=np.float64)
+    if array.size == 0:
+        msg = "Paste layer batch must contain at least one center."
+        raise ValueError(msg)
+    if array.ndim != 2 or array.shape[1] != 2:  # noqa: PLR2004
+        msg = f"Paste layer batch centers must have shape (N, 2), got {array.shape}."
+        raise ValueError(msg)
+    array.setflags(write=False)
+    return array
@@ -0,0 +1,83 @@
+"""`polyline` module contains class for drawing series of connected straight lines
+with rounded ends.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+import pyparsing as pp
+from pydantic import Field
+
+from pygerber.vm.commands.command import Command
+from pygerber.vm.types.box import Box
+from pygerber.vm.types.matrix import Matrix3x3
+from pygerber.vm.types.vector import Vector
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from pygerber.vm.vm import CommandVisitor
+
+
+class Polyline(Command):
+    """`Polyline` command instructs VM to render series of connected straight lines
+    with specified width into currently active layer.
+
+    Ends of polyline and joints between lines are rounded, therefore result is
+    equivalent to drawing each line with circles of diameter equal to `width` placed
+    at both ends.
+    """
+
+    points: List[Vector] = Field(min_length=2)
+    width: float
+    is_negative: bool = False
+
+    @pp.cached_property
+    def outer_box(self) -> Box:
+        """Get outer box of polyline."""
+        box = Box.from_vectors(*self.points)
+        half_width = self.width / 2
+        return Box(
+            min_x=box.min_x - half_width,
+            min_y=box.min_y - half_width,
+            max_x=box.max_x + half_width,
+            max_y=box.max_y + half_width,
+        )
+
+    def transform(self, transform: Matrix3x3) -> Self:
+        """Transform points of polyline, width is scaled accordingly."""
+        scale = math.sqrt(
+            abs(transform[0][0] * transform[1][1] - transform[0][1] * transform[1][0])
+        )
+        return self.__class__(
+            points=[point.transform(transform) for point in self.points],
+            width=self.width * scale,
+            is_negative=self.is_negative,
+            metadata=self.metadata,
+            metadata_id=self.metadata_id,
+        )
+
+    def visit(self, visitor: CommandVisitor) -> None:
+        """Visit polyline command."""
+        visitor.on_polyline(self)
+
+    @classmethod
+    def new(
+        cls,
+        points: Sequence[tuple[float, float]],
+        width: float,
+        *,
+        is_negative: bool,
+        metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
+    ) -> Self:
+        """Create polyline going through given points."""
+        return cls(
+            points=[Vector.from_tuple(point) for point in points],
+            width=width,
+            is_negative=is_negative,
+            metadata=metadata,
+            metadata_id=metadata_id,
+        )
@@ -66,6 +66,7 @@ class Shape(Command):
         *,
         is_negative: bool,
         metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
     ) -> Self:
         """Create polygon in shape of rectangle."""
         half_height = height / 2
@@ -95,6 +96,7 @@ class Shape(Command):
             ],
             is_negative=is_negative,
             metadata=metadata,
+            metadata_id=metadata_id,
         )
 
     @classmethod
@@ -106,6 +108,7 @@ class Shape(Command):
         *,
         is_negative: bool,
         metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
     ) -> Self:
         """Create polygon in shape of rectangle with shorter side rounded."""
         half_height = height / 2
@@ -144,6 +147,7 @@ class Shape(Command):
                 ],
                 is_negative=is_negative,
                 metadata=metadata,
+                metadata_id=metadata_id,
             )
 
         delta = half_height
@@ -176,6 +180,7 @@ class Shape(Command):
             ],
             is_negative=is_negative,
             metadata=metadata,
+            metadata_id=metadata_id,
         )
 
     @classmethod
@@ -186,6 +191,7 @@ class Shape(Command):
         *,
         is_negative: bool,
         metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
     ) -> Self:
         """Create polygon in shape of circle."""
         radius = diameter / 2
@@ -206,6 +212,7 @@ class Shape(Command):
             ],
             is_negative=is_negative,
             metadata=metadata,
+            metadata_id=metadata_id,
         )
 
     @classmethod
@@ -218,6 +225,7 @@ class Shape(Command):
         *,
         is_negative: bool,
         metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
     ) -> Self:
         """Create polygon in shape of regular polygon."""
         assert vertices_count >= VERTEX_COUNT_IN_TRIANGLE
@@ -248,7 +256,12 @@ class Shape(Command):
             )
             local_vertex_offset = new_local_vertex_offset
 
-        return cls(commands=commands, is_negative=is_negative, metadata=metadata)
+        return cls(
+            commands=commands,
+            is_negative=is_negative,
+            metadata=metadata,
+            metadata_id=metadata_id,
+        )
 
     @classmethod
     def new_line(
@@ -259,6 +272,7 @@ class Shape(Command):
         *,
         is_negative: bool,
         metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
     ) -> Self:
         """Create polygon in shape of line with specified thickness."""
         start_vector = Vector.from_tuple(start)
@@ -279,6 +293,7 @@ class Shape(Command):
             ],
             is_negative=is_negative,
             metadata=metadata,
+            metadata_id=metadata_id,
         )
 
     @classmethod
@@ -291,6 +306,7 @@ class Shape(Command):
         *,
         is_negative: bool,
         metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
     ) -> Self:
         """Create polygon in shape of clockwise arc with specified thickness."""
         center_vector = Vector.from_tuple(center)
@@ -320,6 +336,7 @@ class Shape(Command):
             ],
             is_negative=is_negative,
             metadata=metadata,
+            metadata_id=metadata_id,
         )
 
     @classmethod
@@ -332,6 +349,7 @@ class Shape(Command):
         *,
         is_negative: bool,
         metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
     ) -> Self:
         """Create polygon in shape of counterclockwise arc with specified thickness."""
         return cls.new_cw_arc(
@@ -341,6 +359,7 @@ class Shape(Command):
             thickness=thickness,
             is_negative=is_negative,
             metadata=metadata,
+            metadata_id=metadata_id,
         )
 
     @classmethod
@@ -352,6 +371,7 @@ class Shape(Command):
         *,
         is_negative: bool,
         metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
     ) -> tuple[Self, Self]:
         """Create polygon in shape of ring."""
         thickness = (outer_diameter - inner_diameter) / 2
@@ -373,6 +393,7 @@ class Shape(Command):
                 thickness=thickness,
                 is_negative=is_negative,
                 metadata=metadata,
+                metadata_id=metadata_id,
             ),
             cls.new_cw_arc(
                 point_1,
@@ -381,6 +402,7 @@ class Shape(Command):
                 thickness=thickness,
                 is_negative=is_negative,
                 metadata=metadata,
+                metadata_id=metadata_id,
             ),
         )
 
@@ -390,10 +412,16 @@ class Shape(Command):
         *points: tuple[float, float],
         is_negative: bool,
         metadata: Optional[dict[str, str]] = None,
+        metadata_id: Optional[int] = None,
     ) -> Self:
         """Create polygon from connected points."""
         commands: list[ShapeSegment] = [
             Line.from_tuples(points[i], points[i + 1]) for i in range(len(points) - 1)
         ]
         commands.append(Line.from_tuples(points[-1], points[0]))
-        return cls(commands=commands, is_negative=is_negative, metadata=metadata)
+        return cls(
+            commands=commands,
+            is_negative=is_negative,
+            metadata=metadata,
+            metadata_id=metadata_id,
+        )
@@ -8,14 +8,24 @@ import math
 import operator
 from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Generator, Optional, Sequence
 
+import numpy as np
 from PIL import Image, ImageDraw, ImageOps
 
-from pygerber.vm.commands import Arc, Line, PasteLayer, Shape
+from pygerber.vm.commands import (
+    Arc,
+    Line,
+    PasteLayer,
+    PasteLayerBatch,
+    Polyline,
+    Shape,
+    StartLayer,
+)
 from pygerber.vm.pillow.errors import DPMMTooSmallError
 from pygerber.vm.rvmc import RVMC
 from pygerber.vm.types import (
     Box,
     LayerID,
+    Matrix3x3,
     NoMainLayerError,
     PasteDeferredLayerNotAllowedError,
     Style,
@@ -38,6 +48,17 @@ FULL_ANGLE_DEGREES = 360
 DECREASE_ANGLE = (operator.sub, operator.gt)
 INCREASE_ANGLE = (operator.add, operator.lt)
 
+MAX_STAMPED_PIXELS_PER_CHUNK = 2**22
+
+# Cost of single `Image.paste()` call and of stamping single pixel with NumPy,
+# expressed as number of layer image pixels which can be converted to array and back
+# in the same time. Values are output of
+# `python -m test.benchmark.pillow_paste_layer_batch --calibrate` (0.5 mm pad at
+# 40 DPMM) on single core Intel Xeon VM with Python 3.11, Pillow 12.3 and NumPy
+# 2.4, rounded down. Re-run calibration when changing paste or stamping code.
+PASTE_COST_IN_CANVAS_PIXELS = 10_000
+STAMP_COST_IN_CANVAS_PIXELS = 12
+
 MIN_SEGMENT_COUNT = 12
 
 
@@ -267,13 +288,23 @@ class PillowResult(Result):
 class PillowEagerLayer(EagerLayer):
     """`PillowEagerLayer` class represents drawing space of known fixed size.
 
-    It is specifically used by `PillowVirtualMachine` class.
+    It is specifically used by `PillowVirtualMachine` class. When `commands` is not
+    None, commands drawn into layer are recorded in it, so they can be drawn again
+    when layer is pasted.
     """
 
-    def __init__(self, dpmm: int, layer_id: LayerID, box: Box, origin: Vector) -> None:
+    def __init__(
+        self,
+        dpmm: int,
+        layer_id: LayerID,
+        box: Box,
+        origin: Vector,
+        commands: Optional[list[DrawCmdT]] = None,
+    ) -> None:
         super().__init__(layer_id, box, origin)
         self.origin = origin
         self.dpmm = dpmm
+        self.commands = commands
         self.pixel_size = (
             self.to_pixel(self.box.width),
             self.to_pixel(self.box.height),
@@ -310,6 +341,7 @@ class PillowVirtualMachine(VirtualMachine):
     ) -> None:
         super().__init__(fail_on_empty_auto_sized_layer=fail_on_empty_auto_sized_layer)
         self.dpmm = dpmm
+        self._draw_on_paste_layer_ids: set[LayerID] = set()
         self.angle_length_to_segment_count = lambda angle_length: (
             int(segment_count)
             if (segment_count := angle_length * 2) > MIN_SEGMENT_COUNT
@@ -325,12 +357,72 @@ class PillowVirtualMachine(VirtualMachine):
         """Create new eager layer instances (factory method)."""
         assert box.width > 0
         assert box.height > 0
-        return PillowEagerLayer(self.dpmm, layer_id, box, origin)
+        return PillowEagerLayer(
+            self.dpmm,
+            layer_id,
+            box,
+            origin,
+            commands=[] if layer_id in self._draw_on_paste_layer_ids else None,
+        )
 
     def create_deferred_layer(self, layer_id: LayerID, origin: Vector) -> Layer:
         """Create new deferred layer instances (factory method)."""
         return PillowDeferredLayer(self.dpmm, layer_id, origin, commands=[])
 
+    def on_start_layer(self, command: StartLayer) -> None:
+        """Visit `StartLayer` command."""
+        if command.draw_on_paste:
+            self._draw_on_paste_layer_ids.add(command.id)
+        super().on_start_layer(command)
+
+    def on_shape(self, command: Shape) -> None:
+        """Visit `Shape` command."""
+        self._record_command(command)
+        super().on_shape(command)
+
+    def on_polyline(self, command: Polyline) -> None:
+        """Visit `Polyline` command."""
+        self._record_command(command)
+        super().on_polyline(command)
+
+    def on_paste_layer(self, command: PasteLayer) -> None:
+        """Visit `PasteLayer` command."""
+        self._record_command(command)
+        super().on_paste_layer(command)
+
+    def on_paste_layer_batch(self, command: PasteLayerBatch) -> None:
+        """Visit `PasteLayerBatch` command."""
+        self._record_command(command)
+        super().on_paste_layer_batch(command)
+
+    def _record_command(self, command: DrawCmdT) -> None:
+        # Commands of deferred layers are recorded when they are evaluated in
+        # eager layer created for them in `on_end_layer()`.
+        layer = self.layer
+        if isinstance(layer, PillowEagerLayer) and layer.commands is not None:
+            layer.commands.append(command)
+
+    def _draw_layer_commands(
+        self, source_layer: PillowEagerLayer, center: Vector
+    ) -> None:
+        """Draw recorded commands of layer moved to paste location.
+
+        Commands are moved with the same transformation as used by compiler to expand
+        SR blocks, hence result is identical to drawing expanded commands.
+        """
+        assert source_layer.commands is not None
+        transform = Matrix3x3.new_translate(
+            x=center.x - source_layer.origin.x, y=center.y - source_layer.origin.y
+        )
+
+        for command in source_layer.commands:
+            if isinstance(command, PasteLayer):
+                command.model_copy(
+                    update={"center": command.center.transform(transform)}
+                ).visit(self)
+            else:
+                command.transform(transform).visit(self)
+
     def on_shape_eager(self, command: Shape) -> None:
         """Visit shape command."""
         points: list[tuple[float, float]] = []
@@ -463,8 +555,61 @@ class PillowVirtualMachine(VirtualMachine):
             width=0,
         )
 
+    def on_polyline_eager(self, command: Polyline) -> None:
+        """Visit polyline command.
+
+        Each line of polyline is drawn as rectangle, ends and joints are rounded by
+        drawing circles at each point of polyline.
+        """
+        layer = self.layer
+        layer_box = layer.box
+        x_offset = layer_box.center.x - layer_box.width / 2
+        y_offset = layer_box.center.y - layer_box.height / 2
+
+        color = self.get_color(is_negative=command.is_negative)
+        half_width = command.width / 2
+
+        for start, end in zip(command.points[:-1], command.points[1:]):
+            parallel = (end - start).normalized()
+            perpendicular = Vector(x=-parallel.y, y=parallel.x) * half_width
+
+            layer.draw.polygon(
+                [
+                    (
+                        self.to_pixel(x - x_offset),
+                        self.to_pixel(y - y_offset),
+                    )
+                    for (x, y) in (
+                        (start + perpendicular).xy,
+                        (end + perpendicular).xy,
+                        (end - perpendicular).xy,
+                        (start - perpendicular).xy,
+                    )
+                ],
+                fill=color,
+                width=0,
+            )
+
+        for point in command.points:
+            x = point.x - x_offset
+            y = point.y - y_offset
+            layer.draw.ellipse(
+                (
+                    self.to_pixel(x - half_width),
+                    self.to_pixel(y - half_width),
+                    self.to_pixel(x + half_width),
+                    self.to_pixel(y + half_width),
+                ),
+                fill=color,
+                width=0,
+            )
+
     def on_paste_layer_eager(self, command: PasteLayer) -> None:
-        """Visit `PasteLayer` command."""
+        """Visit `PasteLayer` command.
+
+        Commands of layers started with `draw_on_paste` are drawn again at paste
+        location, unless paste is negative. Image of other layers is copied.
+        """
         source_layer = self.get_layer(command.source_layer_id)
 
         if isinstance(source_layer, PillowDeferredLayer):
@@ -472,6 +617,10 @@ class PillowVirtualMachine(VirtualMachine):
 
         assert isinstance(source_layer, PillowEagerLayer)
 
+        if source_layer.commands is not None and not command.is_negative:
+            self._draw_layer_commands(source_layer, command.center)
+            return
+
         if command.is_negative:
             image = ImageOps.invert(source_layer.image.convert("L")).convert("1")
         else:
@@ -503,6 +652,94 @@ class PillowVirtualMachine(VirtualMachine):
             mask=source_layer.image,
         )
 
+    def on_paste_layer_batch_eager(self, command: PasteLayerBatch) -> None:
+        """Visit `PasteLayerBatch` command.
+
+        When pastes are dense enough, instead of pasting source image once for each
+        center, coordinates of all pixels set in source layer are offset by all
+        centers at once with NumPy and stamped into region of current layer image
+        covered by pastes. Otherwise source image is pasted once for each center.
+        """
+        source_layer = self.get_layer(command.source_layer_id)
+
+        if isinstance(source_layer, PillowDeferredLayer):
+            raise PasteDeferredLayerNotAllowedError(command.source_layer_id)
+
+        assert isinstance(source_layer, PillowEagerLayer)
+
+        if source_layer.commands is not None and not command.is_negative:
+            super().on_paste_layer_batch_eager(command)
+            return
+
+        layer = self.layer
+        layer_box = layer.box
+        x_offset = layer_box.center.x - layer_box.width / 2
+        y_offset = layer_box.center.y - layer_box.height / 2
+
+        # Same expressions as in on_paste_layer_eager(), to get identical rounding.
+        paste_x = (
+            (
+                command.centers[:, 0]
+                - (source_layer.box.width / 2)
+                + source_layer.box.center.x
+                - source_layer.origin.x
+                - x_offset
+            )
+            * self.dpmm
+        ).astype(np.int64)
+        paste_y = (
+            (
+                command.centers[:, 1]
+                - (source_layer.box.height / 2)
+                + source_layer.box.center.y
+                - source_layer.origin.y
+                - y_offset
+            )
+            * self.dpmm
+        ).astype(np.int64)
+
+        # Only region of layer image covered by pasted images is converted to array.
+        width, height = layer.image.size
+        source_width, source_height = source_layer.image.size
+        left = max(int(paste_x.min()), 0)
+        top = max(int(paste_y.min()), 0)
+        right = min(int(paste_x.max()) + source_width, width)
+        bottom = min(int(paste_y.max()) + source_height, height)
+        if left >= right or top >= bottom:
+            return
+
+        # Converting region to array and back is paid regardless of number of
+        # pixels stamped, for sparse pastes separate `Image.paste()` calls are faster.
+        paste_cost = PASTE_COST_IN_CANVAS_PIXELS * len(paste_x)
+        region_area = (right - left) * (bottom - top)
+        if region_area > paste_cost:
+            super().on_paste_layer_batch_eager(command)
+            return
+
+        source_y, source_x = np.nonzero(np.asarray(source_layer.image))
+        if len(source_x) == 0:
+            return
+
+        if (
+            region_area + STAMP_COST_IN_CANVAS_PIXELS * len(source_x) * len(paste_x)
+            > paste_cost
+        ):
+            super().on_paste_layer_batch_eager(command)
+            return
+
+        canvas = np.array(layer.image.crop((left, top, right, bottom)))
+        color = bool(self.get_color(is_negative=command.is_negative))
+        chunk_size = max(MAX_STAMPED_PIXELS_PER_CHUNK // len(source_x), 1)
+
+        for start in range(0, len(paste_x), chunk_size):
+            xs = (paste_x[start : start + chunk_size, None] - left + source_x).ravel()
+            ys = (paste_y[start : start + chunk_size, None] - top + source_y).ravel()
+            inside = (xs >= 0) & (xs < right - left) & (ys >= 0) & (ys < bottom - top)
+            canvas[ys[inside], xs[inside]] = color
+
+        # Pasting keeps `layer.draw` bound to the layer image.
+        layer.image.paste(Image.fromarray(canvas), (left, top))
+
     def to_pixel(self, value: float) -> int:
         """Convert value in mm to pixels."""
         return int(value * self.dpmm)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence
 
 from pydantic import BaseModel, Field
 
@@ -13,8 +13,17 @@ class RVMC(BaseModel):
     """Container class for PyGerber Rendering Virtual Machine Commands (RVMC)."""
 
     metadata: Optional[Dict[str, Any]] = Field(default=None)
+    metadata_table: List[Dict[str, str]] = Field(default_factory=list)
     commands: Sequence[Command] = Field(default_factory=list)
 
+    def get_command_metadata(self, command: Command) -> Optional[Dict[str, str]]:
+        """Get metadata of command, either referenced by `metadata_id` or stored
+        directly in command.
+        """
+        if command.metadata_id is not None:
+            return self.metadata_table[command.metadata_id]
+        return command.metadata
+
     def to_json(self, **kwargs: Any) -> str:
         """Convert RVMC to JSON."""
         return self.model_dump_json(serialize_as_any=True, **kwargs)
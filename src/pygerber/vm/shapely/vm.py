@@ -15,8 +15,8 @@ from typing import Any, BinaryIO, Callable, Generator, Optional, Sequence
 
 import numpy as np
 
-from pygerber.vm.commands import Arc, Line, Shape
-from pygerber.vm.commands.paste import PasteLayer
+from pygerber.vm.commands import Arc, Line, Polyline, Shape
+from pygerber.vm.commands.paste import PasteLayer, PasteLayerBatch
 from pygerber.vm.rvmc import RVMC
 from pygerber.vm.shapely.errors import ShapelyNotInstalledError
 from pygerber.vm.types import Box, LayerID, NoMainLayerError, Style, Vector
@@ -268,14 +268,26 @@ class ShapelyVirtualMachine(VirtualMachine):
         self, points: Sequence[tuple[float, float]], *, is_negative: bool
     ) -> None:
         """Draw a polygon."""
-        polygon = sh.Polygon(points)
+        self._add_geometry(sh.Polygon(points).buffer(0), is_negative=is_negative)
+
+    def on_polyline_eager(self, command: Polyline) -> None:
+        """Visit polyline command."""
+        quarter_arc_length = math.pi * command.width / 4
+        polyline = sh.LineString([point.xy for point in command.points]).buffer(
+            command.width / 2,
+            quad_segs=self.angle_length_to_segment_count(quarter_arc_length),
+        )
+        self._add_geometry(polyline, is_negative=command.is_negative)
 
+    def _add_geometry(
+        self, geometry: sh.geometry.base.BaseGeometry, *, is_negative: bool
+    ) -> None:
         layer = self.layer
         x_offset = -layer.origin.x
         y_offset = -layer.origin.y
 
         transformed_shape = sh.transform(
-            polygon,
+            geometry,
             lambda p: (
                 np.array(
                     [
@@ -284,7 +296,7 @@ class ShapelyVirtualMachine(VirtualMachine):
                     ]
                 ).T
             ),
-        ).buffer(0)
+        )
 
         if is_negative:
             tree = shtree.STRtree(self.layer.shape)
@@ -398,7 +410,43 @@ class ShapelyVirtualMachine(VirtualMachine):
             for geom in source_layer.shape
         ]
 
-        if command.is_negative:
+        self._paste_geometries(transformed_shape, is_negative=command.is_negative)
+
+    def on_paste_layer_batch_eager(self, command: PasteLayerBatch) -> None:
+        """Visit `PasteLayerBatch` command.
+
+        Geometries of source layer are translated to all centers with single
+        coordinate array operation.
+        """
+        source_layer = self.get_layer(command.source_layer_id)
+
+        if isinstance(source_layer, ShapelyDeferredLayer):
+            raise PasteDeferredLayerNotAllowedError(command.source_layer_id)
+
+        assert isinstance(source_layer, ShapelyEagerLayer), type(source_layer)
+
+        if len(source_layer.shape) == 0:
+            return
+
+        layer = self.layer
+        offsets = command.centers - np.array([layer.origin.x, layer.origin.y])
+
+        geometries = np.empty(len(source_layer.shape), dtype=object)
+        geometries[:] = source_layer.shape
+        coordinates = sh.get_coordinates(geometries)
+
+        transformed_shape = sh.set_coordinates(
+            np.tile(geometries, len(offsets)),
+            (coordinates[np.newaxis, :, :] + offsets[:, np.newaxis, :]).reshape(-1, 2),
+        )
+        self._paste_geometries(
+            transformed_shape.tolist(), is_negative=command.is_negative
+        )
+
+    def _paste_geometries(
+        self, transformed_shape: list[sh.Polygon], *, is_negative: bool
+    ) -> None:
+        if is_negative:
             dest_layer_tree = shtree.STRtree(self.layer.shape)
             dest_idx = dest_layer_tree.query(transformed_shape).T
 
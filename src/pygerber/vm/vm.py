@@ -5,7 +5,14 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, BinaryIO, ClassVar, Optional, Union
 
 from pygerber.vm.command_visitor import CommandVisitor
-from pygerber.vm.commands import EndLayer, PasteLayer, Shape, StartLayer
+from pygerber.vm.commands import (
+    EndLayer,
+    PasteLayer,
+    PasteLayerBatch,
+    Polyline,
+    Shape,
+    StartLayer,
+)
 from pygerber.vm.rvmc import RVMC
 from pygerber.vm.types import (
     Box,
@@ -24,7 +31,7 @@ if TYPE_CHECKING:
 
     from typing_extensions import TypeAlias
 
-DrawCmdT: TypeAlias = Union[Shape, PasteLayer]
+DrawCmdT: TypeAlias = Union[Shape, Polyline, PasteLayer, PasteLayerBatch]
 
 
 class Result:
@@ -146,12 +153,16 @@ class VirtualMachine(CommandVisitor):
     def set_eager_handlers(self) -> None:
         """Set handlers for eager mode."""
         self._on_shape_handler = self.on_shape_eager
+        self._on_polyline_handler = self.on_polyline_eager
         self._on_paste_layer_handler = self.on_paste_layer_eager
+        self._on_paste_layer_batch_handler = self.on_paste_layer_batch_eager
 
     def set_deferred_handlers(self) -> None:
         """Set handlers for deferred mode."""
         self._on_shape_handler = self.on_shape_deferred
+        self._on_polyline_handler = self.on_polyline_deferred
         self._on_paste_layer_handler = self.on_paste_layer_deferred
+        self._on_paste_layer_batch_handler = self.on_paste_layer_batch_deferred
 
     def create_eager_layer(self, layer_id: LayerID, origin: Vector, box: Box) -> Layer:
         """Create new eager layer instances (factory method)."""
@@ -174,6 +185,19 @@ class VirtualMachine(CommandVisitor):
         assert isinstance(layer, DeferredLayer)
         layer.commands.append(command)
 
+    def on_polyline(self, command: Polyline) -> None:
+        """Visit `Polyline` command."""
+        self._on_polyline_handler(command)
+
+    def on_polyline_eager(self, command: Polyline) -> None:
+        """Visit `Polyline` command."""
+
+    def on_polyline_deferred(self, command: Polyline) -> None:
+        """Visit `Polyline` command."""
+        layer = self.layer
+        assert isinstance(layer, DeferredLayer)
+        layer.commands.append(command)
+
     def on_paste_layer(self, command: PasteLayer) -> None:
         """Visit `PasteLayer` command."""
         self._on_paste_layer_handler(command)
@@ -193,6 +217,29 @@ class VirtualMachine(CommandVisitor):
         assert isinstance(layer, DeferredLayer)
         layer.commands.append(command)
 
+    def on_paste_layer_batch(self, command: PasteLayerBatch) -> None:
+        """Visit `PasteLayerBatch` command."""
+        self._on_paste_layer_batch_handler(command)
+
+    def on_paste_layer_batch_eager(self, command: PasteLayerBatch) -> None:
+        """Visit `PasteLayerBatch` command.
+
+        This method is used when currently selected layer is a eager layer. By
+        default it executes equivalent `PasteLayer` commands one by one, subclasses
+        can override it with vectorized implementation.
+        """
+        for paste_layer in command.iter_paste_layer():
+            self.on_paste_layer_eager(paste_layer)
+
+    def on_paste_layer_batch_deferred(self, command: PasteLayerBatch) -> None:
+        """Visit `PasteLayerBatch` command.
+
+        This method is used when currently selected layer is a deferred layer.
+        """
+        layer = self.layer
+        assert isinstance(layer, DeferredLayer)
+        layer.commands.append(command)
+
     def on_start_layer(self, command: StartLayer) -> None:
         """Visit `StartLayer` command."""
         if command.id in self._layers:
@@ -289,37 +336,38 @@ class VirtualMachine(CommandVisitor):
         self, deferred_layer: DeferredLayer
     ) -> Optional[Box]:
         commands = deferred_layer.commands
-        box: Optional[Box] = None
-
         if len(commands) == 0:
             return None
 
-        cmd = commands[0]
-
-        if isinstance(cmd, Shape):
-            box = cmd.outer_box
+        box = self._get_draw_command_box(commands[0])
 
-        elif isinstance(cmd, PasteLayer):
-            layer = self._layers[cmd.source_layer_id]
-            assert isinstance(layer, EagerLayer)
-            box = layer.box + cmd.center - layer.origin
+        for cmd in commands[1:]:
+            box = box + self._get_draw_command_box(cmd)
 
-        else:
-            raise NotImplementedError(type(cmd))
+        return box
 
-        for cmd in commands[1:]:
-            if isinstance(cmd, Shape):
-                box = box + cmd.outer_box
+    def _get_draw_command_box(self, cmd: DrawCmdT) -> Box:
+        if isinstance(cmd, (Shape, Polyline)):
+            return cmd.outer_box
 
-            elif isinstance(cmd, PasteLayer):
-                layer = self._layers[cmd.source_layer_id]
-                assert isinstance(layer, EagerLayer)
-                box = box + (layer.box + cmd.center - layer.origin)
+        if isinstance(cmd, PasteLayer):
+            layer = self._layers[cmd.source_layer_id]
+            assert isinstance(layer, EagerLayer)
+            return layer.box + cmd.center - layer.origin
 
-            else:
-                raise NotImplementedError(type(cmd))
+        if isinstance(cmd, PasteLayerBatch):
+            layer = self._layers[cmd.source_layer_id]
+            assert isinstance(layer, EagerLayer)
+            min_x, min_y = cmd.centers.min(axis=0).tolist()
+            max_x, max_y = cmd.centers.max(axis=0).tolist()
+            return Box(
+                min_x=layer.box.min_x - layer.origin.x + min_x,
+                min_y=layer.box.min_y - layer.origin.y + min_y,
+                max_x=layer.box.max_x - layer.origin.x + max_x,
+                max_y=layer.box.max_y - layer.origin.y + max_y,
+            )
 
-        return box
+        raise NotImplementedError(type(cmd))
 
     def _eval_deferred_commands(self, commands: list[DrawCmdT]) -> None:
         for cmd in commands:
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+from pygerber.gerber.parser import parse
+from test.conftest import ASSETS_DIRECTORY
+
+A64_OLINUXINO_REV_G = ASSETS_DIRECTORY / "gerberx3" / "A64_OLinuXino_rev_G"
+
+
+def benchmark() -> None:
+    for parser in ("pyparsing", "native"):
+        total_time = 0.0
+        total_blocks = 0
+
+        for path in sorted(A64_OLINUXINO_REV_G.glob("*.gbr")):
+            source = path.read_text()
+            parse(source, parser=parser)  # type: ignore[arg-type]
+
+            start = time.perf_counter()
+            parse(source, parser=parser)  # type: ignore[arg-type]
+            parse_time = time.perf_counter() - start
+
+            tracemalloc.start()
+            ast = parse(source, parser=parser)  # type: ignore[arg-type]
+            blocks = sum(
+                stat.count
+                for stat in tracemalloc.take_snapshot().statistics("filename")
+            )
+            tracemalloc.stop()
+            del ast
+
+            total_time += parse_time
+            total_blocks += blocks
+            print(f"{parser:<10} {path.name:<40} {parse_time:8.3f}s {blocks:>10}")  # noqa: T201
+
+        print(f"{parser:<10} {'total':<40} {total_time:8.3f}s {total_blocks:>10}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,2 @@
+#!/bin/bash
+/usr/bin/time -v python -m test.benchmark.a64_olinuxino_rev_g_parse
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import random
+import sys
+import time
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+from pygerber.vm import RVMC
+from pygerber.vm.commands import (
+    Command,
+    EndLayer,
+    PasteLayer,
+    PasteLayerBatch,
+    Shape,
+    StartLayer,
+)
+from pygerber.vm.pillow import PillowVirtualMachine
+from pygerber.vm.types import LayerID, Vector
+
+DPMM = 40
+
+
+def make_rvmc(
+    centers: list[list[tuple[float, float]]], pad_diameter: float, *, batch: bool
+) -> RVMC:
+    commands: list[Command] = [
+        StartLayer(id=LayerID(id="%main%"), box=None, origin=Vector(x=0, y=0)),
+        StartLayer(id=LayerID(id="pad"), box=None, origin=Vector(x=0, y=0)),
+        Shape.new_circle((0, 0), pad_diameter, is_negative=False),
+        EndLayer(),
+    ]
+    for run in centers:
+        if batch:
+            commands.append(PasteLayerBatch.new("pad", run))
+        else:
+            commands.extend(PasteLayer.new("pad", center) for center in run)
+    commands.append(EndLayer())
+    return RVMC(commands=commands)
+
+
+def make_sparse_runs(
+    run_length: int, run_count: int
+) -> list[list[tuple[float, float]]]:
+    rng = random.Random(0)  # noqa: S311
+    return [
+        [(rng.uniform(0, 80), rng.uniform(0, 80)) for _ in range(run_length)]
+        for _ in range(run_count)
+    ]
+
+
+def make_grid(count: int, pitch: float) -> list[list[tuple[float, float]]]:
+    return [[(x * pitch, y * pitch) for x in range(count) for y in range(count)]]
+
+
+def benchmark() -> None:
+    cases = [
+        ("sparse 1500 x 2", make_sparse_runs(2, 1500), 0.5),
+        ("sparse 400 x 8", make_sparse_runs(8, 400), 0.5),
+        ("sparse 3 x 1000", make_sparse_runs(1000, 3), 0.5),
+        ("grid 100 x 100", make_grid(100, 0.5), 0.3),
+        ("grid 30 x 30", make_grid(30, 3.0), 2.5),
+    ]
+    for name, centers, pad_diameter in cases:
+        timings = []
+        for batch in (False, True):
+            rvmc = make_rvmc(centers, pad_diameter, batch=batch)
+            start = time.perf_counter()
+            PillowVirtualMachine(DPMM).run(rvmc)
+            timings.append(time.perf_counter() - start)
+
+        print(f"{name:<20} paste {timings[0]:8.3f}s batch {timings[1]:8.3f}s")  # noqa: T201
+
+
+def best_of(function: Callable[[], object], repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def calibrate() -> None:
+    """Measure costs used by `PillowVirtualMachine.on_paste_layer_batch_eager()`.
+
+    Costs are printed relative to cost of converting single layer image pixel to
+    array and back, which is unit of `PASTE_COST_IN_CANVAS_PIXELS` and
+    `STAMP_COST_IN_CANVAS_PIXELS`.
+    """
+    pastes = 2_000
+    # Cost of `Image.paste()` includes visiting command, hence it is measured by
+    # running VM with and without pastes.
+    sparse = make_sparse_runs(pastes, 1)
+    with_pastes = make_rvmc(sparse, 0.5, batch=False)
+    without_pastes = make_rvmc([[sparse[0][0]]], 0.5, batch=False)
+    paste_time = (
+        best_of(lambda: PillowVirtualMachine(DPMM).run(with_pastes))
+        - best_of(lambda: PillowVirtualMachine(DPMM).run(without_pastes))
+    ) / (pastes - 1)
+
+    image = Image.new("1", (4_000, 4_000), 0)
+
+    def convert() -> None:
+        canvas = np.array(image.crop((0, 0, 4_000, 4_000)))
+        image.paste(Image.fromarray(canvas), (0, 0))
+
+    pixel_time = best_of(convert) / (4_000 * 4_000)
+
+    canvas = np.zeros((4_000, 4_000), dtype=np.bool_)
+    rng = np.random.default_rng(0)
+    source_y, source_x = np.nonzero(rng.random((20, 20)) < 0.8)  # noqa: PLR2004
+    paste_x = rng.integers(0, 3_980, 10_000)
+    paste_y = rng.integers(0, 3_980, 10_000)
+
+    def stamp() -> None:
+        xs = (paste_x[:, None] + source_x).ravel()
+        ys = (paste_y[:, None] + source_y).ravel()
+        inside = (xs >= 0) & (xs < 4_000) & (ys >= 0) & (ys < 4_000)  # noqa: PLR2004
+        canvas[ys[inside], xs[inside]] = True
+
+    stamp_time = best_of(stamp) / (len(source_x) * len(paste_x))
+
+    print(f"paste cost {paste_time / pixel_time:8.0f} canvas pixels")  # noqa: T201
+    print(f"stamp cost {stamp_time / pixel_time:8.1f} canvas pixels")  # noqa: T201
+
+
+if __name__ == "__main__":
+    if "--calibrate" in sys.argv:
+        calibrate()
+    else:
+        benchmark()
@@ -0,0 +1,2 @@
+#!/bin/bash
+/usr/bin/time -v python -m test.benchmark.pillow_paste_layer_batch
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 import pytest
 
-from pygerber.gerber.api import FileTypeEnum, GerberFile
+from pygerber.gerber.api import ArtifactCache, FileTypeEnum, GerberFile
+from pygerber.gerber.ast.nodes import FS, M02
+from pygerber.gerber.ast.nodes.enums import UnitMode
+from pygerber.gerber.parser.pyparsing.grammar import Optimization
+from test.conftest import ASSETS_DIRECTORY
 
 
 @pytest.mark.parametrize(
@@ -46,3 +52,131 @@ def test_file_type_from_attributes_no_file_function() -> None:
     gerber = GerberFile.from_str("G04*")
     assert gerber.file_type == FileTypeEnum.INFER
     assert gerber._get_file_type_from_attributes() == FileTypeEnum.UNDEFINED
+
+
+def test_from_file_memory_map() -> None:
+    path = ASSETS_DIRECTORY / "gerberx3" / "ucamco" / "4.9.1" / "source.grb"
+    gerber = GerberFile.from_file(path)
+    mapped_gerber = GerberFile.from_file(path, memory_map=True)
+
+    assert mapped_gerber.source_code == gerber.source_code
+    assert mapped_gerber.sha256 == gerber.sha256
+    assert mapped_gerber._get_ast().model_dump() == gerber._get_ast().model_dump()
+    assert mapped_gerber._get_rvmc() == gerber._get_rvmc()
+
+
+def test_set_parser_options_optimization() -> None:
+    gerber = GerberFile.from_str(
+        "%TF.FileFunction,Copper,L1,Top*%\nG04 Comment*\n%FSLAX26Y26*%\nM02*\n"
+    ).set_parser_options(
+        optimization=Optimization.DISCARD_COMMENTS | Optimization.DISCARD_ATTRIBUTES
+    )
+
+    assert [type(node) for node in gerber._get_ast().nodes] == [FS, M02]
+    assert gerber._get_file_type_from_attributes() == FileTypeEnum.UNDEFINED
+
+
+def test_artifact_cache(tmp_path: Path) -> None:
+    path = ASSETS_DIRECTORY / "gerberx3" / "ucamco" / "4.9.1" / "source.grb"
+    cache = ArtifactCache(tmp_path)
+
+    gerber = GerberFile.from_file(path).set_artifact_cache(cache)
+    expected_ast = gerber._get_ast()
+    expected_rvmc = gerber._get_rvmc()
+    artifacts = {path.name for path in tmp_path.glob("*/*")}
+    assert artifacts == {
+        gerber._get_artifact_key("ast"),
+        gerber._get_artifact_key("rvmc"),
+    }
+
+    cached_gerber = GerberFile.from_file(path).set_artifact_cache(cache)
+    cached_rvmc = cached_gerber._get_rvmc()
+    assert cached_gerber._cached_ast is None, "AST should not be needed."
+    assert cached_rvmc == expected_rvmc
+
+    cached_ast = cached_gerber._get_ast()
+    assert cached_ast is not expected_ast
+    assert cached_ast == expected_ast
+    assert cached_ast.nodes[-1].source_info is not None
+    assert cached_ast.nodes[-1].source_info.line == (
+        expected_ast.nodes[-1].source_info.line  # type: ignore[union-attr]
+    )
+    assert {path.name for path in tmp_path.glob("*/*")} == artifacts
+
+
+def test_artifact_cache_key(tmp_path: Path) -> None:
+    cache = ArtifactCache(tmp_path)
+    source = "%FSLAX26Y26*%\n%MOMM*%\nD10*\nM02*\n"
+    gerber = GerberFile.from_str(source).set_artifact_cache(cache)
+
+    key = gerber._get_artifact_key("ast")
+    assert key == GerberFile.from_str(source).set_artifact_cache(
+        cache
+    )._get_artifact_key("ast")
+    assert key != GerberFile.from_str(source + "\n").set_artifact_cache(
+        cache
+    )._get_artifact_key("ast")
+    assert key != gerber.set_parser_options(
+        optimization=Optimization.DISCARD_COMMENTS
+    )._get_artifact_key("ast")
+
+
+def test_artifact_cache_damaged_artifact(tmp_path: Path) -> None:
+    cache = ArtifactCache(tmp_path)
+    source = "%FSLAX26Y26*%\n%MOMM*%\nM02*\n"
+    gerber = GerberFile.from_str(source).set_artifact_cache(cache)
+    expected = gerber._get_ast()
+
+    (artifact,) = tmp_path.glob("*/*")
+    artifact.write_bytes(b"damaged")
+
+    gerber = GerberFile.from_str(source).set_artifact_cache(cache)
+    assert gerber._get_ast() == expected
+    assert cache.load(artifact.name, source) == expected
+
+
+def test_artifact_cache_store_failure_removes_temporary_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = ArtifactCache(tmp_path)
+    key = cache.get_key("ast", "0" * 64)
+
+    def replace(self: Path, target: Path) -> Path:  # noqa: ARG001
+        raise OSError
+
+    monkeypatch.setattr(Path, "replace", replace)
+
+    with pytest.raises(OSError):  # noqa: PT011
+        cache.store(key, M02())
+
+    assert list(tmp_path.glob("*/*")) == []
+
+
+def test_file_type_from_attributes_header_only() -> None:
+    gerber = GerberFile.from_str(
+        "%TF.FileFunction,Copper,L1,Top*%\n%FSLAX26Y26*%\n%MOIN*%\n"
+        "X0Y0D02*\nThis is not Gerber code\n"
+    )
+    assert gerber._get_file_type_from_attributes() == FileTypeEnum.COPPER
+    assert gerber._cached_ast is None
+
+    state = gerber._get_header_state()
+    assert state.unit_mode == UnitMode.IMPERIAL
+    assert state.coordinate_format is not None
+    assert state.coordinate_format.x_decimal == 6  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_file_type_from_attributes_from_file(*, memory_map: bool) -> None:
+    path = (
+        ASSETS_DIRECTORY
+        / "gerberx3"
+        / "A64_OLinuXino_rev_G"
+        / "A64-OlinuXino_Rev_G-F_Cu.gbr"
+    )
+    gerber = GerberFile.from_file(
+        path, FileTypeEnum.INFER_FROM_ATTRIBUTES, memory_map=memory_map
+    )
+
+    assert gerber._get_file_type_from_attributes() == FileTypeEnum.COPPER
+    assert gerber._cached_ast is None
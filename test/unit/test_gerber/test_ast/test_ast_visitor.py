@@ -7,7 +7,8 @@ from unittest import mock
 import pytest
 import tzlocal
 
-from pygerber.gerber.ast.ast_visitor import AstVisitor
+from pygerber.gerber.ast.ast_visitor import AstVisitor, FastAstVisitor
+from pygerber.gerber.ast.columnar import from_columnar, to_columnar
 from pygerber.gerber.ast.nodes import (
     ADC,
     ADO,
@@ -89,6 +90,7 @@ from pygerber.gerber.ast.nodes import (
     Mul,
     Neg,
     Node,
+    Operations,
     PackedCoordinateStr,
     Part,
     Point,
@@ -125,6 +127,8 @@ from pygerber.gerber.ast.nodes import (
     Variable,
     Zeros,
 )
+from pygerber.gerber.parser import parse
+from test.conftest import ASSETS_DIRECTORY
 
 NODE_SAMPLES: Dict[Type[Node], Node] = {
     ABclose: ABclose(),
@@ -221,6 +225,22 @@ NODE_SAMPLES: Dict[Type[Node], Node] = {
         y=CoordinateY(value=PackedCoordinateStr("2")),
     ),
     Dnn: Dnn(aperture_id=ApertureIdStr("D11")),
+    Operations: Operations(
+        fs=FS(
+            zeros=Zeros.SKIP_LEADING,
+            coordinate_mode=CoordinateNotation.ABSOLUTE,
+            x_integral=2,
+            x_decimal=4,
+            y_integral=2,
+            y_decimal=4,
+        ),
+        codes=[2, 1, 3],
+        mask=[3, 15, 1],
+        x=[1, 2, 3],
+        y=[4, 5, 0],
+        i=[0, 6, 0],
+        j=[0, 7, 0],
+    ),
     G01: G01(),
     G02: G02(),
     G03: G03(),
@@ -409,3 +429,146 @@ class TestAstVisitor:
         visitor = AstVisitor()
         for node in NODE_SAMPLES.values():
             node.visit(visitor)
+
+
+class _RecordingMixin(AstVisitor):
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def on_ab_open(self, node: ABopen) -> ABopen:
+        self.calls.append("ABopen")
+        return super().on_ab_open(node)
+
+    def on_sr_open(self, node: SRopen) -> SRopen:
+        self.calls.append("SRopen")
+        return super().on_sr_open(node)
+
+    def on_sr_close(self, node: SRclose) -> SRclose:
+        self.calls.append("SRclose")
+        return super().on_sr_close(node)
+
+    def on_dnn(self, node: Dnn) -> Dnn:
+        self.calls.append(f"{node.aperture_id}")
+        return super().on_dnn(node)
+
+    def on_d01(self, node: D01) -> D01:
+        self.calls.append("D01")
+        return super().on_d01(node)
+
+    def on_d03(self, node: D03) -> D03:
+        self.calls.append("D03")
+        return super().on_d03(node)
+
+    def on_coordinate_x(self, node: CoordinateX) -> CoordinateX:
+        self.calls.append(f"X{node.value}")
+        return super().on_coordinate_x(node)
+
+    def on_coordinate_y(self, node: CoordinateY) -> CoordinateY:
+        self.calls.append(f"Y{node.value}")
+        return super().on_coordinate_y(node)
+
+
+class _RecordingAstVisitor(_RecordingMixin, AstVisitor):
+    pass
+
+
+class _RecordingFastAstVisitor(_RecordingMixin, FastAstVisitor):
+    pass
+
+
+class TestFastAstVisitor:
+    @pytest.mark.parametrize(("_type", "instance"), NODE_SAMPLES.items())
+    def test_visit_node(self, _type: Type[Node], instance: Node) -> None:
+        callback_mock = mock.Mock()
+        visitor = FastAstVisitor()
+        setattr(
+            visitor,
+            instance.get_visitor_callback_function(visitor).__name__,
+            callback_mock,
+        )
+
+        visitor.visit_nodes([instance])
+
+        callback_mock.assert_called_once_with(instance)
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "step_and_repeat/00_cr_x_3.grb",
+            "step_and_repeat/ab/01_cr_xy_2_2.grb",
+            "ucamco/4.9.1/source.grb",
+        ],
+    )
+    def test_same_callbacks_as_ast_visitor(self, path: str) -> None:
+        ast = parse((ASSETS_DIRECTORY / "gerberx3" / path).read_text())
+        expected = _RecordingAstVisitor()
+        ast.visit(expected)
+
+        visitor = _RecordingFastAstVisitor()
+        ast.visit(visitor)
+
+        assert visitor.calls == expected.calls
+
+    def test_operations_are_expanded(self) -> None:
+        ast = parse(
+            (ASSETS_DIRECTORY / "gerberx3" / "ucamco/4.9.1/source.grb").read_text()
+        )
+        columnar = to_columnar(ast)
+        expected = _RecordingAstVisitor()
+        from_columnar(columnar).visit(expected)
+
+        visitor = _RecordingFastAstVisitor()
+        columnar.visit(visitor)
+
+        assert visitor.calls == expected.calls
+        assert "D01" in visitor.calls
+
+    def test_callbacks_are_resolved_per_instance(self) -> None:
+        node = D01(is_standalone=True)
+        visitor = _RecordingFastAstVisitor()
+        visitor.visit_nodes([node])
+
+        assert visitor._callbacks[D01] is _RecordingMixin.on_d01
+        assert D01 not in _RecordingFastAstVisitor()._callbacks
+
+    def test_instance_callbacks_are_not_shared(self) -> None:
+        other = _RecordingFastAstVisitor()
+        first = _RecordingFastAstVisitor()
+        first.on_d01 = other.on_d03  # type: ignore[method-assign]
+        second = _RecordingFastAstVisitor()
+
+        first.visit_nodes([D01(is_standalone=True)])
+        second.visit_nodes([D01(is_standalone=True)])
+
+        assert other.calls == ["D03"]
+        assert first.calls == []
+        assert second.calls == ["D01"]
+
+    def test_overridden_node_visit_is_called(self) -> None:
+        class CustomD01(D01):
+            def visit(self, visitor: AstVisitor) -> D01:
+                assert isinstance(visitor, _RecordingFastAstVisitor)
+                visitor.calls.append("CustomD01")
+                return super().visit(visitor)
+
+        visitor = _RecordingFastAstVisitor()
+        visitor.visit_nodes([CustomD01(is_standalone=True), D01(is_standalone=True)])
+
+        assert visitor.calls == ["CustomD01", "D01", "D01"]
+
+    def test_exception_handling(self) -> None:
+        class Visitor(_RecordingFastAstVisitor):
+            def on_d01(self, node: D01) -> D01:  # noqa: ARG002
+                raise ValueError
+
+            def on_exception(self, node: Node, exception: Exception) -> bool:  # noqa: ARG002
+                self.calls.append(type(exception).__name__)
+                return not isinstance(exception, ValueError)
+
+        visitor = Visitor()
+        visitor.visit_nodes([D01(), D03()])
+        assert visitor.calls == ["ValueError", "D03"]
+
+        with pytest.raises(AttributeError):
+            visitor.visit_nodes([None])  # type: ignore[list-item]
+        assert visitor.calls == ["ValueError", "D03", "AttributeError"]
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+from pygerber.gerber.ast.columnar import from_columnar, iter_columnar, to_columnar
+from pygerber.gerber.ast.nodes import (
+    AB,
+    ADC,
+    D01,
+    D02,
+    D03,
+    FS,
+    SR,
+    CoordinateX,
+    File,
+    Operations,
+    PackedCoordinateStr,
+)
+from pygerber.gerber.ast.nodes.enums import CoordinateNotation, Zeros
+from pygerber.gerber.ast.state_tracking_visitor import (
+    StateTrackingVisitor,
+    ignores_node_coordinates,
+)
+from pygerber.gerber.compiler import Compiler
+from pygerber.gerber.parser import iter_parse, parse
+from test.conftest import ASSETS_DIRECTORY
+
+SOURCES = [
+    "ucamco/4.9.1/source.grb",
+    "ucamco/4.9.6/source_2.grb",
+    "arc/counterclockwise/ccw_full.grb",
+    "step_and_repeat/00_cr_x_3.grb",
+    "step_and_repeat/ab/01_cr_xy_2_2.grb",
+    "A64_OLinuXino_rev_G/A64-OlinuXino_Rev_G-B_Cu.gbr",
+]
+
+
+class _RecordingVisitor(StateTrackingVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: List[Tuple[str, float, float, float, float]] = []
+
+    def _record(self, name: str) -> None:
+        self.calls.append(
+            (
+                name,
+                self.coordinate_x,
+                self.coordinate_y,
+                self.coordinate_i,
+                self.coordinate_j,
+            )
+        )
+
+    @ignores_node_coordinates
+    def on_draw_line(self, node: D01) -> None:  # noqa: ARG002
+        self._record("line")
+
+    @ignores_node_coordinates
+    def on_draw_ccw_arc_mq(self, node: D01) -> None:  # noqa: ARG002
+        self._record("ccw_arc")
+
+    @ignores_node_coordinates
+    def on_in_region_draw_line(self, node: D01) -> None:  # noqa: ARG002
+        self._record("region_line")
+
+    def on_flush_region(self) -> None:
+        self._record("flush_region")
+
+    @ignores_node_coordinates
+    def on_flash_circle(self, node: D03, aperture: ADC) -> None:  # noqa: ARG002
+        self._record("flash_circle")
+
+
+class _ExpandingVisitor(_RecordingVisitor):
+    def on_d01(self, node: D01) -> D01:
+        assert node.source_info is None
+        return super().on_d01(node)
+
+
+class _NodeRecordingVisitor(StateTrackingVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: List[Tuple[str, Optional[str], Optional[str]]] = []
+
+    def on_draw_line(self, node: D01) -> None:
+        self.calls.append(
+            (
+                "line",
+                None if node.x is None else node.x.value,
+                None if node.y is None else node.y.value,
+            )
+        )
+
+    def on_flash_circle(self, node: D03, aperture: ADC) -> None:  # noqa: ARG002
+        self.calls.append(
+            (
+                "flash_circle",
+                None if node.x is None else node.x.value,
+                None if node.y is None else node.y.value,
+            )
+        )
+
+
+def _visit(visitor: _RecordingVisitor, ast: File) -> _RecordingVisitor:
+    ast.visit(visitor)
+    return visitor
+
+
+def _fs(zeros: Zeros) -> FS:
+    return FS(
+        zeros=zeros,
+        coordinate_mode=CoordinateNotation.ABSOLUTE,
+        x_integral=2,
+        x_decimal=4,
+        y_integral=2,
+        y_decimal=4,
+    )
+
+
+@pytest.mark.parametrize("path", SOURCES)
+def test_to_columnar(path: str) -> None:
+    ast = parse((ASSETS_DIRECTORY / "gerberx3" / path).read_text(), parser="native")
+    columnar = to_columnar(ast)
+
+    assert not any(isinstance(node, (D01, D02, D03)) for node in columnar.nodes)
+
+    expected = _visit(_RecordingVisitor(), ast)
+    visitor = _visit(_RecordingVisitor(), columnar)
+    assert visitor.calls == expected.calls
+    # Stored blocks contain columnar nodes, hence they are not compared.
+    assert visitor.state.model_dump(exclude={"apertures"}) == expected.state.model_dump(
+        exclude={"apertures"}
+    )
+
+    visitor = _visit(_ExpandingVisitor(), columnar)
+    assert visitor.calls == expected.calls
+
+    visitor = _visit(_RecordingVisitor(), from_columnar(columnar))
+    assert visitor.calls == expected.calls
+
+
+def test_to_columnar_callbacks_reading_nodes_receive_coordinates() -> None:
+    source = "%FSLAX24Y24*%%MOMM*%%ADD10C,1*%D10*X0Y0D02*X100Y200D01*X300D03*M02*"
+    columnar = to_columnar(parse(source))
+    assert any(isinstance(node, Operations) for node in columnar.nodes)
+
+    visitor = _NodeRecordingVisitor()
+    columnar.visit(visitor)
+
+    assert visitor.calls == [("line", "100", "200"), ("flash_circle", "300", None)]
+
+
+def test_compiler_applies_operations_from_arrays() -> None:
+    assert Compiler()._is_operations_fast_path_supported()
+    assert _RecordingVisitor()._is_operations_fast_path_supported()
+    assert not _NodeRecordingVisitor()._is_operations_fast_path_supported()
+
+
+def test_to_columnar_nested() -> None:
+    source = (
+        ASSETS_DIRECTORY / "gerberx3" / "step_and_repeat/00_cr_x_3.grb"
+    ).read_text()
+    columnar = to_columnar(parse(source))
+
+    sr = next(node for node in columnar.nodes if isinstance(node, SR))
+    assert any(isinstance(node, Operations) for node in sr.nodes)
+
+    columnar = to_columnar(parse("%FSLAX24Y24*%%ADD10C,1*%%ABD11*%D10*X1Y1D03*%AB*%"))
+    ab = next(node for node in columnar.nodes if isinstance(node, AB))
+    assert isinstance(ab.nodes[1], Operations)
+
+
+def test_iter_columnar() -> None:
+    path = ASSETS_DIRECTORY / "gerberx3" / "ucamco/4.9.1/source.grb"
+    expected = _visit(_RecordingVisitor(), parse(path.read_text(), parser="native"))
+
+    visitor = _RecordingVisitor()
+    visitor.visit_nodes(iter_columnar(iter_parse(path)))
+
+    assert visitor.calls == expected.calls
+
+
+def test_to_columnar_source_info() -> None:
+    source = "%FSLAX24Y24*%\nX1Y1D02*\nX2Y2D01*\nD11*\nX3Y3D03*\n"
+    operations = to_columnar(parse(source, parser="native")).nodes[1]
+
+    assert isinstance(operations, Operations)
+    assert operations.source_info is not None
+    assert operations.source_info.location == source.index("X1")
+    assert operations.source_info.end_location == source.index("\nD11")
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "X1Y1D02*X2Y2D01*",
+        "%FSLAX24Y24*%X1234567Y1D02*X2Y2D01*",
+        "%FSLAX24Y24*%G01X1Y1D02*",
+    ],
+)
+def test_to_columnar_keeps_undecodable_nodes(source: str) -> None:
+    ast = parse(source)
+    assert to_columnar(ast) == ast
+
+
+@pytest.mark.parametrize(
+    ("zeros", "packed", "value", "canonical"),
+    [
+        (Zeros.SKIP_LEADING, "00123", 123, "123"),
+        (Zeros.SKIP_LEADING, "+123", 123, "123"),
+        (Zeros.SKIP_LEADING, "-000123", -123, "-123"),
+        (Zeros.SKIP_LEADING, "0", 0, "0"),
+        (Zeros.SKIP_TRAILING, "0012", 1200, "0012"),
+        (Zeros.SKIP_TRAILING, "-01", -10000, "-01"),
+        (Zeros.SKIP_TRAILING, "123400", 123400, "1234"),
+        (Zeros.SKIP_TRAILING, "0", 0, "0"),
+    ],
+)
+def test_coordinate_encoding(
+    zeros: Zeros, packed: str, value: int, canonical: str
+) -> None:
+    fs = _fs(zeros)
+    node = D01(x=CoordinateX(value=PackedCoordinateStr(packed)))
+    operations = to_columnar(File(nodes=[fs, node])).nodes[1]
+
+    assert isinstance(operations, Operations)
+    assert operations.x.tolist() == [value]
+    assert operations.mask.tolist() == [Operations.HAS_X]
+
+    (expanded,) = operations.iter_nodes()
+    assert isinstance(expanded, D01)
+    assert expanded.x is not None
+    assert expanded.x.value == PackedCoordinateStr(canonical)
+    assert expanded.y is None
+
+
+def test_operations_model() -> None:
+    fields = {
+        "fs": _fs(Zeros.SKIP_LEADING),
+        "codes": [2, 1, 3],
+        "mask": [3, 15, 1],
+        "x": [1, 2, 3],
+        "y": [4, 5, 0],
+        "i": [0, 6, 0],
+        "j": [0, 7, 0],
+    }
+    operations = Operations(**fields)  # type: ignore[arg-type]
+
+    assert operations.x.dtype == np.int64
+    assert operations.codes.dtype == np.uint8
+    assert not operations.x.flags.writeable
+
+    same = Operations(**fields)  # type: ignore[arg-type]
+    assert operations == same
+    assert hash(operations) == hash(same)
+    assert operations != Operations(**{**fields, "x": [1, 2, 4]})  # type: ignore[arg-type]
+
+    assert Operations.model_validate_json(operations.model_dump_json()) == operations
+
+    with pytest.raises(ValueError, match="same length"):
+        Operations(**{**fields, "x": [1, 2]})  # type: ignore[arg-type]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import pytest
+
+from pygerber.gerber.ast.expression_compile_visitor import ExpressionCompileVisitor
+from pygerber.gerber.ast.expression_eval_visitor import ExpressionEvalVisitor
+from pygerber.gerber.ast.nodes import AM, Code1, Double, Expression, Neg
+from pygerber.gerber.ast.state_tracking_visitor import ApertureStorage
+from pygerber.gerber.parser import parse
+from test.unit.test_gerber.test_ast.test_expression_eval_visitor import (
+    add,
+    const,
+    div,
+    mul,
+    parens,
+    sub,
+    var,
+)
+
+SCOPE = {"$1": 2.0, "$2": 3.5, "$3": -1.25}
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        const(1.0),
+        var("$1"),
+        add(var("$1"), const(1.0), var("$2")),
+        sub(var("$1"), parens(sub(const(2.0), var("$3")))),
+        mul(var("$1"), parens(add(const(0.5), var("$2")))),
+        div(const(5.0), parens(mul(const(1.66), var("$2"))), var("$3")),
+        Neg(operand=parens(add(var("$1"), var("$3")))),
+    ],
+)
+def test_expression_compile(expression: Expression) -> None:
+    compiled = ExpressionCompileVisitor().compile(expression)
+
+    expected = ExpressionEvalVisitor(SCOPE.copy()).evaluate(expression)
+    assert compiled(SCOPE) == expected
+    assert compiled({**SCOPE, "$1": 4.0}) == ExpressionEvalVisitor(
+        {**SCOPE, "$1": 4.0}
+    ).evaluate(expression)
+
+
+def test_expression_compile_undefined_variable() -> None:
+    compiled = ExpressionCompileVisitor().compile(var("$4"))
+
+    with pytest.raises(KeyError):
+        compiled(SCOPE)
+
+
+def _parse_macro(source: str) -> AM:
+    macro = parse(source).nodes[0]
+    assert isinstance(macro, AM)
+    return macro
+
+
+def test_get_compiled_macro() -> None:
+    macro = _parse_macro("%AMCIRCLE*1,1,$1x2,$2,0-$3*%")
+    storage = ApertureStorage(macros={"CIRCLE": macro})
+
+    assert storage.get_compiled_macro("UNDEFINED") is None
+
+    compiled = storage.get_compiled_macro("CIRCLE")
+    assert compiled is not None
+    assert storage.get_compiled_macro("CIRCLE") is compiled
+
+    primitive = macro.primitives[0]
+    assert isinstance(primitive, Code1)
+    assert compiled.evaluate(primitive.diameter, SCOPE) == 4.0  # noqa: PLR2004
+    assert compiled.evaluate(primitive.center_y, SCOPE) == 1.25  # noqa: PLR2004
+
+    storage.macros["CIRCLE"] = _parse_macro("%AMCIRCLE*1,1,$1,0,0*%")
+    recompiled = storage.get_compiled_macro("CIRCLE")
+    assert recompiled is not None
+    assert recompiled is not compiled
+    assert recompiled.macro is storage.macros["CIRCLE"]
+
+
+def test_compiled_macro_points() -> None:
+    macro = _parse_macro("%AMTRIANGLE*4,1,3,0,0,$1,0,0,$2,0,0,0*%")
+    compiled = ApertureStorage(macros={"TRIANGLE": macro}).get_compiled_macro(
+        "TRIANGLE"
+    )
+    assert compiled is not None
+
+    points: list[tuple[Double, Double]] = [
+        (compiled.evaluate(point.x, SCOPE), compiled.evaluate(point.y, SCOPE))
+        for point in macro.primitives[0].points  # type: ignore[attr-defined]
+    ]
+    assert points == [(2.0, 0.0), (0.0, 3.5), (0.0, 0.0)]
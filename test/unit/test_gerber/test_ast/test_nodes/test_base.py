@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pyparsing as pp
+import pytest
+
+from pygerber.gerber.ast.nodes import SourceInfo
+from pygerber.gerber.ast.nodes.base import LineIndex
+from pygerber.gerber.parser.native.parser import Parser
+
+SOURCES = ["", "\n", "\n\n", "G04*", "G04*\n", "G04*\nD10*\n\nX1Y1D03*", "\nM02*\n"]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_line_index(source: str) -> None:
+    for location in range(len(source) + 1):
+        info = SourceInfo(source=source, location=location, length=0)
+        assert info.line == pp.lineno(location, source)
+        assert info.column == pp.col(location, source)
+
+        info = SourceInfo(source=source.encode(), location=location, length=0)
+        assert info.line == pp.lineno(location, source)
+        assert info.column == pp.col(location, source)
+
+
+def test_line_index_is_shared() -> None:
+    source = "%FSLAX26Y26*%\n%MOMM*%\nD10*\nX100Y100D03*\nM02*\n"
+    ast = Parser().parse(source)
+
+    assert ast.source_info is not None
+    index = ast.source_info.line_index
+    assert index is LineIndex.get(ast.source_info.source)
+
+    for node in ast.nodes:
+        assert node.source_info is not None
+        assert node.source_info.line_index is index
+        assert node.source_info.end_line == pp.lineno(
+            node.source_info.end_location, source
+        )
+        assert node.source_info.end_column == pp.col(
+            node.source_info.end_location, source
+        )
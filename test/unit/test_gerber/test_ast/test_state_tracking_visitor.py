@@ -3,12 +3,14 @@ from __future__ import annotations
 from inspect import isclass
 from typing import TYPE_CHECKING, ClassVar, List
 
+import numpy as np
 import pytest
 
 from pygerber.gerber.ast.errors import (
     ApertureNotSelectedError,
     PackedCoordinateTooLongError,
     PackedCoordinateTooShortError,
+    StateCheckpointsNotRecordedError,
 )
 from pygerber.gerber.ast.nodes import (
     AB,
@@ -37,6 +39,7 @@ from pygerber.gerber.ast.nodes import (
     CoordinateX,
     CoordinateY,
     Dnn,
+    File,
     Node,
     PackedCoordinateStr,
     TA_AperFunction,
@@ -52,8 +55,11 @@ from pygerber.gerber.ast.nodes.enums import (
 from pygerber.gerber.ast.nodes.types import ApertureIdStr
 from pygerber.gerber.ast.state_tracking_visitor import (
     CoordinateFormat,
+    State,
     StateTrackingVisitor,
 )
+from pygerber.gerber.parser import parse
+from test.conftest import ASSETS_DIRECTORY
 
 if TYPE_CHECKING:
     from pytest_mock import MockerFixture
@@ -724,6 +730,53 @@ class TestCoordinateFormat:
         else:
             assert fmt.unpack_y(input_value) == expected
 
+    @pytest.mark.parametrize(
+        ("fmt", "input_value", "expected"),
+        [
+            *params_0,
+            *params_1,
+            *params_2,
+            *params_3,
+            *params_4,
+            *params_5,
+            *params_6,
+        ],
+        ids=lambda x: x.__qualname__ if isclass(x) else str(x),
+    )
+    def test_unpack_x_array(
+        self,
+        fmt: CoordinateFormat,
+        input_value: PackedCoordinateStr,
+        expected: float | type[Exception],
+    ) -> None:
+        """Test if x coordinates are unpacked correctly in batch."""
+        if not isinstance(expected, (int, float)):
+            with pytest.raises(expected):
+                fmt.unpack_x_array([input_value])
+        else:
+            assert fmt.unpack_x_array([input_value]).tolist() == [expected]
+
+    @pytest.mark.parametrize(
+        "zeros", [Zeros.SKIP_LEADING, Zeros.SKIP_TRAILING], ids=str
+    )
+    @pytest.mark.parametrize(("integral", "decimal"), [(2, 4), (3, 6), (9, 9)])
+    def test_unpack_y_array(self, zeros: Zeros, integral: int, decimal: int) -> None:
+        """Test if batch of y coordinates is unpacked the same way as one by one."""
+        fmt = CoordinateFormat(zeros=zeros, y_integral=integral, y_decimal=decimal)
+        coordinates = [
+            PackedCoordinateStr(f"{sign}{value}")
+            for sign in ("", "+", "-")
+            for value in ("0", "1", "10", "0012", "12345", "9" * (integral + decimal))
+        ]
+        unpacked = fmt.unpack_y_array(coordinates)
+
+        assert unpacked.dtype == np.float64
+        assert unpacked.tolist() == [fmt.unpack_y(c) for c in coordinates]
+        assert fmt.unpack_y_array([]).tolist() == []
+
+        with pytest.raises(ValueError):  # noqa: PT011
+            fmt.unpack_y_array([*coordinates, PackedCoordinateStr("1X")])
+
     @pytest.mark.parametrize(
         ("fmt", "expected", "input_value"),
         [
@@ -748,3 +801,89 @@ class TestCoordinateFormat:
             pytest.skip()
         else:
             assert fmt.pack_x(input_value) == expected
+
+
+def _dump_state(state: State) -> dict:
+    # Coordinate format holds closures which differ between instances.
+    dump = state.model_dump(exclude={"coordinate_format"})
+    dump["coordinate_format"] = (
+        None
+        if state.coordinate_format is None
+        else state.coordinate_format.model_dump(
+            include={
+                "zeros",
+                "coordinate_mode",
+                "x_integral",
+                "x_decimal",
+                "y_integral",
+                "y_decimal",
+            }
+        )
+    )
+    return dump
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "ucamco/4.9.1/source.grb",
+        "ucamco/4.10.4.9/source.grb",
+        "step_and_repeat/00_cr_x_3.grb",
+    ],
+)
+def test_state_at(path: str) -> None:
+    """Test if state restored from checkpoints matches state of full replay."""
+    ast = parse((ASSETS_DIRECTORY / "gerberx3" / path).read_text())
+
+    visitor = StateTrackingVisitor(checkpoint_interval=3)
+    ast.visit(visitor)
+    final_state = _dump_state(visitor.state)
+
+    expected = {}
+    for index, node in enumerate(ast.nodes):
+        assert node.source_info is not None
+        reference = StateTrackingVisitor()
+        File(nodes=ast.nodes[:index]).visit(reference)
+        expected[node.source_info.location] = _dump_state(reference.state)
+
+    # Reverse order makes sure that restored checkpoints are not modified.
+    for location in [*expected, *reversed(expected)]:
+        assert _dump_state(visitor.state_at(location)) == expected[location]
+
+    assert _dump_state(visitor.state_at(len(ast.nodes) * 10**6)) == final_state
+
+
+def test_state_at_without_checkpoints() -> None:
+    """Test if state at location can not be requested without checkpoints."""
+    visitor = StateTrackingVisitor()
+    parse("%FSLAX24Y24*%").visit(visitor)
+
+    with pytest.raises(StateCheckpointsNotRecordedError):
+        visitor.state_at(0)
+
+
+def test_transform_version() -> None:
+    """Test if transform version changes only after LM, LR and LS commands."""
+    visitor = StateTrackingVisitor()
+    parse("%FSLAX24Y24*%%LPC*%").visit(visitor)
+    version = visitor.transform_version
+
+    for source in ("%LMXY*%", "%LR45.0*%", "%LS0.5*%"):
+        parse(source).visit(visitor)
+        assert visitor.transform_version != version
+        version = visitor.transform_version
+
+
+def test_attributes_version() -> None:
+    """Test if attributes version changes only after TA, TO and TD commands."""
+    visitor = StateTrackingVisitor()
+    parse("%FSLAX24Y24*%%LPC*%").visit(visitor)
+    version = visitor.attributes_version
+
+    for source in ("%TA.AperFunction,SMDPad,CuDef*%", "%TO.N,GND*%", "%TD.N*%"):
+        parse(source).visit(visitor)
+        assert visitor.attributes_version != version
+        version = visitor.attributes_version
+
+    parse("%TF.Part,Single*%").visit(visitor)
+    assert visitor.attributes_version == version
@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+from typing import cast
+
+import numpy as np
+import pytest
+
+from pygerber.gerber.compiler import Compiler, compile
+from pygerber.gerber.compiler.compiler import CommandBuffer
+from pygerber.gerber.parser import parse
+from pygerber.vm import render
+from pygerber.vm.commands import (
+    Command,
+    EndLayer,
+    PasteLayer,
+    PasteLayerBatch,
+    Polyline,
+    Shape,
+    StartLayer,
+)
+from pygerber.vm.pillow.vm import PillowResult
+from pygerber.vm.rvmc import RVMC
+from pygerber.vm.types import Vector
+from test.conftest import ASSETS_DIRECTORY
+
+DUPLICATE_APERTURES = """%FSLAX26Y26*%
+%MOMM*%
+%AMTHERMAL*7,0,0,1.0,0.6,0.1,0*%
+%ADD10C,0.5*%
+%ADD11C,0.5*%
+%ADD12R,1X0.5*%
+%ADD13THERMAL*%
+%ADD14THERMAL*%
+D10*
+X0Y0D03*
+D11*
+X1000000Y0D03*
+D12*
+X0Y1000000D03*
+D13*
+X1000000Y1000000D03*
+D14*
+X0Y2000000D03*
+M02*
+"""
+
+
+def get_layer_ids(rvmc: RVMC) -> list[str]:
+    return [cmd.id.id for cmd in rvmc.commands if isinstance(cmd, StartLayer)]
+
+
+def get_pasted_layer_ids(rvmc: RVMC) -> list[str]:
+    pasted: list[str] = []
+    for cmd in rvmc.commands:
+        if isinstance(cmd, PasteLayer):
+            pasted.append(cmd.source_layer_id.id)
+        elif isinstance(cmd, PasteLayerBatch):
+            pasted.extend([cmd.source_layer_id.id] * len(cmd.centers))
+    return pasted
+
+
+def test_identical_apertures_share_layer() -> None:
+    rvmc = compile(parse(DUPLICATE_APERTURES))
+
+    layer_ids = get_layer_ids(rvmc)
+    pasted = get_pasted_layer_ids(rvmc)
+
+    # D10, D12, D13, one thermal ring layer used by D13 and main layer.
+    assert len(layer_ids) == 5  # noqa: PLR2004
+    assert not any(id_.startswith(("D11%", "D14%")) for id_ in layer_ids)
+    assert pasted[1] == pasted[2]
+    assert pasted[-2] == pasted[-1]
+    assert set(pasted) <= set(layer_ids)
+
+
+STEP_AND_REPEAT = """%FSLAX26Y26*%
+%MOMM*%
+%AMTHERMAL*7,0,0,1.0,0.6,0.1,0*%
+%ADD10C,0.5*%
+%ADD11THERMAL*%
+D10*
+X0Y0D03*
+%SRX3Y2I2.0J3.0*%
+D10*
+X0Y0D03*
+D11*
+X1000000Y1000000D03*
+%SR*%
+M02*
+"""
+
+
+def test_layer_ids_are_deterministic() -> None:
+    first = compile(parse(STEP_AND_REPEAT)).to_json()
+    second = compile(parse(STEP_AND_REPEAT)).to_json()
+
+    assert first == second
+
+
+def test_shared_layers_are_submitted_once() -> None:
+    rvmc = compile(parse(STEP_AND_REPEAT))
+
+    layer_ids = get_layer_ids(rvmc)
+
+    assert len(layer_ids) == len(set(layer_ids))
+    assert layer_ids[-1] == "%main%"
+
+
+def test_different_apertures_do_not_share_layer() -> None:
+    source = """%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.5*%
+%ADD11C,0.6*%
+D10*
+X0Y0D03*
+D11*
+X1000000Y0D03*
+M02*
+"""
+    rvmc = compile(parse(source))
+
+    pasted = get_pasted_layer_ids(rvmc)
+
+    assert pasted[0] != pasted[1]
+
+
+def get_layer_width(rvmc: RVMC, layer_id: str) -> float:
+    commands = iter(rvmc.commands)
+    for cmd in commands:
+        if isinstance(cmd, StartLayer) and cmd.id.id == layer_id:
+            break
+    shape = next(commands)
+    assert isinstance(shape, Shape)
+    return shape.outer_box.width
+
+
+def get_layer_commands(rvmc: RVMC, layer_id: str) -> list[Command]:
+    commands = iter(rvmc.commands)
+    for cmd in commands:
+        if isinstance(cmd, StartLayer) and cmd.id.id == layer_id:
+            break
+    layer_commands: list[Command] = []
+    for cmd in commands:
+        if isinstance(cmd, EndLayer):
+            return layer_commands
+        layer_commands.append(cmd)
+    raise AssertionError(layer_id)
+
+
+def get_step_and_repeat_layer_ids(rvmc: RVMC) -> list[str]:
+    return [id_ for id_ in get_layer_ids(rvmc) if id_.startswith("%%SR%")]
+
+
+def test_step_and_repeat_is_instanced() -> None:
+    rvmc = compile(parse(STEP_AND_REPEAT))
+
+    (sr_layer_id,) = get_step_and_repeat_layer_ids(rvmc)
+    main_commands = get_layer_commands(rvmc, "%main%")
+    sr_commands = get_layer_commands(rvmc, sr_layer_id)
+
+    # Flash before SR block and single batch pasting SR block 3 x 2 times.
+    assert [type(cmd) for cmd in main_commands] == [PasteLayer, PasteLayerBatch]
+    batch = main_commands[1]
+    assert isinstance(batch, PasteLayerBatch)
+    assert batch.source_layer_id.id == sr_layer_id
+    # Repeats are placed relative to current point, which is X1Y1 after SR block.
+    assert batch.centers.tolist() == [
+        [1.0, 1.0],
+        [1.0, 4.0],
+        [3.0, 1.0],
+        [3.0, 4.0],
+        [5.0, 1.0],
+        [5.0, 4.0],
+    ]
+    # Body of SR block is compiled once.
+    assert len(sr_commands) == 2  # noqa: PLR2004
+    (sr_start_layer,) = (
+        cmd
+        for cmd in rvmc.commands
+        if isinstance(cmd, StartLayer) and cmd.id.id == sr_layer_id
+    )
+    assert sr_start_layer.draw_on_paste
+
+
+class ExpandingCompiler(Compiler):
+    def _can_instance_step_and_repeat(self, buffer: CommandBuffer) -> bool:  # noqa: ARG002
+        return False
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "step_and_repeat/02_cr_xy_3_6.grb",
+        "step_and_repeat/ab/01_cr_xy_2_2.grb",
+        "step_and_repeat/ab/02_cr_xy_2_2_rot_30.grb",
+        "step_and_repeat/line/01_cr_xy_2_2.grb",
+        "step_and_repeat/line/02_cr_xy_2_2_rot_30.grb",
+        "step_and_repeat/rot_30/00_cr_x_3.grb",
+        "step_and_repeat/rot_30/02_cr_xy_3_6.grb",
+    ],
+)
+def test_instanced_step_and_repeat_renders_like_expanded(path: str) -> None:
+    ast = parse((ASSETS_DIRECTORY / "gerberx3" / path).read_text())
+    instanced = Compiler().compile(ast)
+    expanded = ExpandingCompiler().compile(ast)
+    assert get_step_and_repeat_layer_ids(instanced) != []
+    assert get_step_and_repeat_layer_ids(expanded) == []
+
+    instanced_image = cast("PillowResult", render(instanced, dpmm=40))
+    expanded_image = cast("PillowResult", render(expanded, dpmm=40))
+
+    assert np.array_equal(
+        np.asarray(instanced_image.get_image_no_style()),
+        np.asarray(expanded_image.get_image_no_style()),
+    )
+
+
+def test_step_and_repeat_with_clear_polarity_is_expanded() -> None:
+    source = """%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.5*%
+%ADD11C,0.2*%
+%SRX2Y2I2.0J2.0*%
+D10*
+X0Y0D03*
+%LPC*%
+D11*
+X0Y0D03*
+%LPD*%
+%SR*%
+M02*
+"""
+    rvmc = compile(parse(source))
+
+    main_commands = get_layer_commands(rvmc, "%main%")
+
+    assert get_step_and_repeat_layer_ids(rvmc) == []
+    assert len(main_commands) == 8  # noqa: PLR2004
+    assert all(isinstance(cmd, PasteLayer) for cmd in main_commands)
+    assert [cmd.is_negative for cmd in main_commands] == [False, True] * 4  # type: ignore[attr-defined]
+
+
+def test_identical_step_and_repeat_blocks_share_layer() -> None:
+    source = """%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.5*%
+%SRX2Y1I2.0J2.0*%
+D10*
+X0Y0D03*
+X1000000Y0D03*
+%SR*%
+%SRX1Y2I2.0J2.0*%
+D10*
+X0Y0D03*
+X1000000Y0D03*
+%SR*%
+M02*
+"""
+    rvmc = compile(parse(source))
+
+    (sr_layer_id,) = get_step_and_repeat_layer_ids(rvmc)
+
+    assert get_pasted_layer_ids(rvmc).count(sr_layer_id) == 4  # noqa: PLR2004
+
+
+def test_redefined_aperture_does_not_change_deduplicated_aperture() -> None:
+    source = """%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,1*%
+%ADD11C,1*%
+%ADD10C,2*%
+D11*
+X0Y0D03*
+%ADD12C,1*%
+D12*
+X1000000Y0D03*
+D10*
+X2000000Y0D03*
+M02*
+"""
+    rvmc = compile(parse(source))
+
+    d11, d12, d10 = get_pasted_layer_ids(rvmc)
+
+    assert d11 == d12
+    assert d11 != d10
+    assert get_layer_width(rvmc, d11) == pytest.approx(1.0)
+    assert get_layer_width(rvmc, d10) == pytest.approx(2.0)
+
+
+def test_consecutive_flashes_are_batched() -> None:
+    source = """%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.5*%
+%ADD11R,0.5X0.5*%
+D10*
+X0Y0D03*
+X1000000Y0D03*
+X2000000Y0D03*
+X3000000Y0D03*
+D11*
+X0Y1000000D03*
+D10*
+X0Y2000000D03*
+X1000000Y2000000D03*
+%LPC*%
+X2000000Y2000000D03*
+M02*
+"""
+    rvmc = compile(parse(source))
+
+    pastes = [
+        cmd for cmd in rvmc.commands if isinstance(cmd, (PasteLayer, PasteLayerBatch))
+    ]
+
+    # Run of two flashes is shorter than MIN_FLASH_BATCH_SIZE.
+    assert [type(cmd) for cmd in pastes] == [
+        PasteLayerBatch,
+        PasteLayer,
+        PasteLayer,
+        PasteLayer,
+        PasteLayer,
+    ]
+    assert isinstance(pastes[0], PasteLayerBatch)
+    assert pastes[0].centers.tolist() == [
+        [0.0, 0.0],
+        [1.0, 0.0],
+        [2.0, 0.0],
+        [3.0, 0.0],
+    ]
+    assert not pastes[-2].is_negative
+    assert pastes[-1].is_negative
+
+
+def test_connected_lines_are_merged_into_polyline() -> None:
+    source = """%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.5*%
+D10*
+X0Y0D02*
+X1000000Y0D01*
+X1000000Y1000000D01*
+X3000000Y2000000D01*
+M02*
+"""
+    rvmc = compile(parse(source))
+
+    polylines = [cmd for cmd in rvmc.commands if isinstance(cmd, Polyline)]
+
+    assert len(polylines) == 1
+    assert [(p.x, p.y) for p in polylines[0].points] == [
+        (0.0, 0.0),
+        (1.0, 0.0),
+        (1.0, 1.0),
+        (3.0, 2.0),
+    ]
+    # Bounding box must cover all merged lines, including last one.
+    outer_box = polylines[0].outer_box
+    assert outer_box.max_x == pytest.approx(3.25)
+    assert outer_box.max_y == pytest.approx(2.25)
+
+
+def test_line_run_is_not_visible_before_flush() -> None:
+    buffer = CommandBuffer("%main%", None, Vector(x=0, y=0), [], set(), [])
+    buffer.append_line(
+        Vector(x=0, y=0), Vector(x=1, y=0), 0.5, is_negative=False, metadata_id=None
+    )
+    # Polyline must not be observable (and its cached box computed) while it can
+    # still be extended.
+    assert buffer.commands == []
+
+    buffer.append_line(
+        Vector(x=1, y=0), Vector(x=1, y=2), 0.5, is_negative=False, metadata_id=None
+    )
+    buffer.flush()
+
+    assert len(buffer.commands) == 1
+    polyline = buffer.commands[0]
+    assert isinstance(polyline, Polyline)
+    assert polyline.outer_box.max_y == pytest.approx(2.25)
+
+
+OBJECT_ATTRIBUTES = """%FSLAX26Y26*%
+%MOMM*%
+%TF.FileFunction,Copper,L1,Top*%
+%TA.AperFunction,SMDPad,CuDef*%
+%ADD10C,0.5*%
+%TD.AperFunction*%
+D10*
+%TO.N,GND*%
+X0Y0D03*
+X1000000Y0D03*
+%TO.N,VCC*%
+X2000000Y0D03*
+%TO.N,GND*%
+X3000000Y0D03*
+%TD.N*%
+X4000000Y0D03*
+M02*
+"""
+
+
+def test_metadata_is_interned() -> None:
+    compiler = Compiler(include_metadata=True)
+    rvmc = compiler.compile(parse(OBJECT_ATTRIBUTES))
+
+    pastes = [
+        cmd for cmd in rvmc.commands if isinstance(cmd, (PasteLayer, PasteLayerBatch))
+    ]
+    metadata = [rvmc.get_command_metadata(cmd) for cmd in pastes]
+    metadata_ids = [cmd.metadata_id for cmd in pastes]
+
+    # GND twice, VCC, GND and flash without object attributes.
+    assert len(pastes) == 5  # noqa: PLR2004
+    assert metadata_ids[0] == metadata_ids[1] == metadata_ids[3]
+    assert len(set(metadata_ids)) == 3  # noqa: PLR2004
+    assert all(cmd.metadata is None for cmd in pastes)
+    assert [set(m or {}) for m in metadata] == [{".N"}] * 4 + [set()]
+    assert metadata[0] != metadata[2]
+
+    aperture_shapes = [cmd for cmd in rvmc.commands if isinstance(cmd, Shape)]
+    assert set(rvmc.get_command_metadata(aperture_shapes[0]) or {}) == {".AperFunction"}
+    assert rvmc.metadata is not None
+    assert ".FileFunction" in rvmc.metadata
+
+
+def test_metadata_is_not_included_by_default() -> None:
+    rvmc = compile(parse(OBJECT_ATTRIBUTES))
+
+    assert rvmc.metadata_table == []
+    assert all(cmd.metadata_id is None for cmd in rvmc.commands)
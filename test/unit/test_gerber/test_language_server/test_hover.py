@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from pygerber.gerber.language_server._server.hover.gerber import (
+    GerberHoverCreator,
+    new_state_tracker,
+)
+from pygerber.gerber.parser import parse
+from test.tags import Tag, tag
+
+SOURCE_WITH_NODES_AFTER_PROGRAM_STOP = """%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.5*%
+%ADD11R,1X2*%
+D10*
+M02*
+D11*
+X0Y0D03*
+"""
+
+
+@tag(Tag.LSP, Tag.EXTRAS)
+def test_hover_without_state_tracker_matches_document_state_tracker() -> None:
+    ast = parse(SOURCE_WITH_NODES_AFTER_PROGRAM_STOP)
+    node = ast.nodes[-1]
+
+    state_tracker = new_state_tracker()
+    ast.visit(state_tracker)
+
+    expected = GerberHoverCreator(ast, state_tracker).create_hover_markdown(node)
+    markdown = GerberHoverCreator(ast).create_hover_markdown(node)
+
+    assert markdown == expected
@@ -0,0 +1,435 @@
+from __future__ import annotations
+
+import io
+import mmap
+from typing import TYPE_CHECKING
+
+import pyparsing as pp
+import pytest
+
+from pygerber.gerber.ast.nodes import AB, D01, D02, D03, G04, TA, TD, TF, TO, Node
+from pygerber.gerber.compiler import Compiler, compile
+from pygerber.gerber.parser import iter_parse, parse
+from pygerber.gerber.parser.native.parser import Parser as NativeParser
+from pygerber.gerber.parser.pyparsing.grammar import Optimization, SyntaxSwitches
+from pygerber.gerber.parser.pyparsing.parser import Parser as PyparsingParser
+from test.conftest import ASSETS_DIRECTORY
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+GERBER_ASSETS_DIRECTORY = ASSETS_DIRECTORY / "gerberx3"
+GERBER_EXTENSIONS = {
+    ".grb",
+    ".gbr",
+    ".gbl",
+    ".gbo",
+    ".gbp",
+    ".gbs",
+    ".gm1",
+    ".gml",
+    ".gtl",
+    ".gto",
+    ".gtp",
+    ".gts",
+}
+
+
+def _gerber_assets() -> list[Path]:
+    return sorted(
+        path
+        for path in GERBER_ASSETS_DIRECTORY.rglob("*")
+        if path.suffix.lower() in GERBER_EXTENSIONS
+    )
+
+
+@pytest.mark.parametrize(
+    "asset",
+    _gerber_assets(),
+    ids=lambda path: path.relative_to(GERBER_ASSETS_DIRECTORY).as_posix(),
+)
+def test_native_parser_conformance(asset: Path) -> None:
+    source = asset.read_text()
+
+    try:
+        expected = PyparsingParser().parse(source)
+    except pp.ParseException:
+        with pytest.raises(pp.ParseException):
+            NativeParser().parse(source)
+        return
+
+    assert NativeParser().parse(source) == expected
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "   \tX1Y2D01*\n\tD02*\n",
+        "X+1Y-2I3J4D01*X1D02*D03*D10*D010*",
+        "G01X1D02*G70D02*G04 comment *G04*G040*",
+        "*",
+        "M00*M01*M02*",
+        "% AB D10 * %\nD10*\n%ABD11*%%AB*%% AB * %",
+        "%SRX1Y2I3J4*%%ADD11C,1*%%SR*%",
+        "%FSLAX24Y24*%%FS AX24Y24*%%FSTIX24Y24*%",
+        "%ADD10C,1X0.5*%%ADD11R,1X2*%%ADD12O,1X2X3*%%ADD13P,1X3X4X5*%",
+        "%ADD14MACRO*%%ADD15MACRO,1X2X.5*%",
+        (
+            "%AMX*0 comment*1,-1+2x3/-$1,(1),+-2,4*$1=2*4,1,3,0,0,1,1,0,0,5*"
+            "20,1,2,3,4,5,6,7*21,1,2,3,4,5,6*22,1,2,3,4,5,6*%"
+        ),
+        "%AMX*1,1,-+1,--1,1-2-3+4x5X6/7/8*%",
+        "%AMX*\n1, 1 , $1 x ( $2 + 3 ) ,\n.5,-.5,1*\n%",
+        "%LPD*%%LPC*%%LMXY*%%LMX*%%LMN*%%LR45*%%LS0.5*%%LN foo bar *%",
+        "%MOMM*%%IPPOS*%%IR90*%%OFA1B2*%%ASAXBY*%%MIA0B1*%%INname*%%SFA1*%",
+        "%TA.FlashText,a,B,,f,s,c1,,c3*%%TA.AperFunction*%%TA.AperFunction,Foo*%",
+        "%TA.AperFunction,ViaDrill,Filled*%%TA.DrillTolerance,1,2*%%TAfoo,*%",
+        "%TF.Part,Single*%%TF.filefunction,Copper,L1,Top*%%TF.SameCoordinates*%",
+        "%TF.GenerationSoftware,a,b,c*%%TF.ProjectId,a*%%TFuser,a*%",
+        "%TF.MD5,6ab9e892830469cdff7e3e346331d404*%",
+        "%TO.N*%%TO.N, a , b*%%TO.P,R1,1*%%TO.C,R1*%%TO.CRot,90*%%TO.CSup,a,b,c*%",
+        "%TD*%%TD.N*%%TOfoo,x*%",
+    ],
+)
+def test_native_parser_matches_pyparsing_parser(source: str) -> None:
+    assert NativeParser().parse(source) == PyparsingParser().parse(source)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "D10*\n???\nD11*\n",
+        "  ???\nD11*\n",
+        "%ABD10*%%SRX2*%%SR*%%AB*%",
+    ],
+)
+def test_native_parser_resilient(source: str) -> None:
+    assert NativeParser(resilient=True).parse(source) == PyparsingParser(
+        resilient=True
+    ).parse(source)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "D10*\n???\nD11*\n",
+        "%ABD10*%D10*%AB*%%SRX2*%%SR*%",
+    ],
+)
+def test_native_parser_non_strict(source: str) -> None:
+    assert NativeParser().parse(source, strict=False) == PyparsingParser().parse(
+        source, strict=False
+    )
+
+
+@pytest.mark.parametrize(
+    "source", ["", "D10*\n???\n", "%AMX*1,1*%", "%SRX1*%%SRX2*%%SR*%%SR*%"]
+)
+def test_native_parser_error(source: str) -> None:
+    with pytest.raises(pp.ParseException):
+        PyparsingParser().parse(source)
+
+    with pytest.raises(pp.ParseException):
+        NativeParser().parse(source)
+
+    with pytest.raises(pp.ParseException):
+        NativeParser().parse(source.encode())
+
+
+@pytest.mark.parametrize("source", ["X1Y2*", "D10*X1Y2I3J4*D11*", "X1 Y2 *"])
+def test_native_parser_d01_without_code_not_allowed(source: str) -> None:
+    syntax_switches = SyntaxSwitches(allow_d01_without_code=False)
+
+    with pytest.raises(pp.ParseException):
+        PyparsingParser(syntax_switches=syntax_switches).parse(source)
+
+    with pytest.raises(pp.ParseException):
+        NativeParser(syntax_switches=syntax_switches).parse(source)
+
+    assert NativeParser(syntax_switches=syntax_switches, resilient=True).parse(
+        source
+    ) == PyparsingParser(syntax_switches=syntax_switches, resilient=True).parse(source)
+
+
+def test_native_parser_d01_with_code_required() -> None:
+    syntax_switches = SyntaxSwitches(allow_d01_without_code=False)
+    source = "X1Y2D01*G01X1Y2D01*X1D02*D03*"
+
+    assert NativeParser(syntax_switches=syntax_switches).parse(
+        source
+    ) == PyparsingParser(syntax_switches=syntax_switches).parse(source)
+
+
+def test_parse_with_native_backend() -> None:
+    source = "%FSLAX24Y24*%%MOMM*%%ADD10C,1*%D10*X0Y0D02*X100Y100D01*M02*"
+
+    assert parse(source, parser="native") == parse(source, parser="pyparsing")
+
+
+STREAMING_ASSETS = [
+    "A64_OLinuXino_rev_G/A64-OlinuXino_Rev_G-B_Cu.gbr",
+    "ucamco/4.9.1/source.grb",
+    "ucamco/4.11.4/source.grb",
+    "macro/codes/code_21.grb",
+    "flashes/00_circle_4.grb",
+]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 256, 64 * 1024])
+@pytest.mark.parametrize("asset", STREAMING_ASSETS)
+def test_native_parser_parse_stream(asset: str, chunk_size: int) -> None:
+    source = (GERBER_ASSETS_DIRECTORY / asset).read_text()
+    expected = NativeParser().parse(source).nodes
+
+    nodes = list(
+        NativeParser().parse_stream(io.StringIO(source), chunk_size=chunk_size)
+    )
+
+    assert [n.model_dump() for n in nodes] == [n.model_dump() for n in expected]
+    for node, expected_node in zip(nodes, expected):
+        assert node.source_info is not None
+        assert expected_node.source_info is not None
+        assert node.source_info.column == expected_node.source_info.column
+        assert (
+            node.source_info.source[
+                node.source_info.location : node.source_info.end_location
+            ]
+            == expected_node.source_info.source[
+                expected_node.source_info.location : expected_node.source_info.end_location
+            ]
+        )
+
+
+def test_native_parser_parse_stream_is_lazy() -> None:
+    source = "%FSLAX24Y24*%\n%MOMM*%\n" + "X0Y0D02*\n" * 10_000
+    stream = io.StringIO(source)
+    nodes = NativeParser().parse_stream(stream, chunk_size=64)
+
+    next(nodes)
+
+    assert stream.tell() < len(source)
+
+
+@pytest.mark.parametrize(
+    ("source", "strict"),
+    [("", True), ("", False), ("D10*\n???\n", True), ("???", False)],
+)
+def test_native_parser_parse_stream_error(source: str, *, strict: bool) -> None:
+    with pytest.raises(pp.ParseException):
+        list(NativeParser().parse_stream(io.StringIO(source), strict=strict))
+
+
+def test_native_parser_parse_stream_non_strict() -> None:
+    nodes = list(
+        NativeParser().parse_stream(io.StringIO("D10*\n???\nD11*\n"), strict=False)
+    )
+    assert [n.model_dump() for n in nodes] == [
+        n.model_dump()
+        for n in NativeParser().parse("D10*\n???\nD11*\n", strict=False).nodes
+    ]
+
+
+def test_iter_parse_from_path() -> None:
+    path = GERBER_ASSETS_DIRECTORY / STREAMING_ASSETS[0]
+
+    nodes = list(iter_parse(path))
+
+    assert [n.model_dump() for n in nodes] == [
+        n.model_dump() for n in parse(path.read_text()).nodes
+    ]
+
+
+def test_compile_nodes_from_iter_parse() -> None:
+    path = GERBER_ASSETS_DIRECTORY / STREAMING_ASSETS[1]
+
+    with path.open() as stream:
+        rvmc = Compiler().compile_nodes(iter_parse(stream))
+
+    assert rvmc == compile(parse(path.read_text()))
+
+
+@pytest.mark.parametrize("asset", STREAMING_ASSETS)
+def test_native_parser_parse_memory_mapped(asset: str) -> None:
+    path = GERBER_ASSETS_DIRECTORY / asset
+    expected = NativeParser().parse(path.read_text()).nodes
+
+    with path.open("rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as buffer:
+        nodes = NativeParser().parse(buffer).nodes
+
+        assert [n.model_dump() for n in nodes] == [n.model_dump() for n in expected]
+        for node, expected_node in zip(nodes, expected):
+            assert node.source_info is not None
+            assert expected_node.source_info is not None
+            assert node.source_info.source is buffer
+            assert node.source_info.line == expected_node.source_info.line
+            assert node.source_info.column == expected_node.source_info.column
+            assert node.source_info.end_line == expected_node.source_info.end_line
+            assert node.source_info.end_column == expected_node.source_info.end_column
+
+
+def test_parse_bytes() -> None:
+    source = "%FSLAX26Y26*%\nG04 Comment*\nD10*\nX100Y200D03*\nM02*\n"
+
+    for parser in ("pyparsing", "native"):
+        assert (
+            parse(source.encode(), parser=parser).model_dump()  # type: ignore[arg-type]
+            == parse(source).model_dump()
+        )
+
+
+OPTIMIZATION_SOURCE = """%FSLAX26Y26*%
+%MOMM*%
+G04 Comment*
+%TF.FileFunction,Copper,L1,Top*%
+%TA.AperFunction,SMDPad,CuDef*%
+%ADD10C,0.1*%
+%TO.N,GND*%
+%ABD11*%
+G04 Comment in block*
+%TA.AperFunction,SMDPad,CuDef*%
+D10*
+X0Y0D03*
+%AB*%
+%TD*%
+D11*
+X100Y100D03*
+M02*
+"""
+
+
+def _node_types(nodes: list[Node]) -> list[type[Node]]:
+    types = []
+    for node in nodes:
+        types.append(type(node))
+        if isinstance(node, AB):
+            types.extend(_node_types(node.nodes))
+    return types
+
+
+@pytest.mark.parametrize(
+    ("optimization", "discarded"),
+    [
+        (0, ()),
+        (Optimization.DISCARD_COMMENTS, (G04,)),
+        (Optimization.DISCARD_ATTRIBUTES, (TA, TD, TF, TO)),
+        (
+            Optimization.DISCARD_COMMENTS | Optimization.DISCARD_ATTRIBUTES,
+            (G04, TA, TD, TF, TO),
+        ),
+    ],
+)
+def test_parser_optimization(optimization: int, discarded: tuple[type, ...]) -> None:
+    all_types = _node_types(parse(OPTIMIZATION_SOURCE).nodes)
+    expected = [t for t in all_types if not issubclass(t, discarded)]
+
+    for parser in ("pyparsing", "native"):
+        ast = parse(
+            OPTIMIZATION_SOURCE,
+            parser=parser,  # type: ignore[arg-type]
+            optimization=optimization,
+        )
+        assert _node_types(ast.nodes) == expected
+
+    stream = io.StringIO(OPTIMIZATION_SOURCE)
+    assert [
+        node.model_dump()
+        for node in NativeParser(optimization=optimization).parse_stream(stream)
+    ] == [node.model_dump() for node in ast.nodes]
+
+
+def test_parser_optimization_discard_all_nodes() -> None:
+    source = "G04 Comment*\n%TF.Part,Other*%\n"
+    optimization = Optimization.DISCARD_COMMENTS | Optimization.DISCARD_ATTRIBUTES
+
+    assert PyparsingParser(optimization=optimization).parse(source).nodes == []
+    assert NativeParser(optimization=optimization).parse(source).nodes == []
+    assert (
+        list(NativeParser(optimization=optimization).parse_stream(io.StringIO(source)))
+        == []
+    )
+
+
+INTERN_SOURCE = """%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.1*%
+%LPD*%
+D10*
+G01*
+X100Y100D02*
+X200Y100D01*
+X200 Y200 D01*
+%LPC*%
+D10*
+G01*
+X100Y100D03*
+%LPD*%
+M02*
+"""
+
+
+@pytest.mark.parametrize("parser", ["pyparsing", "native"])
+def test_parser_optimization_intern_nodes(parser: str) -> None:
+    expected = parse(INTERN_SOURCE, parser=parser)  # type: ignore[arg-type]
+    ast = parse(
+        INTERN_SOURCE,
+        parser=parser,  # type: ignore[arg-type]
+        optimization=Optimization.INTERN_NODES,
+    )
+    assert ast.model_dump() == expected.model_dump()
+
+    lp_dark, d10, g01, d02, d01, d01_spaced, *_, d03, lp_dark_again = ast.nodes[3:-1]
+    assert isinstance(d02, D02)
+    assert isinstance(d01, D01)
+    assert isinstance(d01_spaced, D01)
+    assert isinstance(d03, D03)
+    assert lp_dark is lp_dark_again
+    assert d10 is ast.nodes[10]
+    assert g01 is ast.nodes[11]
+    assert d01.x is d01_spaced.x
+    assert d02.x is d03.x
+    assert d02.y is d01.y
+    assert lp_dark.source_info is None
+    assert d01.x is not None
+    assert d01.x.source_info is None
+    assert d01.source_info is not None
+    assert lp_dark is not ast.nodes[9]
+
+
+def test_parser_optimization_intern_nodes_stream() -> None:
+    optimization = Optimization.INTERN_NODES
+    nodes = list(
+        NativeParser(optimization=optimization).parse_stream(io.StringIO(INTERN_SOURCE))
+    )
+
+    assert [node.model_dump() for node in nodes] == [
+        node.model_dump() for node in parse(INTERN_SOURCE, parser="native").nodes
+    ]
+    assert nodes[4] is nodes[10]
+
+
+@pytest.mark.parametrize("parser", ["pyparsing", "native"])
+def test_parser_optimization_intern_nodes_scoped_to_parse_call(parser: str) -> None:
+    first = parse(
+        INTERN_SOURCE,
+        parser=parser,  # type: ignore[arg-type]
+        optimization=Optimization.INTERN_NODES,
+    )
+    second = parse(
+        INTERN_SOURCE,
+        parser=parser,  # type: ignore[arg-type]
+        optimization=Optimization.INTERN_NODES,
+    )
+
+    assert first.nodes[4] is first.nodes[10]
+    assert second.nodes[4] is second.nodes[10]
+    assert first.nodes[4] is not second.nodes[4]
+
+
+def test_parser_optimization_intern_nodes_reused_native_parser() -> None:
+    parser = NativeParser(optimization=Optimization.INTERN_NODES)
+    first = parser.parse(INTERN_SOURCE)
+    second = parser.parse(INTERN_SOURCE)
+
+    assert first.nodes[4] is not second.nodes[4]
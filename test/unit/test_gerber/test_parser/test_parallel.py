@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import pyparsing as pp
+import pytest
+
+from pygerber.gerber.parser import parse
+from pygerber.gerber.parser.parallel import get_chunk_offsets
+from test.conftest import ASSETS_DIRECTORY
+
+SOURCES = [
+    "ucamco/4.9.1/source.grb",
+    "ucamco/4.9.6/source_2.grb",
+    "step_and_repeat/00_cr_x_3.grb",
+    "step_and_repeat/ab/01_cr_xy_2_2.grb",
+    "macro/codes/code_21.grb",
+]
+
+
+@pytest.mark.parametrize("parser", ["pyparsing", "native"])
+@pytest.mark.parametrize("path", SOURCES)
+def test_parse_parallel(path: str, parser: str) -> None:
+    source = (ASSETS_DIRECTORY / "gerberx3" / path).read_text()
+
+    assert parse(source, parser=parser, jobs=3) == parse(source, parser=parser)  # type: ignore[arg-type]
+
+
+def test_parse_parallel_bytes() -> None:
+    source = (ASSETS_DIRECTORY / "gerberx3" / "ucamco/4.9.1/source.grb").read_bytes()
+
+    expected = parse(source.decode(), parser="native")
+    ast = parse(source, parser="native", jobs=3)
+
+    assert ast.model_dump(exclude={"source_info"}) == expected.model_dump(
+        exclude={"source_info"}
+    )
+    for node, expected_node in zip(ast.nodes, expected.nodes):
+        assert node.source_info is not None
+        assert expected_node.source_info is not None
+        assert node.source_info.location == expected_node.source_info.location
+        assert node.source_info.line == expected_node.source_info.line
+
+
+@pytest.mark.parametrize(
+    ("source", "chunk_count", "expected"),
+    [
+        ("D10*X1Y1D03*X2Y2D03*X3Y3D03*", 4, [0, 12, 20]),
+        ("%FSLAX26Y26*MOMM*%D10*X1Y1D03*", 2, [0, 18]),
+        ("%SRX2Y2I1J1*%D10*X1Y1D03*%SR*%D10*X1Y1D03*", 4, [0, 30]),
+        ("%ABD10*%D10*X1Y1D03*%AB*%D10*X1Y1D03*", 4, [0, 25]),
+        ("D10*X1Y1D03*\n", 4, [0, 4]),
+        ("D10*", 4, [0]),
+    ],
+)
+def test_get_chunk_offsets(source: str, chunk_count: int, expected: list[int]) -> None:
+    assert get_chunk_offsets(source, chunk_count) == expected
+    assert get_chunk_offsets(source.encode(), chunk_count) == expected
+
+
+@pytest.mark.parametrize("parser", ["pyparsing", "native"])
+def test_parse_parallel_error_location(parser: str) -> None:
+    source = "D10*X1Y1D03*X2Y2D03*\nX3Y3D03*\nX4Y4D03*\nG999*\nM02*\n"
+
+    with pytest.raises(pp.ParseException) as sequential:
+        parse(source, parser=parser)  # type: ignore[arg-type]
+
+    with pytest.raises(pp.ParseException) as parallel:
+        parse(source, parser=parser, jobs=4)  # type: ignore[arg-type]
+
+    assert parallel.value.loc == sequential.value.loc
+    assert parallel.value.lineno == sequential.value.lineno
+
+
+@pytest.mark.parametrize("parser", ["pyparsing", "native"])
+def test_parse_parallel_non_strict(parser: str) -> None:
+    source = "D10*X1Y1D03*X2Y2D03*\nX3Y3D03*\nX4Y4D03*\nG999*\nM02*\n"
+
+    assert parse(source, parser=parser, strict=False, jobs=4) == parse(  # type: ignore[arg-type]
+        source,
+        parser=parser,  # type: ignore[arg-type]
+        strict=False,
+    )
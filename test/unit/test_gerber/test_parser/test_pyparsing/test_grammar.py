@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pyparsing as pp
+import pytest
+
+from pygerber.gerber.ast.nodes import G04
+from pygerber.gerber.parser.native.parser import Parser as NativeParser
+from pygerber.gerber.parser.pyparsing.grammar import (
+    Grammar,
+    Optimization,
+    SyntaxSwitches,
+)
+from pygerber.gerber.parser.pyparsing.parser import Parser, get_grammar
+from test.conftest import ASSETS_DIRECTORY
+
+D_CODE_STATEMENTS = [
+    "X123Y456D01*",
+    "X-123Y+456D1*",
+    "x123y456D01*",
+    "X123Y456I-10J20D01*",
+    "X123D02*",
+    "Y456D002*",
+    "X123Y456D03*",
+    "D03*",
+    "X123Y456*",
+    "I10J10*",
+    "*",
+    "  X123\nY456 D01 *",
+    "X123 Y456D02*",
+    "D10*",
+]
+
+
+@pytest.mark.parametrize("source", D_CODE_STATEMENTS)
+def test_coordinate_d_codes_fast_path(source: str) -> None:
+    expected = (
+        Grammar({})._d_codes(is_standalone=True).parse_string(source, parse_all=True)[0]
+    )
+
+    assert Parser().parse(source).nodes == [expected]
+    assert NativeParser().parse(source).nodes == [expected]
+
+
+@pytest.mark.parametrize("source", ["X1Y1I1J1D02*", "X1I1D03*", "X1 Y1 I1 D02*"])
+def test_coordinate_d_codes_fast_path_error(source: str) -> None:
+    with pytest.raises(pp.ParseException):
+        Parser().parse(source)
+
+    with pytest.raises(pp.ParseException):
+        NativeParser().parse(source)
+
+
+class CustomG04(G04):
+    pass
+
+
+def test_get_grammar_is_cached() -> None:
+    assert get_grammar() is get_grammar()
+    assert Parser().grammar is Parser().grammar
+    assert get_grammar(syntax_switches=SyntaxSwitches()) is get_grammar(), (
+        "Default syntax switches should be used when not specified."
+    )
+    assert get_grammar({"G04": CustomG04}) is get_grammar({"G04": CustomG04})
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"resilient": True},
+        {"optimization": Optimization.DISCARD_COMMENTS},
+        {"syntax_switches": SyntaxSwitches(allow_d01_without_code=False)},
+        {"ast_node_class_overrides": {"G04": CustomG04}},
+    ],
+)
+def test_get_grammar_options_are_part_of_cache_key(options: dict) -> None:
+    assert get_grammar(**options) is not get_grammar()
+
+
+def test_parser_reuse_from_multiple_threads() -> None:
+    sources = [
+        (ASSETS_DIRECTORY / "gerberx3" / path).read_text()
+        for path in (
+            "ucamco/4.9.1/source.grb",
+            "ucamco/4.11.4/source.grb",
+            "macro/codes/code_21.grb",
+            "flashes/00_circle_4.grb",
+        )
+    ]
+    parser = Parser()
+    expected = [parser.parse(source) for source in sources]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(parser.parse, sources * 4))
+
+    assert results == expected * 4
@@ -4,8 +4,8 @@ from typing import Optional
 
 from pygerber.builder.rvmc import RvmcBuilder
 from pygerber.vm import RVMC
-from pygerber.vm.commands import Command, EndLayer, Shape, StartLayer
-from pygerber.vm.commands.paste import PasteLayer
+from pygerber.vm.commands import Command, EndLayer, Polyline, Shape, StartLayer
+from pygerber.vm.commands.paste import PasteLayer, PasteLayerBatch
 from pygerber.vm.types import Box, LayerID, Vector
 
 
@@ -49,6 +49,17 @@ def make_obround_vertical_in_center_fixed_canvas() -> list[Command]:
     ]
 
 
+def make_polyline_in_center_fixed_canvas() -> list[Command]:
+    return [
+        make_main_layer(Box.from_center_width_height((0, 0), 5, 5)),
+        Polyline.new(
+            [(-1.5, -1.5), (1.5, -1.5), (-1, 0), (1.5, 1.5)], 0.5, is_negative=False
+        ),
+        Polyline.new([(-1.5, 1.5), (0, 0)], 0.25, is_negative=True),
+        EndLayer(),
+    ]
+
+
 def make_circle_in_center_fixed_canvas() -> list[Command]:
     return [
         make_main_layer(
@@ -121,6 +132,62 @@ def make_paste_negative_rectangle_in_center_fixed_canvas() -> list[Command]:
     ]
 
 
+def make_paste_rectangles_dynamic_canvas(*, batch: bool) -> list[Command]:
+    positive_centers = [(0.0, 0.0), (3.0, 0.0), (0.0, 2.5), (3.3, 2.7)]
+    negative_centers = [(0.5, 0.25), (3.5, 2.75)]
+
+    if batch:
+        pastes: list[Command] = [
+            PasteLayerBatch.new("rect", positive_centers),
+            PasteLayerBatch.new("rect", negative_centers, is_negative=True),
+        ]
+    else:
+        pastes = [
+            *(PasteLayer.new("rect", center) for center in positive_centers),
+            *(
+                PasteLayer.new("rect", center, is_negative=True)
+                for center in negative_centers
+            ),
+        ]
+
+    return [
+        make_main_layer(None),
+        make_layer("rect", Box.from_center_width_height((0, 0), 2.5, 2)),
+        Shape.new_rectangle((0, 0), 2, 1, is_negative=False),
+        EndLayer(),
+        *pastes,
+        EndLayer(),
+    ]
+
+
+def make_paste_grid_dynamic_canvas(*, batch: bool) -> list[Command]:
+    positive_centers = [(x * 0.3, y * 0.3) for x in range(20) for y in range(20)]
+    negative_centers = [(x * 0.6, y * 0.6) for x in range(10) for y in range(10)]
+
+    if batch:
+        pastes: list[Command] = [
+            PasteLayerBatch.new("circle", positive_centers),
+            PasteLayerBatch.new("circle", negative_centers, is_negative=True),
+        ]
+    else:
+        pastes = [
+            *(PasteLayer.new("circle", center) for center in positive_centers),
+            *(
+                PasteLayer.new("circle", center, is_negative=True)
+                for center in negative_centers
+            ),
+        ]
+
+    return [
+        make_main_layer(None),
+        make_layer("circle", None),
+        Shape.new_circle((0, 0), 0.25, is_negative=False),
+        EndLayer(),
+        *pastes,
+        EndLayer(),
+    ]
+
+
 def make_intersecting_rectangles_dynamic_canvas() -> RVMC:
     builder = RvmcBuilder()
     with builder.layer() as layer:
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import numpy as np
+import pytest
+
+from pygerber.vm.commands import PasteLayer, PasteLayerBatch
+from pygerber.vm.types.matrix import Matrix3x3
+
+
+class TestPasteLayerBatch:
+    def test_new(self) -> None:
+        batch = PasteLayerBatch.new("layer", [(0.0, 0.0), (1.0, 2.0)])
+        assert batch.centers.shape == (2, 2)
+        assert not batch.centers.flags.writeable
+        assert batch == PasteLayerBatch.new("layer", np.array([[0.0, 0.0], [1.0, 2.0]]))
+
+    def test_new_empty(self) -> None:
+        with pytest.raises(ValueError, match="at least one center"):
+            PasteLayerBatch.new("layer", [])
+
+    @pytest.mark.parametrize(
+        "centers",
+        [
+            [0.0, 0.0, 1.0, 2.0],
+            [(0.0, 0.0, 1.0), (2.0, 3.0, 4.0)],
+            [[(0.0, 0.0)], [(1.0, 2.0)]],
+        ],
+    )
+    def test_new_invalid_shape(self, centers: list[Any]) -> None:
+        with pytest.raises(ValueError, match=r"shape \(N, 2\)"):
+            PasteLayerBatch.new("layer", centers)
+
+    def test_iter_paste_layer(self) -> None:
+        batch = PasteLayerBatch.new("layer", [(0.0, 0.0), (1.0, 2.0)], is_negative=True)
+        assert list(batch.iter_paste_layer()) == [
+            PasteLayer.new("layer", (0.0, 0.0), is_negative=True),
+            PasteLayer.new("layer", (1.0, 2.0), is_negative=True),
+        ]
+
+    def test_transform(self) -> None:
+        batch = PasteLayerBatch.new("layer", [(0.0, 0.0), (1.0, 2.0)])
+        transformed = batch.transform(
+            Matrix3x3.new_scale(2.0, 2.0) @ Matrix3x3.new_reflect(x=True, y=False)
+        )
+        assert transformed == PasteLayerBatch.new("layer", [(0.0, 0.0), (-2.0, 4.0)])
+
+    def test_json_round_trip(self) -> None:
+        batch = PasteLayerBatch.new("layer", [(0.0, 0.0), (1.0, 2.0)])
+        data = json.loads(batch.model_dump_json())
+        assert data["centers"] == [[0.0, 0.0], [1.0, 2.0]]
+        assert PasteLayerBatch.model_validate(data) == batch
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from pygerber.vm.commands import Polyline
+from pygerber.vm.types.box import Box
+from pygerber.vm.types.matrix import Matrix3x3
+from pygerber.vm.types.vector import Vector
+
+
+class TestPolyline:
+    def test_new(self) -> None:
+        assert Polyline.new(
+            [(0.0, 0.0), (1.0, 1.0)], 0.5, is_negative=False
+        ) == Polyline(
+            points=[Vector(x=0.0, y=0.0), Vector(x=1.0, y=1.0)],
+            width=0.5,
+        )
+
+    def test_outer_box(self) -> None:
+        polyline = Polyline.new(
+            [(0.0, 0.0), (2.0, 1.0), (1.0, -1.0)], 1.0, is_negative=False
+        )
+        assert polyline.outer_box == Box(min_x=-0.5, min_y=-1.5, max_x=2.5, max_y=1.5)
+
+    def test_transform(self) -> None:
+        polyline = Polyline.new([(0.0, 0.0), (1.0, 1.0)], 0.5, is_negative=True)
+        transformed = polyline.transform(
+            Matrix3x3.new_scale(2.0, 2.0) @ Matrix3x3.new_reflect(x=True, y=False)
+        )
+        assert transformed == Polyline(
+            points=[Vector(x=0.0, y=0.0), Vector(x=-2.0, y=2.0)],
+            width=1.0,
+            is_negative=True,
+        )
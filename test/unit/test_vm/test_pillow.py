@@ -4,11 +4,19 @@ import inspect
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional, Sequence
 
+import numpy as np
 import pytest
 from PIL import Image
 
 from pygerber.vm import RVMC
-from pygerber.vm.commands import Command, EndLayer, Shape
+from pygerber.vm.commands import (
+    Command,
+    EndLayer,
+    PasteLayer,
+    PasteLayerBatch,
+    Polyline,
+    Shape,
+)
 from pygerber.vm.pillow import PillowVirtualMachine
 from pygerber.vm.types import Box, Style, Vector
 from test.conftest import TEST_DIRECTORY
@@ -20,13 +28,17 @@ from test.unit.test_builder.test_rvmc import (
 from test.unit.test_vm.command_builders import (
     make_circle_in_center_fixed_canvas,
     make_circle_over_circle_in_center_fixed_canvas,
+    make_layer,
     make_main_layer,
     make_obround_horizontal_in_center_fixed_canvas,
     make_obround_vertical_in_center_fixed_canvas,
     make_paste_circle_over_circle_in_center_fixed_canvas,
     make_paste_circle_over_paste_circle_in_center_dynamic_canvas,
+    make_paste_grid_dynamic_canvas,
     make_paste_negative_rectangle_in_center_fixed_canvas,
     make_paste_rectangle_in_center_fixed_canvas,
+    make_paste_rectangles_dynamic_canvas,
+    make_polyline_in_center_fixed_canvas,
     make_rectangle_in_center_fixed_canvas,
 )
 
@@ -83,6 +95,31 @@ def test_draw_obround_vertical_in_center() -> None:
     compare(run(100, commands))
 
 
+@tag(Tag.PILLOW)
+def test_draw_polyline_in_center() -> None:
+    commands = make_polyline_in_center_fixed_canvas()
+    compare(run(100, commands))
+
+
+@tag(Tag.PILLOW)
+@pytest.mark.parametrize(
+    ("y", "width"), [(0.29, 0.22), (0.35, 0.1), (0.36, 0.12), (0.5, 0.4)]
+)
+def test_polyline_ends_are_aligned_with_lines(y: float, width: float) -> None:
+    commands = [
+        make_main_layer(Box(min_x=0, min_y=0, max_x=2, max_y=1)),
+        Polyline.new([(0.5, y), (1.5, y)], width, is_negative=False),
+        EndLayer(),
+    ]
+    image = PillowVirtualMachine(10).run(RVMC(commands=commands)).get_image_no_style()
+    pixels = np.asarray(image)
+
+    # Round ends must be rounded like line body, not stick out of it.
+    assert np.nonzero(pixels.any(axis=1))[0].tolist() == (
+        np.nonzero(pixels[:, 10])[0].tolist()
+    )
+
+
 @tag(Tag.PILLOW)
 def test_draw_circle_in_center() -> None:
     commands = make_circle_in_center_fixed_canvas()
@@ -117,6 +154,65 @@ def test_paste_negative_rectangle_in_center() -> None:
     compare(run(100, make_paste_negative_rectangle_in_center_fixed_canvas()))
 
 
+@tag(Tag.PILLOW)
+def test_paste_batch_equals_individual_pastes() -> None:
+    batch = run(100, make_paste_rectangles_dynamic_canvas(batch=True))
+    individual = run(100, make_paste_rectangles_dynamic_canvas(batch=False))
+
+    assert batch.size == individual.size
+    assert batch.convert("RGBA") == individual.convert("RGBA")
+
+
+@tag(Tag.PILLOW)
+def test_paste_batch_grid_equals_individual_pastes() -> None:
+    batch = run(40, make_paste_grid_dynamic_canvas(batch=True))
+    individual = run(40, make_paste_grid_dynamic_canvas(batch=False))
+
+    assert batch.size == individual.size
+    assert batch.convert("RGBA") == individual.convert("RGBA")
+
+
+class PasteCountingPillowVirtualMachine(PillowVirtualMachine):
+    """Pillow VM counting calls to `Image.paste()` made for `PasteLayer` commands."""
+
+    def __init__(self, dpmm: int) -> None:
+        super().__init__(dpmm)
+        self.paste_count = 0
+
+    def on_paste_layer_eager(self, command: PasteLayer) -> None:
+        self.paste_count += 1
+        super().on_paste_layer_eager(command)
+
+
+@tag(Tag.PILLOW)
+def test_paste_batch_dense_is_stamped() -> None:
+    vm = PasteCountingPillowVirtualMachine(40)
+    vm.run(RVMC(commands=make_paste_grid_dynamic_canvas(batch=True)))
+
+    assert vm.paste_count == 0
+
+
+@tag(Tag.PILLOW)
+def test_paste_batch_sparse_is_pasted() -> None:
+    # Stamping two pads in opposite corners of 80 mm board would convert whole
+    # layer image to array, separate pastes are much cheaper.
+    vm = PasteCountingPillowVirtualMachine(40)
+    vm.run(
+        RVMC(
+            commands=[
+                make_main_layer(None),
+                make_layer("circle", None),
+                Shape.new_circle((0, 0), 0.5, is_negative=False),
+                EndLayer(),
+                PasteLayerBatch.new("circle", [(0, 0), (80, 80)]),
+                EndLayer(),
+            ]
+        )
+    )
+
+    assert vm.paste_count == 2  # noqa: PLR2004
+
+
 class TestCWArc:
     def axes(self) -> Iterable[Shape]:
         yield Shape.new_rectangle((0, 0), 15, 0.1, is_negative=False)
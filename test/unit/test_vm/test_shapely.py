@@ -33,6 +33,8 @@ from test.unit.test_vm.command_builders import (
     make_paste_circle_over_paste_circle_in_center_dynamic_canvas,
     make_paste_negative_rectangle_in_center_fixed_canvas,
     make_paste_rectangle_in_center_fixed_canvas,
+    make_paste_rectangles_dynamic_canvas,
+    make_polyline_in_center_fixed_canvas,
     make_rectangle_in_center_fixed_canvas,
 )
 
@@ -71,6 +73,11 @@ def test_draw_obround_vertical_in_center() -> None:
     save(run(make_obround_vertical_in_center_fixed_canvas()))
 
 
+@tag(Tag.SHAPELY, Tag.EXTRAS)
+def test_draw_polyline_in_center() -> None:
+    save(run(make_polyline_in_center_fixed_canvas()))
+
+
 @tag(Tag.SHAPELY, Tag.EXTRAS)
 def test_draw_circle_in_center() -> None:
     save(run(make_circle_in_center_fixed_canvas()))
@@ -101,6 +108,14 @@ def test_paste_negative_rectangle_in_center() -> None:
     save(run(make_paste_negative_rectangle_in_center_fixed_canvas()))
 
 
+@tag(Tag.SHAPELY, Tag.EXTRAS)
+def test_paste_batch_equals_individual_pastes() -> None:
+    batch = run(make_paste_rectangles_dynamic_canvas(batch=True))
+    individual = run(make_paste_rectangles_dynamic_canvas(batch=False))
+
+    assert batch.shape.equals(individual.shape)
+
+
 @tag(Tag.SHAPELY, Tag.EXTRAS)
 def test_intersecting_rectangles_dynamic_canvas() -> None:
     save(run_rvmc(make_intersecting_rectangles_dynamic_canvas()))